@@ -4,7 +4,10 @@ DVT Test Report Generator - Refactored FastAPI Application
 Main application with separated front-end and back-end logic
 """
 
+import logging
+import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 from typing import List, Dict
@@ -21,6 +24,26 @@ import uvicorn
 from report_generator_agent.ai_config import configure_ai
 from report_generator_agent.report_generator import DVTReportGenerator
 
+def configure_logging(level: str = os.getenv("LOG_LEVEL", "INFO")) -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue so console writes happen on a background
+    thread instead of in the request handlers (set LOG_LEVEL=DEBUG for debug output)
+    """
+    log_queue = queue.SimpleQueue()
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(level.upper())
+    
+    listener = logging.handlers.QueueListener(log_queue, console_handler)
+    listener.start()
+    return listener
+
+log_listener = configure_logging()
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
 app = FastAPI(title="DVT Test Report Generator", version="1.0.0")
 
@@ -79,10 +102,10 @@ async def generate_report(
         import json
         try:
             chronology_data = json.loads(test_execution_chronology) if test_execution_chronology else []
-            print(f"🔍 [DEBUG] Received test_execution_chronology: {test_execution_chronology}")
-            print(f"🔍 [DEBUG] Parsed chronology_data: {chronology_data}")
+            logger.debug("Received test_execution_chronology: %s", test_execution_chronology)
+            logger.debug("Parsed chronology_data: %s", chronology_data)
         except json.JSONDecodeError as e:
-            print(f"❌ [ERROR] Failed to parse chronology JSON: {e}")
+            logger.error("Failed to parse chronology JSON: %s", e)
             chronology_data = []
             
         device_config = {
@@ -96,18 +119,20 @@ async def generate_report(
         # Process analysis images
         analysis_image_paths = []
         if analysis_images:
-            print(f"🖼️ [DEBUG] Processing {len(analysis_images)} analysis images")
+            logger.debug("Processing %s analysis images", len(analysis_images))
             for i, image_file in enumerate(analysis_images):
                 if image_file.filename and image_file.size > 0:
                     # Save image temporarily
+                    import shutil
                     import tempfile
                     with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(image_file.filename)[1]) as tmp_file:
-                        content = await image_file.read()
-                        tmp_file.write(content)
+                        # Copy in 1 MB chunks instead of reading the whole image into memory
+                        await image_file.seek(0)
+                        shutil.copyfileobj(image_file.file, tmp_file, length=1 << 20)
                         analysis_image_paths.append(tmp_file.name)
-                        print(f"🖼️ [DEBUG] Saved image {i+1}: {image_file.filename} ({len(content)} bytes)")
+                        logger.debug("Saved image %s: %s (%s bytes)", i + 1, image_file.filename, image_file.size)
         
-        print(f"🖼️ [DEBUG] Total analysis images processed: {len(analysis_image_paths)}")
+        logger.debug("Total analysis images processed: %s", len(analysis_image_paths))
         
         # Process uploaded files
         processed_data = await report_generator.process_files(protocol_file, data_files)
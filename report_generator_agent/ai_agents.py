@@ -6,11 +6,31 @@ Based on visualization agent pattern with task-specific prompts and schemas
 
 import re
 import json
-from typing import Dict, List, Any, Optional, Union
+import asyncio
+import logging
+import weakref
+from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass
-from google.genai.types import GenerateContentConfig
-from .ai_prompts import DVTPrompts
-from .ai_config_settings import AgentConfig, ErrorConfig
+from google.genai.types import GenerateContentConfig, ThinkingConfig
+from .ai_prompts import DVTPrompts, DVT_SYSTEM_PROMPT, chunk_text, compact_csv
+from .ai_config_settings import AgentConfig, ErrorConfig, PromptConfig
+from .llm_cache import cached_llm
+from .equipment_section import render_equipment_section, calibration_statement, markdown_table, attachment_name as raw_data_attachment_name
+
+logger = logging.getLogger(__name__)
+
+# Limits concurrent AI requests across all agents (provider rate limits); one
+# semaphore per event loop, created on first use inside that loop
+_ai_request_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _get_ai_request_semaphore() -> asyncio.Semaphore:
+    """Return the running loop's AI request semaphore, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    semaphore = _ai_request_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _ai_request_semaphores[loop] = asyncio.Semaphore(AgentConfig.MAX_CONCURRENT_REQUESTS)
+    return semaphore
 
 
 @dataclass
@@ -31,21 +51,69 @@ class BaseDVTAgent:
         self.model_name = model_name or AgentConfig.DEFAULT_MODEL
         self.default_temperature = 0.7
     
-    async def generate_content(self, prompt: str, temperature: float = None) -> str:
-        """Generate content using AI with error handling"""
+    @cached_llm
+    async def generate_content(self, prompt: str, temperature: float = None,
+                               system_instruction: Optional[str] = None,
+                               response_schema: Optional[Dict[str, Any]] = None,
+                               max_output_tokens: Optional[int] = None,
+                               model: Optional[str] = None,
+                               thinking_budget: Optional[int] = None) -> str:
+        """Generate content using AI with error handling
+        
+        Static instructions go in system_instruction so the request prefix is
+        identical across reports; prompt carries only the per-report inputs.
+        The shared DVT_SYSTEM_PROMPT always leads the system instruction.
+        With response_schema the model returns JSON that matches the schema.
+        max_output_tokens caps the completion (see DVTPrompts.MAX_TOKENS).
+        model overrides the agent's model for this call (see DVTPrompts.MODEL_TIER).
+        thinking_budget sets the model's thinking budget (see DVTPrompts.THINKING_BUDGET);
+        capped calls without one get AgentConfig.CAPPED_THINKING_BUDGET on top of the cap.
+        Either is only sent to models that support it.
+        """
         if not self.client:
             raise Exception(ErrorConfig.ERROR_MESSAGES["ai_not_configured"])
         
+        model = model or self.model_name
+        thinking_config = None
+        if thinking_budget is None and max_output_tokens:
+            # Thinking tokens count against max_output_tokens: bound them and
+            # add them to the cap so the answer keeps its full budget
+            thinking_budget = AgentConfig.CAPPED_THINKING_BUDGET
+        if thinking_budget is not None and AgentConfig.supports_thinking_budget(model, thinking_budget):
+            thinking_config = ThinkingConfig(thinking_budget=thinking_budget)
+            if max_output_tokens:
+                max_output_tokens += thinking_budget
+        
         try:
             config = GenerateContentConfig(
-                temperature=temperature or self.default_temperature,
+                temperature=temperature if temperature is not None else self.default_temperature,
+                system_instruction=(
+                    f"{DVT_SYSTEM_PROMPT}\n{system_instruction}" if system_instruction else DVT_SYSTEM_PROMPT
+                ),
+                response_mime_type="application/json" if response_schema else None,
+                response_schema=response_schema,
+                max_output_tokens=max_output_tokens,
+                thinking_config=thinking_config,
             )
             
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[prompt],
-                config=config
-            )
+            # Async client so concurrent agents don't block the event loop
+            async with _get_ai_request_semaphore():
+                response = await self.client.aio.models.generate_content(
+                    model=model,
+                    contents=[prompt],
+                    config=config
+                )
+            
+            # Gemini caches shared request prefixes implicitly; this shows whether
+            # the common system instruction prefix is being served from cache
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                logger.debug(
+                    "%s: prompt tokens %s, cached %s",
+                    self.__class__.__name__,
+                    usage.prompt_token_count,
+                    usage.cached_content_token_count or 0
+                )
             
             return response.text if response else ""
         except Exception as e:
@@ -141,7 +209,7 @@ class ScopeAndPurposeAgent(BaseDVTAgent):
                 scope_tables.append(table)
         '''
         # Generate prompt with table data
-        prompt = DVTPrompts.scope_and_purpose_prompt(
+        system_instruction, prompt = DVTPrompts.scope_and_purpose_prompt(
             protocol_content, protocol_number, project_name
         )
         '''
@@ -156,7 +224,9 @@ class ScopeAndPurposeAgent(BaseDVTAgent):
         try:
             content = await self.generate_content(
                 prompt, 
-                temperature=AgentConfig.get_temperature("scope_and_purpose")
+                temperature=AgentConfig.get_temperature("scope_and_purpose"),
+                system_instruction=system_instruction,
+                max_output_tokens=DVTPrompts.MAX_TOKENS["scope_and_purpose"]
             )
             '''
             # If AI didn't include the tables, append them manually
@@ -430,12 +500,15 @@ class ReferenceAgent(BaseDVTAgent):
             TaskResult with formatted reference table
         """
         
-        prompt = DVTPrompts.reference_section_prompt(report_content)
+        system_instruction, prompt = DVTPrompts.reference_section_prompt(report_content)
         
         try:
             content = await self.generate_content(
                 prompt, 
-                temperature=AgentConfig.get_temperature("reference_section")
+                temperature=AgentConfig.get_temperature("reference_section"),
+                system_instruction=system_instruction,
+                model=DVTPrompts.MODEL_TIER.get("reference_section"),
+                thinking_budget=DVTPrompts.THINKING_BUDGET.get("reference_section")
             )
             
             # Extract document numbers for metadata
@@ -500,30 +573,20 @@ class TestProcedureSummaryAgent(BaseDVTAgent):
             TaskResult with formatted test procedure summary (~200 words)
         """
         
-        prompt = DVTPrompts.test_procedure_summary_prompt(protocol_content, protocol_number)
+        system_instruction, prompt = DVTPrompts.test_procedure_summary_prompt(protocol_content, protocol_number)
         
         try:
             content = await self.generate_content(
                 prompt, 
-                temperature=AgentConfig.get_temperature("test_procedure")
+                temperature=AgentConfig.get_temperature("test_procedure"),
+                system_instruction=system_instruction,
+                max_output_tokens=DVTPrompts.MAX_TOKENS["test_procedure_summary"]
             )
             
-            # Analyze summary for completeness
-            word_count = len(content.split())
-            elements_covered = self._analyze_summary_elements(content)
-            
-            metadata = {
-                "protocol_number": protocol_number,
-                "word_count": word_count,
-                "target_word_count": AgentConfig.get_target_spec("procedure_word_count"),
-                "elements_covered": elements_covered,
-                "completeness_score": len(elements_covered) / AgentConfig.get_target_spec("procedure_elements")
-            }
-            
             return TaskResult(
                 success=True,
                 content=content.strip(),
-                metadata=metadata
+                metadata=self.summary_metadata(content, protocol_number)
             )
             
         except Exception as e:
@@ -534,7 +597,20 @@ class TestProcedureSummaryAgent(BaseDVTAgent):
                 error=str(e)
             )
     
-    def _analyze_summary_elements(self, summary: str) -> List[str]:
+    @classmethod
+    def summary_metadata(cls, content: str, protocol_number: str) -> Dict[str, Any]:
+        """Analyze a summary for completeness (shared with the batched Task 4.4 result)"""
+        elements_covered = cls._analyze_summary_elements(content)
+        return {
+            "protocol_number": protocol_number,
+            "word_count": len(content.split()),
+            "target_word_count": AgentConfig.get_target_spec("procedure_word_count"),
+            "elements_covered": elements_covered,
+            "completeness_score": len(elements_covered) / AgentConfig.get_target_spec("procedure_elements")
+        }
+    
+    @staticmethod
+    def _analyze_summary_elements(summary: str) -> List[str]:
         """Analyze which required elements are covered in the summary"""
         summary_lower = summary.lower()
         elements_found = []
@@ -562,6 +638,123 @@ class TestProcedureSummaryAgent(BaseDVTAgent):
         return elements_found
 
 
+class BatchedSectionsAgent(BaseDVTAgent):
+    """
+    AI Agent for Tasks 4.1, 4.2 and 4.4 in one request
+    Sends the protocol content once and splits the sentinel-delimited answer per task
+    """
+    
+    # ===BEGIN_TASK_k=== ... ===END_TASK_k=== blocks in the model response
+    _TASK_BLOCK_RE = re.compile(r"===BEGIN_TASK_(\d)===(.*?)===END_TASK_\1===", re.DOTALL)
+    
+    # Task number in the batched prompt -> result key used by the orchestrator
+    TASK_KEYS = {
+        "1": "task_4_1",
+        "2": "task_4_2",
+        "3": "task_4_4"
+    }
+    
+    def __init__(self, client, model_name: str = None):
+        super().__init__(client, model_name)
+        self.default_temperature = AgentConfig.get_temperature("batched_sections")
+    
+    async def create_batched_sections(self, protocol_content: str, protocol_number: str,
+                                      project_name: str) -> Dict[str, TaskResult]:
+        """
+        Generate scope/purpose, references and procedure summary with a single AI call
+        
+        Args:
+            protocol_content: Full protocol document text
+            protocol_number: Protocol document number and revision
+            project_name: Project name for the report
+            
+        Returns:
+            Dictionary of TaskResults keyed by task name; tasks missing from the
+            response are omitted so the caller can run them individually
+        """
+        prompt = DVTPrompts.batched_report_sections_prompt(
+            protocol_content, protocol_number, project_name
+        )
+        
+        try:
+            content = await self.generate_content(prompt, temperature=self.default_temperature)
+        except Exception as e:
+            logger.warning("Batched section generation failed: %s", e)
+            return {}
+        
+        results = {}
+        for task_number, task_content in self._TASK_BLOCK_RE.findall(content or ""):
+            task_key = self.TASK_KEYS.get(task_number)
+            task_content = task_content.strip()
+            if task_key and task_content:
+                metadata = {"protocol_number": protocol_number}
+                if task_key == "task_4_4":
+                    # Same completeness metadata as TestProcedureSummaryAgent
+                    metadata = TestProcedureSummaryAgent.summary_metadata(task_content, protocol_number)
+                metadata["extraction_method"] = "batched_prompt"
+                results[task_key] = TaskResult(
+                    success=True,
+                    content=task_content,
+                    metadata=metadata
+                )
+        
+        return results
+
+
+class BatchedInvestigationsAgent(BaseDVTAgent):
+    """
+    AI Agent for protocol deviations, test method losses and defective units in one request
+    Returns the raw sentinel-delimited answers; each section agent still post-processes its own
+    """
+    
+    # Task number in the batched prompt -> section key
+    TASK_KEYS = {
+        "1": "protocol_deviations",
+        "2": "test_method_losses",
+        "3": "defective_unit_investigations"
+    }
+    
+    def __init__(self, client, model_name: str = None):
+        super().__init__(client, model_name)
+        self.default_temperature = AgentConfig.get_temperature("protocol_deviations")
+    
+    async def create_batched_investigations(self, deviations_text: Optional[str],
+                                            test_method_losses_text: Optional[str],
+                                            defective_units_text: Optional[str],
+                                            report_config: Dict[str, str] = None) -> Dict[str, str]:
+        """
+        Generate the three investigation-style sections with a single AI call
+        
+        Args:
+            deviations_text: Formatted deviation data, or None to skip the task
+            test_method_losses_text: Formatted TEST METHOD LOSSES data, or None to skip the task
+            defective_units_text: Formatted defective unit data, or None to skip the task
+            report_config: Report configuration with document number and revision
+            
+        Returns:
+            Raw AI content keyed by section; tasks missing from the response are
+            omitted so the caller can run them individually
+        """
+        prompt = DVTPrompts.batched_investigations_prompt(
+            deviations_text, test_method_losses_text, defective_units_text, report_config
+        )
+        
+        try:
+            content = await self.generate_content(prompt, temperature=self.default_temperature)
+        except Exception as e:
+            logger.warning("Batched investigations generation failed: %s", e)
+            return {}
+        
+        results = {}
+        for task_number, task_content in BatchedSectionsAgent._TASK_BLOCK_RE.findall(content or ""):
+            section_key = self.TASK_KEYS.get(task_number)
+            task_content = task_content.strip()
+            if section_key and task_content:
+                results[section_key] = task_content
+        
+        return results
+
+
 class AcronymsDefinitionsAgent(BaseDVTAgent):
     """
     AI Agent for Task 4.3: Create Acronyms & Definitions section
@@ -569,10 +762,23 @@ class AcronymsDefinitionsAgent(BaseDVTAgent):
     Specializes in scanning complete reports for acronyms and terms
     """
     
+    # All-caps tokens of 2-6 letters (optionally with digits, e.g. "PCBA", "G7")
+    _ACRONYM_RE = re.compile(r"\b[A-Z][A-Z0-9]{1,5}\b")
+    # Short all-caps English words that show up in headings and shouted text
+    _NON_ACRONYMS = frozenset(
+        PromptConfig.EXCLUSIONS["common_words"]
+        + ["AN", "AS", "BE", "BY", "IF", "IS", "IT", "NO", "NOT", "ALL", "ARE", "WAS", "WITH"]
+    )
+    
     def __init__(self, client, model_name: str = None):
         super().__init__(client, model_name)
         self.default_temperature = AgentConfig.get_temperature("acronyms_definitions")
     
+    def _extract_acronym_candidates(self, content: str) -> List[str]:
+        """Deterministically collect acronym candidates from the full report text"""
+        # Letter+digit tokens such as "G7" are kept; product names use them
+        return sorted(set(self._ACRONYM_RE.findall(content)) - self._NON_ACRONYMS)
+    
     async def create_acronyms_and_definitions(self, complete_report_content: str,
                                             acronym_knowledge_base: Dict[str, str] = None) -> TaskResult:
         """
@@ -586,16 +792,31 @@ class AcronymsDefinitionsAgent(BaseDVTAgent):
             TaskResult with both 4.1 Acronyms and 4.2 Definitions sections
         """
         
+        # Collect acronyms from the whole report in Python; the AI only defines them
+        acronym_candidates = self._extract_acronym_candidates(complete_report_content)
+        definition_terms = []
+        
         # Pre-process content to avoid overly long prompts
         processed_content = self._preprocess_content_for_acronyms(complete_report_content)
         
-        prompt = DVTPrompts.acronyms_definitions_prompt(processed_content)
-        
         try:
-            print("📝 Processing acronyms and definitions from report content...")
+            # Long reports: scan every chunk in one batched call so nothing past the
+            # preprocessing cut is missed, then merge the per-chunk lists
+            if len(complete_report_content) > AgentConfig.COMPLETE_REPORT_LIMIT:
+                chunk_acronyms, definition_terms = await self._scan_report_chunks(complete_report_content)
+                acronym_candidates = sorted(set(acronym_candidates) | set(chunk_acronyms))
+            
+            system_instruction, prompt = DVTPrompts.acronyms_definitions_prompt(
+                processed_content, acronym_candidates, definition_terms
+            )
+            
+            logger.info("Processing acronyms and definitions from report content")
             content = await self.generate_content(
                 prompt, 
-                temperature=AgentConfig.get_temperature("acronyms_definitions")
+                temperature=AgentConfig.get_temperature("acronyms_definitions"),
+                system_instruction=system_instruction,
+                model=DVTPrompts.MODEL_TIER.get("acronyms_definitions"),
+                thinking_budget=DVTPrompts.THINKING_BUDGET.get("acronyms_definitions")
             )
             
             # Extract counts for metadata
@@ -607,7 +828,9 @@ class AcronymsDefinitionsAgent(BaseDVTAgent):
                 "definitions_count": definitions_found,
                 "execution_order": "final",  # This runs last
                 "knowledge_base_used": acronym_knowledge_base is not None,
-                "content_processed": len(processed_content)
+                "content_processed": len(processed_content),
+                "acronym_candidates": len(acronym_candidates),
+                "definition_terms": len(definition_terms)
             }
             
             return TaskResult(
@@ -633,6 +856,36 @@ class AcronymsDefinitionsAgent(BaseDVTAgent):
                 }
             )
     
+    async def _scan_report_chunks(self, content: str) -> tuple:
+        """
+        Find acronyms and definition terms across all report chunks with one AI call
+        
+        Returns:
+            (acronyms, terms) as sorted, de-duplicated lists; empty lists if the scan fails
+        """
+        chunks = chunk_text(content)
+        prompt = DVTPrompts.acronyms_definitions_prompt_batched(chunks)
+        
+        try:
+            response = await self.generate_content(
+                prompt, temperature=self.default_temperature,
+                model=DVTPrompts.MODEL_TIER.get("acronyms_definitions")
+            )
+            json_match = re.search(r'\{.*\}', response or "", re.DOTALL)
+            per_chunk = json.loads(json_match.group()) if json_match else {}
+        except Exception as e:
+            logger.warning("Chunked acronym scan failed: %s", e)
+            return [], []
+        
+        acronyms, terms = set(), set()
+        for chunk_result in per_chunk.values():
+            if isinstance(chunk_result, dict):
+                acronyms.update(a.strip() for a in chunk_result.get("acronyms", []) if isinstance(a, str) and a.strip())
+                terms.update(t.strip() for t in chunk_result.get("terms", []) if isinstance(t, str) and t.strip())
+        
+        logger.debug("Scanned %d report chunks: %d acronyms, %d terms", len(chunks), len(acronyms), len(terms))
+        return sorted(acronyms - self._NON_ACRONYMS), sorted(terms, key=str.lower)
+    
     def _count_table_entries(self, content: str, column_name: str) -> int:
         """Count entries in a table by counting rows with the specified column"""
         lines = content.split('\n')
@@ -722,6 +975,8 @@ class DeviceUnderTestAgent(BaseDVTAgent):
     Analyzes Excel test article data and generates configuration section using AI
     """
     
+    _MAX_EXCEL_COLUMNS = 20  # Reasonable column limit
+    
     def __init__(self, client, model_name: str = None):
         super().__init__(client, model_name)
         self.default_temperature = AgentConfig.get_temperature("device_config")
@@ -757,7 +1012,7 @@ class DeviceUnderTestAgent(BaseDVTAgent):
             print(f"🔍 [TASK 4.5 DEBUG] Calculated DUT count: {test_article_count}")
             
             # Create AI prompt with extracted data, user configuration, and calculated count
-            prompt = DVTPrompts.device_under_test_prompt(excel_data, device_config, report_config, test_article_count)
+            system_instruction, prompt = DVTPrompts.device_under_test_prompt(excel_data, device_config, report_config, test_article_count)
             
             # DEBUG: Print prompt info
             print(f"🔍 [TASK 4.5 DEBUG] AI prompt length: {len(prompt)}")
@@ -767,7 +1022,8 @@ class DeviceUnderTestAgent(BaseDVTAgent):
             # Generate content using AI
             content = await self.generate_content(
                 prompt, 
-                temperature=AgentConfig.get_temperature("device_config")
+                temperature=AgentConfig.get_temperature("device_config"),
+                system_instruction=system_instruction
             )
             
             # Parse and validate the generated content (use pre-calculated count)
@@ -808,119 +1064,72 @@ class DeviceUnderTestAgent(BaseDVTAgent):
         Specifically looks for 'TEST ARTICLE LOG & TEST RESULTS' worksheet
         """
         import openpyxl
-        import tempfile
         import os
-        
-        print(f"🔍 [EXCEL DEBUG] Starting Excel extraction with {len(data_files) if data_files else 0} files")
-        formatted_data = ""
+        from .excel_parsers import BaseExcelParser
         
         if not data_files:
-            print("🔍 [EXCEL DEBUG] No data files provided!")
+            logger.warning("No data files provided for test article extraction")
             return "No test article data found in uploaded files."
         
-        for i, data_file in enumerate(data_files):
-            print(f"🔍 [EXCEL DEBUG] Processing file {i+1}: {getattr(data_file, 'filename', 'Unknown')}")
-            
+        formatted_data = ""
+        for data_file in data_files:
             if not data_file:
-                print(f"🔍 [EXCEL DEBUG] File {i+1} is None")
                 continue
-                
+            
+            temp_file_path = None
             try:
-                # Check if data_file has the correct structure
-                print(f"🔍 DEBUG - File object type: {type(data_file)}")
-                
-                # Reset file pointer and read content
-                if hasattr(data_file, 'seek') and hasattr(data_file, 'read'):
-                    # This is an UploadFile object
-                    await data_file.seek(0)  # Reset file pointer
-                    content = await data_file.read()
-                elif hasattr(data_file, 'file'):
-                    # This has a file attribute
-                    data_file.file.seek(0)
-                    content = data_file.file.read()
-                else:
-                    print(f"🔍 DEBUG - Unknown file object structure: {dir(data_file)}")
-                    continue
-                    
-                print(f"🔍 DEBUG - File content size: {len(content)} bytes")
-                
-                if len(content) == 0:
-                    print(f"🔍 DEBUG - Warning: File {getattr(data_file, 'filename', 'unknown')} is empty!")
+                temp_file_path = await BaseExcelParser.copy_upload_to_temp(data_file)
+                if os.path.getsize(temp_file_path) == 0:
+                    logger.warning("File %s is empty", getattr(data_file, 'filename', 'unknown'))
                     continue
                 
-                # Save uploaded file temporarily
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
-                    temp_file.write(content)
-                    temp_file_path = temp_file.name
-                    print(f"🔍 DEBUG - Saved temp file: {temp_file_path}, size: {len(content)} bytes")
-                
-                # Load workbook and find the correct worksheet
-                workbook = openpyxl.load_workbook(temp_file_path, data_only=True)
-                print(f"🔍 DEBUG - Workbook sheets: {workbook.sheetnames}")
-                
-                # Look for 'TEST ARTICLE LOG & TEST RESULTS' worksheet
-                target_sheet = None
-                for sheet_name in workbook.sheetnames:
-                    if 'TEST ARTICLE LOG' in sheet_name.upper() and 'TEST RESULTS' in sheet_name.upper():
-                        target_sheet = workbook[sheet_name]
-                        print(f"🔍 DEBUG - Found target sheet: {sheet_name}")
-                        break
-                
-                if target_sheet is None:
-                    # Fallback: look for sheets containing 'TEST ARTICLE' or 'LOG'
+                workbook = openpyxl.load_workbook(temp_file_path, data_only=True, read_only=True, keep_links=False)
+                try:
+                    # Look for 'TEST ARTICLE LOG & TEST RESULTS' worksheet
+                    target_sheet = None
                     for sheet_name in workbook.sheetnames:
-                        if 'TEST ARTICLE' in sheet_name.upper() or 'LOG' in sheet_name.upper():
+                        if 'TEST ARTICLE LOG' in sheet_name.upper() and 'TEST RESULTS' in sheet_name.upper():
                             target_sheet = workbook[sheet_name]
-                            print(f"🔍 DEBUG - Found fallback sheet: {sheet_name}")
                             break
-                
-                if target_sheet:
-                    # Extract data from the worksheet
-                    print(f"🔍 DEBUG - Extracting data from sheet: {target_sheet.title}")
-                    print(f"🔍 DEBUG - Sheet dimensions: {target_sheet.max_row} rows x {target_sheet.max_column} cols")
                     
-                    formatted_data += f"\n=== WORKSHEET: {target_sheet.title} ===\n"
+                    if target_sheet is None:
+                        # Fallback: look for sheets containing 'TEST ARTICLE' or 'LOG'
+                        for sheet_name in workbook.sheetnames:
+                            if 'TEST ARTICLE' in sheet_name.upper() or 'LOG' in sheet_name.upper():
+                                target_sheet = workbook[sheet_name]
+                                break
                     
-                    # Process all data from the sheet
-                    max_rows = target_sheet.max_row  # Process all rows
-                    max_cols = min(target_sheet.max_column, 20)  # Reasonable column limit
+                    if target_sheet is None:
+                        logger.info("No test article worksheet found in %s", getattr(data_file, 'filename', 'unknown'))
+                        continue
                     
-                    print(f"🔍 DEBUG - Processing {max_rows} rows from worksheet")
+                    formatted_data += f"\n=== WORKSHEET: {target_sheet.title} ===\n"
                     
+                    # Stream the rows once (read-only sheets re-parse the XML on every cell() call)
                     data_rows_found = 0
-                    for row in range(1, max_rows + 1):
-                        row_data = []
-                        for col in range(1, max_cols + 1):
-                            cell_value = target_sheet.cell(row=row, column=col).value
-                            if cell_value is not None:
-                                row_data.append(str(cell_value))
-                            else:
-                                row_data.append("")
+                    for row_values in target_sheet.iter_rows(values_only=True):
+                        row_data = ["" if cell_value is None else str(cell_value)
+                                    for cell_value in row_values[:self._MAX_EXCEL_COLUMNS]]
                         
                         # Only include rows with some data
                         if any(cell.strip() for cell in row_data):
                             formatted_data += " | ".join(row_data) + "\n"
                             data_rows_found += 1
                     
-                    print(f"🔍 DEBUG - Extracted {data_rows_found} data rows from sheet (total rows in file: {max_rows})")
-                else:
-                    print(f"🔍 DEBUG - No suitable worksheet found in file")
-                
-                # Cleanup temporary file
-                os.unlink(temp_file_path)
+                    logger.info("Extracted %d data rows from sheet %s", data_rows_found, target_sheet.title)
+                finally:
+                    # Read-only workbooks keep the file open until closed
+                    workbook.close()
                 
             except Exception as e:
-                print(f"🔍 DEBUG - Error processing file: {str(e)}")
+                logger.error("Error processing test article file: %s", e)
                 formatted_data += f"\n=== ERROR PROCESSING FILE: {str(e)} ===\n"
-                continue
+            finally:
+                BaseExcelParser.remove_temp_file(temp_file_path)
         
         if not formatted_data.strip():
-            print("🔍 DEBUG - No formatted data found, returning default message")
             formatted_data = "No test article data found in uploaded files."
         
-        print(f"🔍 DEBUG - Final formatted data length: {len(formatted_data)}")
-        print(f"🔍 DEBUG - Final formatted data preview: {formatted_data[:300]}...")
-        
         return formatted_data
     
     def _count_test_articles_in_content(self, excel_data: str) -> int:
@@ -1025,7 +1234,7 @@ class EquipmentUsedAgent(BaseDVTAgent):
     """
     AI Agent for Task 4.6: Create Equipment Used Section
     Integrates with Excel Parser to process Equipment Log, Software Log, and Material Log data
-    Uses AI to intelligently organize and present consumables and equipment information
+    Tables are rendered in Python; AI is used only when AgentConfig.USE_LLM_FOR_EQUIPMENT is set
     """
     
     def __init__(self, client, model_name: str = None):
@@ -1070,10 +1279,15 @@ class EquipmentUsedAgent(BaseDVTAgent):
             
             print(f"📊 Found: {equipment_count} equipment, {software_count} software, {material_count} material items")
             
-            # Use AI to intelligently organize and format the data
-            ai_organized_content = await self._ai_organize_equipment_data(
-                parsed_data, calibration_verified, report_config
-            )
+            # Deterministic formatting; the AI path is kept behind a feature flag
+            if AgentConfig.USE_LLM_FOR_EQUIPMENT:
+                ai_organized_content = await self._ai_organize_equipment_data(
+                    parsed_data, calibration_verified, report_config
+                )
+            else:
+                ai_organized_content = self._fallback_organize_data(
+                    parsed_data, calibration_verified, report_config
+                )
             
             # Handle attachments if needed (>5 items in any category)
             needs_attachment = (equipment_count > 5 or software_count > 5 or material_count > 5)
@@ -1154,72 +1368,34 @@ class EquipmentUsedAgent(BaseDVTAgent):
         calibration_verified: bool,
         report_config: Dict[str, Any] = None
     ) -> str:
-        """Use AI to intelligently organize and format equipment data"""
-        
-        # Prepare data summary for AI
-        data_summary = self._prepare_data_summary(parsed_data)
-        
-        # Build AI prompt
-        prompt = f"""You are an AI assistant helping to organize equipment, software, and material information for a DVT (Design Verification Test) report.
-
-Equipment Data Summary:
-{data_summary}
-
-Calibration Status: {"All equipment was verified as calibrated" if calibration_verified else "Equipment calibration was not verified"}
-
-Please organize this information into a professional Equipment Used section with the following STRICT formatting requirements:
-
-1. Start with the calibration verification statement
-
-2. Create THREE separate sections IN ORDER with clear headers:
-   - "• Equipment Used" (for EQUIPMENT LOG data)
-   - "• Software Used" (for SOFTWARE LOG data) 
-   - "• Materials Used" (for MATERIAL LOG data)
-
-3. For EACH section, follow this EXACT structure:
-   a) Write the section header (e.g., "• Equipment Used")
-   b) Write the status statement on the next line:
-      - If no data: "No equipment/software/materials were recorded in the logs."
-      - If data exists: "The equipment/software/materials log recorded the following items:"
-   c) If data exists and ≤5 items: Place the table IMMEDIATELY after the status statement
-   d) If data exists and >5 items: Add "Additional items are listed in the attachment."
-
-4. TABLE PLACEMENT RULES (CRITICAL):
-   - Equipment tables must appear ONLY under "• Equipment Used"
-   - Software tables must appear ONLY under "• Software Used"
-   - Materials tables must appear ONLY under "• Materials Used"
-   - Do NOT place tables in the wrong sections
-   - Each table must include ALL columns from the original data
-
-5. CRITICAL REQUIREMENTS:
-   - You MUST create all three sections regardless of data availability
-   - Tables must be placed immediately under their corresponding section
-   - Never mix table data between sections
-   - Use actual data values, no placeholder text like "TBD"
-
-Format everything in clean Markdown. Follow the section order and table placement rules exactly."""
+        """Use AI to organize and format equipment data (USE_LLM_FOR_EQUIPMENT only)"""
+        system_instruction, prompt = DVTPrompts.equipment_used_prompt(
+            parsed_data.get("EQUIPMENT LOG", []),
+            parsed_data.get("SOFTWARE LOG", []),
+            parsed_data.get("MATERIAL LOG", []),
+            calibration_verified,
+            report_config
+        )
         
         try:
             print(f"🤖 {self.agent_name}: Using AI to organize equipment data...")
             
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are a technical writing assistant specializing in DVT reports and equipment documentation."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
+            ai_content = await self.generate_content(
+                prompt,
+                temperature=AgentConfig.get_temperature("equipment_used"),
+                system_instruction=system_instruction,
+                max_output_tokens=DVTPrompts.MAX_TOKENS["equipment_used"],
+                model=DVTPrompts.MODEL_TIER.get("equipment_used"),
+                thinking_budget=DVTPrompts.THINKING_BUDGET.get("equipment_used")
             )
-            
-            ai_content = response.choices[0].message.content.strip()
             print(f"✅ {self.agent_name}: AI successfully organized equipment data")
             
-            return ai_content
+            return ai_content.strip()
             
         except Exception as e:
             print(f"⚠️ {self.agent_name}: AI organization failed, using fallback: {str(e)}")
             # Fallback to simple organization
-            return self._fallback_organize_data(parsed_data, calibration_verified)
+            return self._fallback_organize_data(parsed_data, calibration_verified, report_config)
     
     def _prepare_data_summary(self, parsed_data: Dict[str, List[Dict[str, Any]]]) -> str:
         """Prepare a detailed summary of the equipment data for AI processing"""
@@ -1251,94 +1427,25 @@ Format everything in clean Markdown. Follow the section order and table placemen
     def _fallback_organize_data(
         self, 
         parsed_data: Dict[str, List[Dict[str, Any]]], 
-        calibration_verified: bool
+        calibration_verified: bool,
+        report_config: Dict[str, Any] = None
     ) -> str:
-        """Fallback method to organize data without AI"""
-        content_parts = []
-        
-        # Add calibration statement
-        if calibration_verified:
-            content_parts.append("All equipment used in this testing was verified as calibrated at the time of use.")
-        else:
-            content_parts.append("Equipment calibration status was not verified at the time of use.")
-        
-        content_parts.append("")
-        
-        # Process each category explicitly
-        categories = [
-            ("EQUIPMENT LOG", "• Equipment Used", "equipment"),
-            ("SOFTWARE LOG", "• Software Used", "software"), 
-            ("MATERIAL LOG", "• Materials Used", "materials")
-        ]
-        
-        for sheet_name, section_title, item_type in categories:
-            content_parts.append(f"{section_title}")
-            
-            data_list = parsed_data.get(sheet_name, [])
-            
-            if not data_list:
-                content_parts.append(f"No {item_type} were recorded in the {item_type} log.")
-            else:
-                content_parts.append(f"The {item_type} log recorded the following items:")
-                
-                if len(data_list) <= 5:
-                    # Create inline table
-                    table_md = self._create_markdown_table(sheet_name, data_list)
-                    if table_md:
-                        # Remove the section header from table since we added it above
-                        table_lines = table_md.split('\n')
-                        if table_lines and table_lines[0].startswith('###'):
-                            table_lines = table_lines[1:]
-                        content_parts.extend([""] + table_lines)
-                else:
-                    # Reference to attachment
-                    content_parts.append(f"\nDetailed {item_type} information is provided in the attachment.")
-            
-            content_parts.append("")  # Add spacing between sections
-        
-        return '\n'.join(content_parts)
+        """Organize data without AI"""
+        return render_equipment_section(
+            parsed_data.get("EQUIPMENT LOG", []),
+            parsed_data.get("SOFTWARE LOG", []),
+            parsed_data.get("MATERIAL LOG", []),
+            calibration_verified,
+            report_config
+        )
 
     def _generate_calibration_statement(self, calibration_verified: bool) -> str:
         """Generate calibration verification statement"""
-        if calibration_verified:
-            return "All equipment used in this testing was verified as calibrated at the time of use."
-        else:
-            return "Equipment calibration status was not verified at the time of use."
+        return calibration_statement(calibration_verified)
     
     def _create_markdown_table(self, sheet_name: str, data: List[Dict[str, Any]]) -> str:
         """Create markdown table from sheet data"""
-        if not data:
-            return ""
-        
-        # Get column headers from first row
-        headers = list(data[0].keys())
-        
-        # Create table header
-        table_lines = []
-        
-        # Add section header
-        if sheet_name == "EQUIPMENT LOG":
-            table_lines.append("• Equipment Used")
-        elif sheet_name == "SOFTWARE LOG":
-            table_lines.append("• Software Used")
-        elif sheet_name == "MATERIAL LOG":
-            table_lines.append("• Materials Used")
-        
-        # Add table header row
-        header_row = "| " + " | ".join(headers) + " |"
-        table_lines.append(header_row)
-        
-        # Add separator row
-        separator_row = "|" + "|".join([" --- " for _ in headers]) + "|"
-        table_lines.append(separator_row)
-        
-        # Add data rows
-        for row in data:
-            values = [str(row.get(header, "")).strip() for header in headers]
-            data_row = "| " + " | ".join(values) + " |"
-            table_lines.append(data_row)
-        
-        return "\n".join(table_lines)
+        return markdown_table(data)
     
     async def _create_equipment_attachment(
         self, 
@@ -1351,9 +1458,7 @@ Format everything in clean Markdown. Follow the section order and table placemen
             import shutil
             
             # Generate attachment filename
-            report_num = report_config.get('report_number', 'RPT-XXX') if report_config else 'RPT-XXX'
-            revision = report_config.get('revision', '001') if report_config else '001'
-            attachment_name = f"{report_num} rev{revision} Attachment - Raw Data.xlsx"
+            attachment_filename = raw_data_attachment_name(report_config)
             
             # Find the first Excel file from the uploaded test data
             source_file = None
@@ -1370,15 +1475,15 @@ Format everything in clean Markdown. Follow the section order and table placemen
             # Create attachments directory
             attachments_dir = "attachments"
             os.makedirs(attachments_dir, exist_ok=True)
-            attachment_path = os.path.join(attachments_dir, attachment_name)
+            attachment_path = os.path.join(attachments_dir, attachment_filename)
             
             # Copy the complete Excel file as attachment
             shutil.copy2(source_file, attachment_path)
             
-            print(f"✅ Created equipment attachment: {attachment_name}")
+            print(f"✅ Created equipment attachment: {attachment_filename}")
             
             return {
-                "filename": attachment_name,
+                "filename": attachment_filename,
                 "path": attachment_path,
                 "size": os.path.getsize(attachment_path),
                 "type": "excel"
@@ -1399,13 +1504,15 @@ class TestMethodLossAgent(BaseDVTAgent):
         self.default_temperature = AgentConfig.get_temperature("test_method_loss")
     
     async def create_test_method_loss_investigations(self, excel_data_dict: Dict[str, Any], 
-                                                   report_config: Dict[str, str] = None) -> TaskResult:
+                                                   report_config: Dict[str, str] = None,
+                                                   raw_content: Optional[str] = None) -> TaskResult:
         """
         Process Test Method Loss Investigations task
         
         Args:
             excel_data_dict: Dictionary containing Excel worksheet data
             report_config: Report configuration with document number and revision
+            raw_content: AI answer already produced by BatchedInvestigationsAgent (skips the AI call)
             
         Returns:
             TaskResult with generated content or error message
@@ -1434,7 +1541,7 @@ class TestMethodLossAgent(BaseDVTAgent):
             print(f"🔍 [TASK 4.11 DEBUG] Found {test_method_loss_data.get('total_investigations', 0)} investigations")
             
             # Process the data and generate content using AI
-            processed_content = await self._generate_ai_content(test_method_loss_data, report_config)
+            processed_content = await self._generate_ai_content(test_method_loss_data, report_config, raw_content)
             
             if not processed_content:
                 return TaskResult(
@@ -1462,6 +1569,13 @@ class TestMethodLossAgent(BaseDVTAgent):
                 error=f"Error processing test method loss investigations: {str(e)}"
             )
     
+    def format_test_method_loss_data(self, excel_data_dict: Dict[str, Any]) -> Optional[str]:
+        """Return the formatted TEST METHOD LOSSES data for a batched prompt, or None if there is none"""
+        test_method_loss_data = self._extract_test_method_loss_data(excel_data_dict)
+        if not test_method_loss_data or not test_method_loss_data.get('investigations'):
+            return None
+        return self._format_data_for_ai(test_method_loss_data)
+    
     def _extract_test_method_loss_data(self, excel_data_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Extract data from TEST METHOD LOSSES worksheet"""
         try:
@@ -1546,12 +1660,16 @@ class TestMethodLossAgent(BaseDVTAgent):
             print(f"❌ Error extracting test method loss data: {str(e)}")
             return {}
     
-    async def _generate_ai_content(self, test_method_loss_data: Dict[str, Any], report_config: Dict[str, str]) -> str:
+    async def _generate_ai_content(self, test_method_loss_data: Dict[str, Any], report_config: Dict[str, str],
+                                   raw_content: Optional[str] = None) -> str:
         """Generate AI content for test method loss investigations"""
         try:
             if not test_method_loss_data.get('investigations'):
                 return self._generate_no_losses_content()
             
+            if raw_content:
+                return self._format_final_content(raw_content)
+            
             # Format the data for AI prompt
             formatted_data = self._format_data_for_ai(test_method_loss_data)
             print(f"🔍 [TASK 4.11 DEBUG] AI prompt data length: {len(formatted_data)}")
@@ -1582,19 +1700,10 @@ class TestMethodLossAgent(BaseDVTAgent):
         if not investigations:
             return "No test method loss investigations found."
         
-        formatted_lines = ["TEST METHOD LOSSES Data:"]
-        formatted_lines.append("=" * 50)
-        
-        for i, investigation in enumerate(investigations, 1):
-            formatted_lines.append(f"\nInvestigation #{i}:")
-            formatted_lines.append(f"- #: {investigation.get('#', '')}")
-            formatted_lines.append(f"- PROTOCOL NOTE TYPE: {investigation.get('PROTOCOL NOTE TYPE', '')}")
-            formatted_lines.append(f"- TEST UNIT SN or ID: {investigation.get('TEST UNIT SN or ID', '')}")
-            formatted_lines.append(f"- PROTOCOL STEP / SECTION: {investigation.get('PROTOCOL STEP / SECTION', '')}")
-            formatted_lines.append(f"- REPLACEMENT(S): {investigation.get('REPLACEMENT(S)', '')}")
-            formatted_lines.append(f"- OBSERVATIONS: {investigation.get('OBSERVATIONS', '')}")
-        
-        return "\n".join(formatted_lines)
+        # One CSV row per investigation (header once, duplicate rows dropped)
+        columns = ["#", "PROTOCOL NOTE TYPE", "TEST UNIT SN or ID", "PROTOCOL STEP / SECTION",
+                   "REPLACEMENT(S)", "OBSERVATIONS"]
+        return "TEST METHOD LOSSES Data (CSV):\n" + compact_csv(investigations, columns)
     
     def _generate_no_losses_content(self) -> str:
         """Generate content when no test method losses are found"""
@@ -1632,6 +1741,7 @@ class DVTAgentOrchestrator:
         self.scope_agent = ScopeAgent(client, model_name)
         self.reference_agent = ReferenceAgent(client, model_name)
         self.procedure_agent = TestProcedureSummaryAgent(client, model_name)
+        self.batched_sections_agent = BatchedSectionsAgent(client, model_name)
         self.acronyms_agent = AcronymsDefinitionsAgent(client, model_name)
         self.device_config_agent = DeviceUnderTestAgent(client, model_name)
         self.equipment_agent = EquipmentUsedAgent(client, model_name)
@@ -1670,40 +1780,63 @@ class DVTAgentOrchestrator:
         """
 
         results = {}
+        batched = {}
+        # Independent tasks are collected here and run concurrently below
+        pending = {}
         
         # Task 4.1: Create Purpose and Scope (now split into two separate tasks)
         if parsed_protocol_data:
             print("🚀 Executing Task 4.1a: Generate Purpose from parsed data")
-            results["task_4_1_purpose"] = await self.purpose_agent.generate_purpose(
+            pending["task_4_1_purpose"] = self.purpose_agent.generate_purpose(
                 parsed_protocol_data, protocol_number, project_name
             )
 
             print("🚀 Executing Task 4.1b: Generate Scope from parsed data")
-            results["task_4_1_scope"] = await self.scope_agent.generate_scope(
+            pending["task_4_1_scope"] = self.scope_agent.generate_scope(
                 parsed_protocol_data, protocol_number, project_name
             )
         else:
             # 【Fallback to legacy】 method if no parsed data available
-            print("⚠️ No parsed protocol data available, using legacy ScopeAndPurposeAgent")
-            legacy_scope_agent = ScopeAndPurposeAgent(self.client, self.model_name)
-            legacy_result = await legacy_scope_agent.create_scope_and_purpose(
-                protocol_content, protocol_number, project_name
-            )
+            # Tasks 4.1, 4.2 and 4.4 all read the same protocol text, so ask for them in one call
+            print("⚠️ No parsed protocol data available, using batched prompt for Tasks 4.1/4.2/4.4")
+            if not report_content:
+                batched = await self.batched_sections_agent.create_batched_sections(
+                    protocol_content, protocol_number, project_name
+                )
+            
+            legacy_result = batched.get("task_4_1")
+            if legacy_result is None:
+                legacy_scope_agent = ScopeAndPurposeAgent(self.client, self.model_name)
+                legacy_result = await legacy_scope_agent.create_scope_and_purpose(
+                    protocol_content, protocol_number, project_name
+                )
             # Split the legacy result for backward compatibility
             results["task_4_1_purpose"] = legacy_result
             results["task_4_1_scope"] = legacy_result
 
         # Task 4.2: Create Reference Section  
-        print("🚀 Executing Task 4.2: Create Reference Section")
-        # Use protocol content to scan for document references
-        scan_content = protocol_content + "\n" + report_content if report_content else protocol_content
-        results["task_4_2"] = await self.reference_agent.create_reference_section(scan_content)
+        if "task_4_2" in batched:
+            results["task_4_2"] = batched["task_4_2"]
+        else:
+            print("🚀 Executing Task 4.2: Create Reference Section")
+            # Use protocol content to scan for document references
+            scan_content = protocol_content + "\n" + report_content if report_content else protocol_content
+            pending["task_4_2"] = self.reference_agent.create_reference_section(scan_content)
         
         # Task 4.4: Create Test Procedure Summary
-        print("🚀 Executing Task 4.4: Create Test Procedure Summary")  
-        results["task_4_4"] = await self.procedure_agent.create_test_procedure_summary(
-            protocol_content, protocol_number
-        )
+        if "task_4_4" in batched:
+            results["task_4_4"] = batched["task_4_4"]
+        else:
+            print("🚀 Executing Task 4.4: Create Test Procedure Summary")  
+            pending["task_4_4"] = self.procedure_agent.create_test_procedure_summary(
+                protocol_content, protocol_number
+            )
+        
+        # Run the independent tasks concurrently; each agent already turns its
+        # own failures into an unsuccessful TaskResult
+        if pending:
+            task_results = await asyncio.gather(*pending.values())
+            results.update(zip(pending.keys(), task_results))
         
         # Task 4.3: Create Acronyms & Definitions (EXECUTED LAST)
         print("🚀 Executing Task 4.3: Create Acronyms & Definitions (Final Step)")
@@ -1779,7 +1912,11 @@ class DVTAgentOrchestrator:
         try:
             test_result = await self.scope_agent.generate_content(
                 DVTPrompts.ai_connection_test_prompt(), 
-                temperature=AgentConfig.get_temperature("connection_test")
+                temperature=AgentConfig.get_temperature("connection_test"),
+                max_output_tokens=DVTPrompts.MAX_TOKENS["ai_connection_test"],
+                model=DVTPrompts.MODEL_TIER.get("ai_connection_test"),
+                thinking_budget=DVTPrompts.THINKING_BUDGET.get("ai_connection_test"),
+                use_cache=False  # Liveness probe - never cached
             )
             return f"✅ {test_result}"
         except Exception as e:
@@ -1869,6 +2006,32 @@ class TestResultSummaryAgent(BaseDVTAgent):
                 error=f"Error in create_test_result_summary: {str(e)}"
             )
     
+    # "## 7.0: Acceptance Criteria" style headers produced by DocumentParser.format_for_ai_prompt
+    _CRITERIA_HEADER_RE = re.compile(r"(?im)^##\s*[\d.]+:[^\n]*criteri")
+    _TITLED_HEADER_RE = re.compile(r"(?m)^##\s*[\d.]+:\s")
+    # Plain-text fallback when no parsed section headers exist; only the keywords are
+    # case-insensitive, so the section still ends at the next ALL-CAPS heading line
+    _CRITERIA_TEXT_RE = re.compile(r"(?s)((?i:acceptance|test|pass)\s+(?i:criteri[ao]n?s?).*?)(?=\n##|\n[A-Z][A-Z ]+\n|\Z)")
+    
+    def _slice_acceptance_criteria(self, doc_text: str) -> str:
+        """
+        Cut the document down to its Acceptance Criteria section(s) before calling the AI
+        Returns the full text when no criteria section can be located
+        """
+        spans = []
+        for header in self._CRITERIA_HEADER_RE.finditer(doc_text):
+            next_header = self._TITLED_HEADER_RE.search(doc_text, header.end())
+            end = next_header.start() if next_header else len(doc_text)
+            spans.append(doc_text[header.start():end].strip())
+        
+        if not spans:
+            match = self._CRITERIA_TEXT_RE.search(doc_text)
+            # A match that is only the header line carries no criteria; keep the full text then
+            if match and "\n" in match.group(1).strip():
+                spans.append(match.group(1).strip())
+        
+        return "\n\n".join(spans) if spans else doc_text
+    
     def _get_acceptance_criteria(self, doc_data: Dict[str, Any], protocol_content: Optional[str] = None, ai_friendly_format: Optional[str] = None) -> str:
         """Let AI extract Acceptance Criteria from the full document data using AI-friendly format"""
         print(f"🔍 Preparing document for AI analysis...")
@@ -1886,14 +2049,17 @@ class TestResultSummaryAgent(BaseDVTAgent):
         if protocol_content:
             doc_text += "\n\nProtocol Content:\n" + protocol_content
         
-        print(f"📄 Document data prepared for AI analysis ({len(doc_text)} characters)")
-        return doc_text
+        criteria_text = self._slice_acceptance_criteria(doc_text)
+        print(f"📄 Document data prepared for AI analysis ({len(criteria_text)} of {len(doc_text)} characters)")
+        return criteria_text
     
     async def _extract_criteria_info(self, acceptance_criteria_data: str) -> List[Dict[str, str]]:
         """Use AI to extract REQ ID, Acceptance Criteria description, and Confidence/Reliability"""
         try:
             prompt = DVTPrompts.test_result_summary_extraction_prompt(acceptance_criteria_data)
-            response = await self.generate_content(prompt)
+            response = await self.generate_content(
+                prompt, response_schema=DVTPrompts.TEST_RESULT_CRITERIA_SCHEMA
+            )
             
             # Parse AI response to extract structured data
             criteria_list = self._parse_criteria_response(response)
@@ -1905,35 +2071,35 @@ class TestResultSummaryAgent(BaseDVTAgent):
     
     def _parse_criteria_response(self, response: str) -> List[Dict[str, str]]:
         """Parse AI response into structured criteria data"""
+        # Structured output: the response is the JSON array itself
+        try:
+            criteria_data = json.loads(response)
+        except json.JSONDecodeError:
+            return self._parse_criteria_text(response)
+        
+        if not isinstance(criteria_data, list):
+            return []
+        return [item for item in criteria_data
+                if isinstance(item, dict) and all(key in item for key in ["req_id", "acceptance_criteria", "confidence_reliability"])]
+    
+    def _parse_criteria_text(self, response: str) -> List[Dict[str, str]]:
+        """Fallback: parse the plain-text "REQ ID: / Acceptance Criteria: / Confidence/Reliability:" format"""
         criteria_list = []
+        current_criteria = {}
         
-        try:
-            # Look for JSON structure in response
-            import re
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                criteria_data = json.loads(json_match.group())
-                for item in criteria_data:
-                    if all(key in item for key in ["req_id", "acceptance_criteria", "confidence_reliability"]):
-                        criteria_list.append(item)
-        except:
-            # Fallback: parse text format
-            lines = response.split('\n')
-            current_criteria = {}
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("REQ ID:"):
-                    if current_criteria:
-                        criteria_list.append(current_criteria)
-                    current_criteria = {"req_id": line.replace("REQ ID:", "").strip()}
-                elif line.startswith("Acceptance Criteria:"):
-                    current_criteria["acceptance_criteria"] = line.replace("Acceptance Criteria:", "").strip()
-                elif line.startswith("Confidence/Reliability:"):
-                    current_criteria["confidence_reliability"] = line.replace("Confidence/Reliability:", "").strip()
-            
-            if current_criteria:
-                criteria_list.append(current_criteria)
+        for line in response.split('\n'):
+            line = line.strip()
+            if line.startswith("REQ ID:"):
+                if current_criteria:
+                    criteria_list.append(current_criteria)
+                current_criteria = {"req_id": line.replace("REQ ID:", "").strip()}
+            elif line.startswith("Acceptance Criteria:"):
+                current_criteria["acceptance_criteria"] = line.replace("Acceptance Criteria:", "").strip()
+            elif line.startswith("Confidence/Reliability:"):
+                current_criteria["confidence_reliability"] = line.replace("Confidence/Reliability:", "").strip()
+        
+        if current_criteria:
+            criteria_list.append(current_criteria)
         
         return criteria_list
     
@@ -2169,17 +2335,25 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
     Converts Excel deviation data into standardized deviation documentation
     """
     
+    # Strips a leading "DEVIATION #1:", "DEV 2:" or "3." prefix in a single pass
+    _TITLE_STRIP_RE = re.compile(r'^\s*(?:DEVIATION\s*#?\d*:?|DEV\s*#?\d*:?|\d+\.?)\s*', re.IGNORECASE)
+    # Matches whole deviation header lines ("DEVIATION #1 ...", "DEV 2 ...", "3. ...")
+    _HEADER_LINE_RE = re.compile(r'(?im)^(?:DEVIATION[ \t]*#?\d+|DEV[ \t]*#?\d+|\d+\.).*$')
+    # Leading/trailing blanks on every line
+    _LINE_EDGE_WS_RE = re.compile(r'(?m)^[ \t\r\f\v]+|[ \t\r\f\v]+$')
+    
     def __init__(self, client, model_name: Optional[str] = None):
         super().__init__(client, model_name)
         self.task_name = "protocol_deviations"
         self.default_temperature = AgentConfig.get_temperature(self.task_name)
     
-    async def process_deviations(self, deviations_text: str) -> TaskResult:
+    async def process_deviations(self, deviations_text: str, raw_content: Optional[str] = None) -> TaskResult:
         """
         Process deviations data and generate formatted deviation report
         
         Args:
             deviations_text: Formatted deviation data from Excel parser
+            raw_content: AI answer already produced by BatchedInvestigationsAgent (skips the AI call)
             
         Returns:
             TaskResult with formatted deviation content
@@ -2192,14 +2366,15 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
             )
         
         try:
-            # Get prompt from DVTPrompts
-            prompt = DVTPrompts.get_protocol_deviations_prompt(deviations_text)
-            
-            # Generate content using AI
-            raw_content = await self.generate_content(
-                prompt, 
-                temperature=self.default_temperature
-            )
+            if not raw_content:
+                # Get prompt from DVTPrompts
+                prompt = DVTPrompts.get_protocol_deviations_prompt(deviations_text)
+                
+                # Generate content using AI
+                raw_content = await self.generate_content(
+                    prompt, 
+                    temperature=self.default_temperature
+                )
             
             if not raw_content:
                 return TaskResult(
@@ -2210,10 +2385,10 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
                 )
             
             # Validate and post-process the generated content
-            processed_content = self._validate_and_format(raw_content)
+            processed_content, content_lower = self._validate_and_format(raw_content)
             
             # Count deviations for metadata
-            deviation_count = self._count_deviations(processed_content)
+            deviation_count = self._count_deviations(processed_content, content_lower)
             
             return TaskResult(
                 success=True,
@@ -2226,7 +2401,7 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
             )
             
         except Exception as e:
-            print(f"❌ Error processing deviations: {str(e)}")
+            logger.error("Error processing deviations: %s", e)
             return TaskResult(
                 success=False,
                 content="No deviations.",
@@ -2234,7 +2409,7 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
                 error=f"Deviation processing failed: {str(e)}"
             )
     
-    def _validate_and_format(self, raw_content: str) -> str:
+    def _validate_and_format(self, raw_content: str) -> Tuple[str, str]:
         """
         Validate and format the AI-generated deviation content
         
@@ -2242,13 +2417,12 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
             raw_content: Raw content from AI generation
             
         Returns:
-            Validated and formatted deviation content
+            Validated and formatted deviation content, and its lowercased copy
         """
         content = raw_content.strip()
         
-        # If no deviations found, return standard message
-        if not content or "no deviations" in content.lower():
-            return "No deviations."
+        if not content:
+            return "No deviations.", "no deviations."
         
         # Validate deviation numbering format
         content = self._fix_deviation_numbering(content)
@@ -2256,53 +2430,36 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
         # Clean up formatting
         content = self._clean_formatting(content)
         
+        # Lowercase once; the checks below and _count_deviations reuse it
+        content_lower = content.lower()
+        
+        # If no deviations found, return standard message
+        if "no deviations" in content_lower:
+            return "No deviations.", "no deviations."
+        
         # Validate required elements are present
-        if not self._has_required_elements(content):
+        if not self._has_required_elements(content, content_lower):
             print("⚠️ Warning: Generated deviation content may be missing required elements")
         
-        return content
+        return content, content_lower
     
     def _fix_deviation_numbering(self, content: str) -> str:
         """Fix and standardize deviation numbering"""
-        lines = content.split('\n')
-        processed_lines = []
-        deviation_counter = 1
+        # Strip every line, then renumber all header lines in one regex pass
+        content = self._LINE_EDGE_WS_RE.sub('', content)
+        deviation_counter = 0
         
-        for line in lines:
-            line = line.strip()
-            
-            # Look for deviation headers and standardize them
-            if self._is_deviation_header(line):
-                # Replace with standardized format
-                standardized_header = f"DEVIATION #{deviation_counter}: {self._extract_deviation_title(line)}"
-                processed_lines.append(standardized_header)
-                deviation_counter += 1
-            else:
-                processed_lines.append(line)
+        def renumber(match):
+            nonlocal deviation_counter
+            deviation_counter += 1
+            return f"DEVIATION #{deviation_counter}: {self._extract_deviation_title(match.group(0))}"
         
-        return '\n'.join(processed_lines)
-    
-    def _is_deviation_header(self, line: str) -> bool:
-        """Check if line is a deviation header"""
-        line_upper = line.upper()
-        patterns = [
-            r'DEVIATION\s*#?\d+', 
-            r'DEVIATION\s+\d+',
-            r'DEV\s*#?\d+',
-            r'^\d+\.',  # Simple numbering like "1."
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, line_upper):
-                return True
-        return False
+        return self._HEADER_LINE_RE.sub(renumber, content)
     
     def _extract_deviation_title(self, line: str) -> str:
         """Extract deviation title from header line"""
         # Remove deviation numbering and extract title
-        line = re.sub(r'DEVIATION\s*#?\d*:?', '', line, flags=re.IGNORECASE).strip()
-        line = re.sub(r'DEV\s*#?\d*:?', '', line, flags=re.IGNORECASE).strip()
-        line = re.sub(r'^\d+\.?\s*', '', line).strip()
+        line = self._TITLE_STRIP_RE.sub('', line).strip()
         
         # If title is empty or too short, provide a generic title
         if len(line) < 5:
@@ -2324,22 +2481,23 @@ class ProtocolDeviationsAgent(BaseDVTAgent):
         
         return content.strip()
     
-    def _has_required_elements(self, content: str) -> bool:
+    def _has_required_elements(self, content: str, content_lower: str) -> bool:
         """Check if content has required deviation elements"""
-        content_lower = content.lower()
+        # Basic length check before any scanning
+        if len(content) <= 50:
+            return False
         
         # Check for key elements
         has_deviation_number = bool(re.search(r'deviation\s*#\d+', content_lower))
         has_impact_discussion = any(keyword in content_lower for keyword in [
             'impact', 'affect', 'result', 'consequence', 'influence'
         ])
-        has_description = len(content) > 50  # Basic length check
         
-        return has_deviation_number and has_impact_discussion and has_description
+        return has_deviation_number and has_impact_discussion
     
-    def _count_deviations(self, content: str) -> int:
+    def _count_deviations(self, content: str, content_lower: str) -> int:
         """Count the number of deviations in the content"""
-        if "no deviations" in content.lower():
+        if "no deviations" in content_lower:
             return 0
         
         # Count DEVIATION # patterns
@@ -2359,12 +2517,13 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
         self.task_name = "defective_unit_investigations"
         self.default_temperature = AgentConfig.get_temperature("protocol_deviations")  # Use same temp as deviations
     
-    async def process_defective_units(self, defective_units_text: str) -> TaskResult:
+    async def process_defective_units(self, defective_units_text: str, raw_content: Optional[str] = None) -> TaskResult:
         """
         Process defective units data and generate formatted investigation report
         
         Args:
             defective_units_text: Formatted defective unit data from Excel parser
+            raw_content: AI answer already produced by BatchedInvestigationsAgent (skips the AI call)
             
         Returns:
             TaskResult with formatted defective unit investigations content
@@ -2377,14 +2536,15 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
             )
         
         try:
-            # Get prompt from DVTPrompts
-            prompt = DVTPrompts.get_defective_unit_investigations_prompt(defective_units_text)
-            
-            # Generate content using AI
-            raw_content = await self.generate_content(
-                prompt, 
-                temperature=self.default_temperature
-            )
+            if not raw_content:
+                # Get prompt from DVTPrompts
+                prompt = DVTPrompts.get_defective_unit_investigations_prompt(defective_units_text)
+                
+                # Generate content using AI
+                raw_content = await self.generate_content(
+                    prompt, 
+                    temperature=self.default_temperature
+                )
             
             if not raw_content:
                 return TaskResult(
@@ -2395,10 +2555,10 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
                 )
             
             # Validate and post-process the generated content
-            processed_content = self._validate_and_format(raw_content)
+            processed_content, content_lower = self._validate_and_format(raw_content)
             
             # Count investigations for metadata
-            investigation_count = self._count_investigations(processed_content)
+            investigation_count = self._count_investigations(processed_content, content_lower)
             
             return TaskResult(
                 success=True,
@@ -2411,7 +2571,7 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
             )
             
         except Exception as e:
-            print(f"❌ Error processing defective units: {str(e)}")
+            logger.error("Error processing defective units: %s", e)
             return TaskResult(
                 success=False,
                 content="No defective unit in the execution of this test.",
@@ -2419,7 +2579,7 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
                 error=f"Defective unit processing failed: {str(e)}"
             )
     
-    def _validate_and_format(self, raw_content: str) -> str:
+    def _validate_and_format(self, raw_content: str) -> Tuple[str, str]:
         """
         Validate and format the AI-generated defective unit content
         
@@ -2427,13 +2587,12 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
             raw_content: Raw content from AI generation
             
         Returns:
-            Validated and formatted defective unit content
+            Validated and formatted defective unit content, and its lowercased copy
         """
         content = raw_content.strip()
         
-        # If no defective units found, return standard message
-        if not content or "no defective unit" in content.lower():
-            return "No defective unit in the execution of this test."
+        if not content:
+            return "No defective unit in the execution of this test.", "no defective unit in the execution of this test."
         
         # Validate investigation numbering format
         content = self._fix_investigation_numbering(content)
@@ -2441,11 +2600,18 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
         # Clean up formatting
         content = self._clean_formatting(content)
         
+        # Lowercase once; the checks below and _count_investigations reuse it
+        content_lower = content.lower()
+        
+        # If no defective units found, return standard message
+        if "no defective unit" in content_lower:
+            return "No defective unit in the execution of this test.", "no defective unit in the execution of this test."
+        
         # Validate required elements are present
-        if not self._has_required_elements(content):
+        if not self._has_required_elements(content, content_lower):
             print("⚠️ Warning: Generated defective unit content may be missing required elements")
         
-        return content
+        return content, content_lower
     
     def _fix_investigation_numbering(self, content: str) -> str:
         """Fix and standardize investigation numbering"""
@@ -2496,12 +2662,10 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
         
         return content.strip()
     
-    def _has_required_elements(self, content: str) -> bool:
+    def _has_required_elements(self, content: str, content_lower: str) -> bool:
         """Check if content has required investigation elements"""
-        if "no defective unit" in content.lower():
+        if "no defective unit" in content_lower:
             return True
-            
-        content_lower = content.lower()
         
         # Check for key elements
         has_investigation_number = bool(re.search(r'defective\s+unit\s+investigation\s*#\d+', content_lower))
@@ -2517,9 +2681,9 @@ class DefectiveUnitInvestigationsAgent(BaseDVTAgent):
         
         return has_investigation_number and has_specification_info and has_unit_info and has_investigation_info
     
-    def _count_investigations(self, content: str) -> int:
+    def _count_investigations(self, content: str, content_lower: str) -> int:
         """Count the number of investigations in the content"""
-        if "no defective unit" in content.lower():
+        if "no defective unit" in content_lower:
             return 0
         
         # Count DEFECTIVE UNIT INVESTIGATION # patterns
@@ -2566,7 +2730,10 @@ class ConclusionAgent(BaseDVTAgent):
             prompt = prompts.get_conclusion_prompt(test_results_content, scope_content)
             
             # Generate conclusion with AI using configured temperature
-            content = await self.generate_content(prompt, temperature=self.default_temperature)
+            content = await self.generate_content(
+                prompt, temperature=self.default_temperature,
+                max_output_tokens=DVTPrompts.MAX_TOKENS["conclusion"]
+            )
             
             if content:
                 # Validate the generated conclusion
@@ -2614,6 +2781,12 @@ class ConclusionAgent(BaseDVTAgent):
             "notes": []
         }
         
+        # Check minimum length first - too-short output is invalid regardless of keywords
+        if len(content.strip()) < 150:  # Increased from 100 due to more detailed requirements
+            validation_result["valid"] = False
+            validation_result["notes"].append("Conclusion too short for detailed analysis")
+            return validation_result
+        
         # Check for key elements
         content_lower = content.lower()
         
@@ -2645,9 +2818,4 @@ class ConclusionAgent(BaseDVTAgent):
         if any(phrase in content_lower for phrase in criteria_evaluation):
             validation_result["notes"].append("Good: Explicit criteria evaluation")
         
-        # Check minimum length
-        if len(content.strip()) < 150:  # Increased from 100 due to more detailed requirements
-            validation_result["valid"] = False
-            validation_result["notes"].append("Conclusion too short for detailed analysis")
-        
         return validation_result
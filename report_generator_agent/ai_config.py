@@ -3,6 +3,7 @@ AI Configuration module for DVT Test Report Generator
 """
 
 import os
+from functools import lru_cache
 from google import genai
 from google.genai.types import (
     GenerateContentConfig,
@@ -10,8 +11,12 @@ from google.genai.types import (
     GenerateContentResponse,
 )
 
+@lru_cache(maxsize=1)
 def configure_ai():
-    """Configure and return AI client using Vertex AI"""
+    """Configure and return AI client using Vertex AI
+    
+    The client is memoized so every caller shares one connection pool.
+    """
     # Check if Vertex AI environment variables are set
     project = os.getenv('GOOGLE_CLOUD_PROJECT')
     location = os.getenv('GOOGLE_CLOUD_LOCATION')
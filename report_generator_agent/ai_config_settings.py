@@ -1,9 +1,5 @@
 """
-Configuration setti        "test_method_loss": 10000,       # Large for detailed reports
-        "test_result_summary": 20000,   # Very large for comprehensive summaries
-        "protocol_deviations": 10000,   # Large for multiple deviations
-        "defective_unit_investigations": 10000  # Large for multiple investigations
-    } for DVT AI Agents
+Configuration settings for DVT AI Agents
 Centralized settings for models, temperatures, and other parameters
 """
 
@@ -15,8 +11,21 @@ class AgentConfig:
     
     # Model settings
     DEFAULT_MODEL = "gemini-2.5-flash"
+    SMALL_MODEL = "gemini-2.5-flash-lite"  # Extraction/formatting tasks (see DVTPrompts.MODEL_TIER)
+    
+    # Thinking budget for capped calls that don't set one (DVTPrompts.THINKING_BUDGET);
+    # Gemini counts thinking tokens against max_output_tokens, so it is added to the cap
+    CAPPED_THINKING_BUDGET = 1024
+    
+    # Maximum AI requests in flight at once across all agents
+    MAX_CONCURRENT_REQUESTS = 5
+    
+    # Task 4.6 tables are rendered in Python; set True to have the AI format them
+    USE_LLM_FOR_EQUIPMENT = False
     
     # Temperature settings by task
+    # Keys are identifier-style literals, which CPython interns at compile time,
+    # so lookups with the agents' literal task names already hit by identity.
     TASK_TEMPERATURES = {
         "scope_and_purpose": 0.5,      # Lower for consistency
         "reference_section": 0.3,      # Very low for accuracy
@@ -29,17 +38,27 @@ class AgentConfig:
         "test_result_summary": 0.3,    # Low for data extraction accuracy
         "protocol_deviations": 0.4,    # Low-medium for structured formatting
         "defective_unit_investigations": 0.4,  # Low-medium for investigation reports
-        "conclusion": 0.5              # Medium for analysis and synthesis
+        "conclusion": 0.5,             # Medium for analysis and synthesis
+        "batched_sections": 0.4,       # Low-medium for combined 4.1/4.2/4.4 call
+        "equipment_used": 0.3          # Low for table formatting (USE_LLM_FOR_EQUIPMENT only)
     }
     
-    # Content limits
+    # Content limits (constants for hot paths that slice prompt input)
+    PROTOCOL_CONTENT_LIMIT = 3000      # Characters for scope/purpose
+    REPORT_CONTENT_LIMIT = 4000        # Characters for reference scanning
+    PROCEDURE_CONTENT_LIMIT = 4000     # Characters for procedure summary
+    COMPLETE_REPORT_LIMIT = 6000       # Characters for acronyms scanning
+    PROTOCOL_ANALYSIS_LIMIT = 2000     # Characters for quick analysis
+    DEVIATIONS_CONTENT_LIMIT = 5000    # Characters for deviation data processing
+    
+    # Content limits by name, for dynamic lookups
     CONTENT_LIMITS = {
-        "protocol_content": 3000,      # Characters for scope/purpose
-        "report_content": 4000,        # Characters for reference scanning
-        "procedure_content": 4000,     # Characters for procedure summary
-        "complete_report": 6000,       # Characters for acronyms scanning
-        "protocol_analysis": 2000,     # Characters for quick analysis
-        "deviations_content": 5000     # Characters for deviation data processing
+        "protocol_content": PROTOCOL_CONTENT_LIMIT,
+        "report_content": REPORT_CONTENT_LIMIT,
+        "procedure_content": PROCEDURE_CONTENT_LIMIT,
+        "complete_report": COMPLETE_REPORT_LIMIT,
+        "protocol_analysis": PROTOCOL_ANALYSIS_LIMIT,
+        "deviations_content": DEVIATIONS_CONTENT_LIMIT
     }
     
     # Target specifications
@@ -62,6 +81,18 @@ class AgentConfig:
         """Get temperature setting for a specific task"""
         return cls.TASK_TEMPERATURES.get(task_name, 0.7)
     
+    @staticmethod
+    def supports_thinking_budget(model: str, thinking_budget: int) -> bool:
+        """
+        Whether a model accepts a thinking_config with this budget
+        
+        Only Gemini 2.5 models think; of those only Flash and Flash-Lite can
+        turn thinking off (budget 0), Pro always thinks
+        """
+        if not model.startswith("gemini-2.5"):
+            return False
+        return thinking_budget > 0 or "flash" in model
+    
     @classmethod
     def get_content_limit(cls, content_type: str) -> int:
         """Get content limit for a specific content type"""
@@ -1,11 +1,102 @@
 import re
-import tempfile
-import os
-from typing import Dict, Any, List, Optional
+import asyncio
+import zipfile
+from dataclasses import dataclass, field
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO, Dict, Any, Iterator, List, Optional, Tuple
 from fastapi import UploadFile
-from docx import Document
-from docx.table import Table
-from docx.text.paragraph import Paragraph
+from lxml import etree
+
+
+# WordprocessingML 命名空间
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_BODY_TAG = W + 'body'
+_PARAGRAPH_TAG = W + 'p'
+_TABLE_TAG = W + 'tbl'
+_RUN_TAG = W + 'r'
+_HYPERLINK_TAG = W + 'hyperlink'
+_TEXT_TAG = W + 't'
+_BREAK_TAG = W + 'br'
+_TYPE_ATTR = W + 'type'
+# 其余run内元素对应的文本（与python-docx的CT_R.text一致）
+_RUN_CHAR_TAGS = {W + 'tab': '\t', W + 'ptab': '\t', W + 'cr': '\n', W + 'noBreakHyphen': '-'}
+_ROW_TAG = W + 'tr'
+_CELL_TAG = W + 'tc'
+_CELL_PROPS_TAG = W + 'tcPr'
+_GRID_SPAN_TAG = W + 'gridSpan'
+_VMERGE_TAG = W + 'vMerge'
+_VAL_ATTR = W + 'val'
+_OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+# 上传文档的XML不解析实体、不访问网络（与python-docx一致；lxml 5.0之前默认会解析外部实体，存在XXE风险）
+_SAFE_PARSER_OPTIONS = {'resolve_entities': False, 'no_network': True}
+_SAFE_XML_PARSER = etree.XMLParser(**_SAFE_PARSER_OPTIONS)
+
+# 章节编号格式: "1.0 PURPOSE" / "1.0. PURPOSE" / "1.0: PURPOSE"
+# 等价于原先按顺序尝试的三个模式（"1.0 X" 已被 "\.?\s*" 分支覆盖），一次匹配完成
+_SECTION_RE = re.compile(r'^(\d+\.\d+)(?:\.?|\s*:)\s*(.*)$')
+# 无编号时识别的常见章节标题
+_SECTION_TITLES = [
+    'Purpose', 'Scope', 'Background', 'Test Method Summary', 'References', 
+    'Definitions', 'Responsibility', 'Materials', 'Equipment', 
+    'General Instructions', 'Procedure', 'Acceptance Criteria',
+    'Device Under Test Configuration', 'Test Consumables', 
+    'Test Method', 'Test Setup', 'Test Execution', 'Data Analysis'
+]
+# 所有标题合成一个不区分大小写的子串匹配（与原先逐个 `in` 判断等价）
+_SECTION_TITLE_RE = re.compile('|'.join(map(re.escape, _SECTION_TITLES)), re.IGNORECASE)
+# 章节标题 -> 索引号（按优先级排序，键已转为小写）
+_SECTION_INDEX = [
+    ('purpose', 1),
+    ('scope', 2),
+    ('background', 3),
+    ('test method summary', 4),
+    ('references', 5),
+    ('definitions', 6),
+    ('responsibility', 7),
+    ('materials', 8),
+    ('device under test configuration', 9),
+    ('test consumables', 10),
+    ('equipment', 11),
+    ('general instructions', 12),
+    ('procedure', 13),
+    ('test method', 14),
+    ('test setup', 15),
+    ('test execution', 16),
+    ('data analysis', 17),
+    ('acceptance criteria', 18),
+]
+# 停止解析的标题词（小写）：APPENDICES / APPENDIX / ATTACHMENTS / 附录
+_STOP_WORDS = frozenset({'appendices', 'appendix', '附录', 'attachments'})
+# 停止标题行的首字符（小写），编号形式 "1.0 APPENDICES" 则以数字开头
+_STOP_TITLE_FIRST_CHARS = ('a', '附')
+
+
+@dataclass
+class Section:
+    """
+    解析过程中的章节状态
+    title: 主章节标题（子章节为None）
+    items: 按文档顺序排列的 (类型, 内容) 列表，类型为 "text" 或 "table"
+    """
+    title: Optional[str] = None
+    items: List[Tuple[str, Any]] = field(default_factory=list)
+    
+    def to_dict(self) -> Any:
+        """
+        转换为对外的parsed_data格式：
+        - 主章节: {"title": ..., "content_1": ..., ...}
+        - 只有标题行的子章节: 标题行文本
+        - 有内容的子章节: {"content_1": 标题行文本, "content_2": ..., ...}
+        表格内容为 {"type": "table", "data": [...]}
+        """
+        if self.title is None and len(self.items) == 1:
+            return self.items[0][1]
+        
+        data = {} if self.title is None else {"title": self.title}
+        for i, (kind, payload) in enumerate(self.items, 1):
+            data[f"content_{i}"] = {"type": "table", "data": payload} if kind == "table" else payload
+        return data
 
 
 class DocumentParser:
@@ -18,305 +109,329 @@ class DocumentParser:
     
     def __init__(self):
         self.parsed_data = {}
+        self.sections: Dict[str, Section] = {}
         self.current_section = None
-        self.content_counter = {}
         self.stop_parsing = False
     
     async def parse_document(self, file: UploadFile) -> Dict[str, Any]:
-        """解析上传的Word文档"""
+        """解析上传的Word文档（读取和解析都在线程池中执行，不阻塞事件循环）"""
+        loop = asyncio.get_running_loop()
+        if hasattr(file, 'file'):
+            # UploadFile：直接在工作线程中读取其临时文件，zipfile只读取目录和document.xml，
+            # 读取与iterparse解析交替进行，不必先把整个文件读入内存
+            await file.seek(0)
+            return await loop.run_in_executor(None, self.parse_file, file.file)
+        # 其他只提供异步read()的文件对象
+        contents = await file.read()
+        return await loop.run_in_executor(None, self.parse_bytes, contents)
+    
+    def parse_bytes(self, contents: bytes) -> Dict[str, Any]:
+        """解析Word文档字节内容（同步、CPU密集）"""
+        return self.parse_file(BytesIO(contents))
+    
+    def parse_file(self, docx_file: BinaryIO) -> Dict[str, Any]:
+        """解析可随机访问的Word文档文件对象（同步、CPU密集）"""
         try:
-            # 读取文件内容
-            contents = await file.read()
+            # 解析文档结构
+            self.sections = {}
+            self.current_section = None
+            self.stop_parsing = False  # 停止解析标志
             
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                tmp_file.write(contents)
-                tmp_file.flush()
-                tmp_file_path = tmp_file.name
+            # 循环内用到的方法先绑定为局部变量
+            process_paragraph = self._process_paragraph
+            process_table = self._process_table
             
-            try:
-                # 加载Word文档
-                doc = Document(tmp_file_path)
-                
-                # 解析文档结构
-                self.parsed_data = {}
-                self.current_section = None
-                self.content_counter = {}
-                self.stop_parsing = False  # 停止解析标志
+            # 流式遍历正文中的顶层段落和表格（不构建完整DOM）
+            for kind, value in self._iter_body_elements(docx_file):
+                if kind == 'p':  # 段落
+                    process_paragraph(value)
+                else:  # 表格
+                    process_table(value)
                 
-                # 遍历文档中的所有元素
-                for element in doc.element.body:
-                    # 检查是否应该停止解析
-                    if self.stop_parsing:
-                        print("📋 遇到APPENDICES章节，停止解析")
-                        break
-                        
-                    if element.tag.endswith('p'):  # 段落
-                        paragraph = Paragraph(element, doc.element.body)
-                        self._process_paragraph(paragraph)
-                    elif element.tag.endswith('tbl'):  # 表格
-                        table = Table(element, doc.element.body)
-                        self._process_table(table)
-                
-                return self.parsed_data
-                
-            finally:
-                # 清理临时文件
-                if os.path.exists(tmp_file_path):
-                    os.unlink(tmp_file_path)
+                # 检查是否应该停止解析
+                if self.stop_parsing:
+                    print("📋 遇到APPENDICES章节，停止解析")
+                    break
+            
+            self.parsed_data = {section_num: section.to_dict() for section_num, section in self.sections.items()}
+            return self.parsed_data
                     
         except Exception as e:
             raise Exception(f"解析文档失败: {str(e)}")
     
-    def _process_paragraph(self, paragraph: Paragraph):
+    def _iter_body_elements(self, docx_file: BinaryIO) -> Iterator[Tuple[str, Any]]:
+        """
+        用lxml iterparse流式读取word/document.xml
+        依次产出正文顶层的 ('p', 段落文本) 或 ('tbl', 表格元素)
+        表格元素只在本次yield期间有效（之后会被清除），单元格由_process_table按需读取
+        处理完的元素立即释放，内存占用不随文档大小增长
+        """
+        # 循环内用到的常量和方法先绑定为局部变量
+        body_tag = _BODY_TAG
+        paragraph_tag = _PARAGRAPH_TAG
+        paragraph_text = self._paragraph_text
+        
+        with zipfile.ZipFile(docx_file) as package:
+            with package.open(self._main_document_part(package)) as xml_file:
+                for _, elem in etree.iterparse(xml_file, events=('end',), tag=(_PARAGRAPH_TAG, _TABLE_TAG),
+                                               **_SAFE_PARSER_OPTIONS):
+                    parent = elem.getparent()
+                    # 表格单元格内的段落/嵌套表格由外层表格处理
+                    if parent is None or parent.tag != body_tag:
+                        continue
+                    
+                    if elem.tag == paragraph_tag:
+                        yield 'p', paragraph_text(elem)
+                    else:
+                        yield 'tbl', elem
+                    
+                    # 释放已处理的元素及其之前的兄弟节点
+                    elem.clear(keep_tail=True)
+                    while elem.getprevious() is not None:
+                        del parent[0]
+    
+    @staticmethod
+    def _main_document_part(package: zipfile.ZipFile) -> str:
+        """从_rels/.rels中找到主文档部件路径（通常为word/document.xml）"""
+        try:
+            rels = etree.fromstring(package.read('_rels/.rels'), _SAFE_XML_PARSER)
+            for rel in rels:
+                if rel.get('Type') == _OFFICE_DOCUMENT_REL:
+                    return rel.get('Target').lstrip('/')
+        except KeyError:
+            pass
+        return 'word/document.xml'
+    
+    @staticmethod
+    def _paragraph_text(paragraph) -> str:
+        """
+        拼接段落中的文本（与python-docx的Paragraph.text一致）
+        只读取段落直接子级的w:r和w:hyperlink/w:r，以及这些run的直接子元素：
+        文本框(w:txbxContent)、修订插入(w:ins)等嵌套内容不计入正文
+        """
+        parts = []
+        # 不用iter()/itertext()/XPath string()：会遍历所有后代，混入文本框、修订和w:instrText等非正文文本
+        # 标签名均为模块级常量，循环内只取一次tag，不再逐次拼接命名空间字符串
+        for child in paragraph:
+            tag = child.tag
+            if tag == _RUN_TAG:
+                runs = (child,)
+            elif tag == _HYPERLINK_TAG:
+                runs = child.iterchildren(_RUN_TAG)
+            else:
+                continue
+            
+            for run in runs:
+                for node in run:
+                    tag = node.tag
+                    if tag == _TEXT_TAG:
+                        parts.append(node.text or '')
+                    elif tag == _BREAK_TAG:
+                        # 分页符/分栏符没有文本，只有换行符(textWrapping)计为换行
+                        if node.get(_TYPE_ATTR, 'textWrapping') == 'textWrapping':
+                            parts.append('\n')
+                    elif tag in _RUN_CHAR_TAGS:
+                        parts.append(_RUN_CHAR_TAGS[tag])
+        return ''.join(parts)
+    
+    def _table_rows(self, table) -> List[List[str]]:
+        """
+        提取表格每行的单元格文本
+        与python-docx的row.cells一致：横向合并(gridSpan)的单元格重复，纵向合并(vMerge)沿用上一行的值
+        """
+        rows = []
+        previous_row: List[str] = []
+        for tr in table.iterchildren(_ROW_TAG):
+            row = []
+            for tc in tr.iterchildren(_CELL_TAG):
+                tc_pr = tc.find(_CELL_PROPS_TAG)
+                span = 1
+                continued = False
+                if tc_pr is not None:
+                    grid_span = tc_pr.find(_GRID_SPAN_TAG)
+                    if grid_span is not None:
+                        span = int(grid_span.get(_VAL_ATTR, 1))
+                    v_merge = tc_pr.find(_VMERGE_TAG)
+                    continued = v_merge is not None and v_merge.get(_VAL_ATTR, 'continue') == 'continue'
+                
+                if continued and len(previous_row) > len(row):
+                    text = previous_row[len(row)]
+                else:
+                    text = '\n'.join(self._paragraph_text(p) for p in tc.iterchildren(_PARAGRAPH_TAG))
+                row.extend([text] * span)
+            rows.append(row)
+            previous_row = row
+        return rows
+    
+    def _process_paragraph(self, paragraph_text: str):
         """处理段落内容"""
-        text = paragraph.text.strip()
+        text = paragraph_text.strip()
         if not text:
             return
         
+        # 快速预判：绝大多数段落既不是APPENDICES也不是章节标题，可以跳过完整检查
+        first_char = text[:1]
+        
         # 检查是否遇到APPENDICES章节，如果是则停止解析
-        if self._should_stop_parsing(text):
+        # （_should_stop_parsing只对以a/附或数字开头的文本返回True）
+        if (first_char.isdigit() or first_char.lower() in _STOP_TITLE_FIRST_CHARS) and self._should_stop_parsing(text):
             self.stop_parsing = True
             return
             
-        # 检查是否为章节标题
-        section_match = self._extract_section_number(text)
+        # 检查是否为章节标题（编号标题以数字开头；无编号标题长度<100）
+        section_match = self._extract_section_number(text) if first_char.isdigit() or len(text) < 100 else None
         
         if section_match:
-            section_num, title = section_match
+            section_num, title, is_main = section_match
             
-            if self._is_main_section(section_num):
+            self.current_section = section_num
+            if is_main:
                 # 主章节 (如 1.0, 2.0)
-                self.current_section = section_num
-                self.parsed_data[section_num] = {"title": title}
-                self.content_counter[section_num] = 0
+                self.sections[section_num] = Section(title=title)
             else:
-                # 子章节 (如 1.1, 1.2)
-                self.current_section = section_num
-                self.parsed_data[section_num] = text
-                self.content_counter[section_num] = 0
+                # 子章节 (如 1.1, 1.2)，标题行文本作为第一项内容
+                self.sections[section_num] = Section(items=[("text", text)])
         else:
             # 普通内容，归属到当前章节
             if self.current_section:
                 self._add_content_to_section(self.current_section, text, "text")
     
-    def _process_table(self, table: Table):
+    def _process_table(self, table):
         """处理表格内容"""
+        # 不属于任何章节的表格（如封面、修订记录）直接跳过，不读取单元格
         if not self.current_section:
             return
             
-        # 解析表格数据
+        # 解析表格数据（每行单元格只遍历一次）
+        table_rows = self._table_rows(table)
         table_data = []
         
         # 获取表头
-        if table.rows:
-            headers = []
-            first_row = table.rows[0]
-            for cell in first_row.cells:
-                headers.append(cell.text.strip())
+        if table_rows:
+            headers = tuple(cell_text.strip() for cell_text in table_rows[0])
+            header_count = len(headers)
+            
+            def column_name(i: int) -> str:
+                """超出表头的列命名为 Column_N"""
+                return headers[i] if i < header_count else f"Column_{i+1}"
             
             # 获取数据行
-            for row in table.rows[1:]:
-                row_data = {}
-                for i, cell in enumerate(row.cells):
-                    header = headers[i] if i < len(headers) else f"Column_{i+1}"
-                    row_data[header] = cell.text.strip()
-                table_data.append(row_data)
+            table_data = [
+                {column_name(i): cell_text.strip() for i, cell_text in enumerate(row)}
+                for row in table_rows[1:]
+            ]
         
         # 将表格添加到当前章节
         self._add_content_to_section(self.current_section, table_data, "table")
     
     def _extract_section_number(self, text: str) -> Optional[tuple]:
-        """提取章节编号和标题"""
+        """提取章节编号、标题，以及是否为主章节 (如 1.0, 2.0)"""
         # 首先尝试标准格式: "1.0 PURPOSE" 或 "1.1 Some content"
-        numbered_patterns = [
-            r'^(\d+\.\d+)\s+(.*)$',  # 1.0 PURPOSE
-            r'^(\d+\.\d+)\.?\s*(.*)$',  # 1.0. PURPOSE  
-            r'^(\d+\.\d+)\s*:\s*(.*)$',  # 1.0: PURPOSE
-        ]
-        
-        for pattern in numbered_patterns:
-            match = re.match(pattern, text)
-            if match:
-                section_num = match.group(1)
-                title = match.group(2).strip()
-                return (section_num, title)
+        match = _SECTION_RE.match(text)
+        if match:
+            section_num = match.group(1)
+            return (section_num, match.group(2).strip(), section_num.endswith('.0'))
         
-        # 如果没有数字格式，尝试识别常见的章节标题
-        section_titles = [
-            'Purpose', 'Scope', 'Background', 'Test Method Summary', 'References', 
-            'Definitions', 'Responsibility', 'Materials', 'Equipment', 
-            'General Instructions', 'Procedure', 'Acceptance Criteria',
-            'Device Under Test Configuration', 'Test Consumables', 
-            'Test Method', 'Test Setup', 'Test Execution', 'Data Analysis'
-        ]
-        
-        # 检查是否为章节标题（单独一行的标题）
+        # 如果没有数字格式，尝试识别常见的章节标题（单独一行的标题）
         text_clean = text.strip()
-        if len(text_clean) < 100 and any(title.lower() in text_clean.lower() for title in section_titles):
+        if len(text_clean) < 100 and _SECTION_TITLE_RE.search(text_clean):
             # 如果文本很短且包含章节关键词，认为是章节标题
             # 为这些章节分配一个序号
             section_index = self._get_section_index(text_clean)
-            return (f"{section_index}.0", text_clean)
+            return (f"{section_index}.0", text_clean, True)
         
         return None
     
-    def _is_main_section(self, section_num: str) -> bool:
-        """判断是否为主章节 (如 1.0, 2.0)"""
-        return section_num.endswith('.0')
-    
     def _should_stop_parsing(self, text: str) -> bool:
         """检查是否应该停止解析（遇到APPENDICES章节）"""
-        text_lower = text.lower().strip()
+        words = text.lower().split(maxsplit=2)
+        if not words:
+            return False
         
-        # 检查各种APPENDICES的表达方式
-        appendices_patterns = [
-            'appendices',
-            'appendix',
-            '附录',
-            'attachments'
-        ]
+        # 单独的APPENDICES标题行 (如 "APPENDICES", "Appendix A:", "附录A")
+        first_word = words[0].rstrip(':')
+        if first_word in _STOP_WORDS or first_word.startswith('附录'):
+            return True
         
-        # 检查是否为单独的APPENDICES标题行
-        for pattern in appendices_patterns:
-            if text_lower == pattern or text_lower.startswith(pattern + ' ') or text_lower.startswith(pattern + ':'):
-                return True
-        
-        # 检查带编号的appendices (如 "1.0 APPENDICES")
-        if any(pattern in text_lower for pattern in appendices_patterns):
-            # 如果包含appendices相关词汇，且文本较短（可能是标题）
-            if len(text.strip()) < 50:
-                return True
-        
-        return False
+        # 带编号的appendices (如 "1.0 APPENDICES")
+        return first_word[:1].isdigit() and len(words) > 1 and words[1].rstrip(':') in _STOP_WORDS
     
     def _get_section_index(self, section_title: str) -> int:
         """为章节标题分配一个索引号"""
-        section_mapping = {
-            'Purpose': 1,
-            'Scope': 2, 
-            'Background': 3,
-            'Test Method Summary': 4,
-            'References': 5,
-            'Definitions': 6,
-            'Responsibility': 7,
-            'Materials': 8,
-            'Device Under Test Configuration': 9,
-            'Test Consumables': 10,
-            'Equipment': 11,
-            'General Instructions': 12,
-            'Procedure': 13,
-            'Test Method': 14,
-            'Test Setup': 15,
-            'Test Execution': 16,
-            'Data Analysis': 17,
-            'Acceptance Criteria': 18,
-        }
-        
-        # 查找最匹配的章节标题
-        title_lower = section_title.lower()
-        for key, value in section_mapping.items():
-            if key.lower() in title_lower:
-                return value
-        
-        # 如果没找到，使用哈希值生成一个唯一编号
-        return abs(hash(section_title)) % 100 + 20
+        return _lookup_section_index(section_title)
     
     def _add_content_to_section(self, section_num: str, content: Any, content_type: str):
-        """向章节添加内容"""
-        # 如果章节还不存在，创建它
-        if section_num not in self.parsed_data:
-            self.parsed_data[section_num] = {}
-        
-        # 如果是主章节且只有title，需要添加内容区域
-        if isinstance(self.parsed_data[section_num], dict) and "title" in self.parsed_data[section_num]:
-            # 这是主章节，保持title，添加内容
-            pass
-        elif isinstance(self.parsed_data[section_num], str):
-            # 这是子章节，将原文本作为第一个内容
-            original_text = self.parsed_data[section_num]
-            self.parsed_data[section_num] = {"content_1": original_text}
-            self.content_counter[section_num] = 1
-        elif not isinstance(self.parsed_data[section_num], dict):
-            # 初始化为字典
-            self.parsed_data[section_num] = {}
-            self.content_counter[section_num] = 0
-        
-        # 添加新内容
-        self.content_counter[section_num] += 1
-        content_key = f"content_{self.content_counter[section_num]}"
-        
-        if content_type == "table":
-            self.parsed_data[section_num][content_key] = {
-                "type": "table",
-                "data": content
-            }
-        else:
-            self.parsed_data[section_num][content_key] = content
+        """向章节添加内容（章节在识别到标题时已创建）"""
+        self.sections[section_num].items.append((content_type, content))
     
     def format_for_ai_prompt(self) -> str:
         """格式化解析结果为AI可读的提示格式"""
-        formatted_sections = []
+        return ''.join(self.iter_ai_prompt_chunks())
+    
+    def iter_ai_prompt_chunks(self) -> Iterator[str]:
+        """
+        逐块产出format_for_ai_prompt的文本（拼接后与其完全一致）
+        不在内存中构建完整提示，可直接交给StreamingResponse等流式输出
+        """
+        separator = ''
         
-        for section_num in sorted(self.parsed_data.keys(), key=self._sort_section_key):
-            section_data = self.parsed_data[section_num]
-            
-            if isinstance(section_data, str):
-                # 简单文本章节
-                formatted_sections.append(f"## {section_num}\n{section_data}\n")
-                
-            elif isinstance(section_data, dict):
-                if "title" in section_data:
-                    # 主章节有标题
-                    formatted_sections.append(f"## {section_num}: {section_data['title']}\n")
-                    
-                    # 添加其他内容
-                    content_items = [(k, v) for k, v in section_data.items() if k != "title"]
-                    content_items.sort(key=lambda x: self._extract_content_number(x[0]))
-                    
-                    for key, value in content_items:
-                        formatted_sections.append(self._format_content_item(key, value))
-                        
-                else:
-                    # 子章节或内容章节
-                    formatted_sections.append(f"## {section_num}\n")
-                    
-                    content_items = list(section_data.items())
-                    content_items.sort(key=lambda x: self._extract_content_number(x[0]))
-                    
-                    for key, value in content_items:
-                        formatted_sections.append(self._format_content_item(key, value))
+        # 先一次性解析所有章节编号，再按解析结果排序
+        decorated = sorted((self._sort_section_key(section_num), section_num) for section_num in self.sections)
         
-        return "\n".join(formatted_sections)
+        for _, section_num in decorated:
+            section = self.sections[section_num]
+            
+            if section.title is not None:
+                # 主章节有标题
+                yield f"{separator}## {section_num}: {section.title}\n"
+            elif len(section.items) == 1:
+                # 只有标题行的子章节
+                yield f"{separator}## {section_num}\n{section.items[0][1]}\n"
+                separator = '\n'
+                continue
+            else:
+                # 有内容的子章节
+                yield f"{separator}## {section_num}\n"
+            separator = '\n'
+            
+            for kind, payload in section.items:
+                yield separator
+                yield self._format_content_item(kind, payload)
     
-    def _format_content_item(self, key: str, value: Any) -> str:
+    def _format_content_item(self, content_type: str, content: Any) -> str:
         """格式化单个内容项"""
-        if isinstance(value, dict) and value.get("type") == "table":
+        if content_type == "table":
             # 表格内容
-            table_data = value.get("data", [])
-            if table_data:
-                formatted_table = "### 表格内容:\n"
-                # 简化表格显示
-                for i, row in enumerate(table_data[:3]):  # 只显示前3行作为示例
-                    formatted_table += f"行{i+1}: {row}\n"
-                if len(table_data) > 3:
-                    formatted_table += f"... (共{len(table_data)}行数据)\n"
-                return formatted_table
+            if content:
+                parts = ["### 表格内容:\n"]
+                # 简化表格显示：只显示前3行作为示例
+                parts.extend(f"行{i+1}: {row}\n" for i, row in enumerate(content[:3]))
+                if len(content) > 3:
+                    parts.append(f"... (共{len(content)}行数据)\n")
+                return ''.join(parts)
             else:
                 return "### 空表格\n"
         else:
             # 文本内容
-            return f"{value}\n"
+            return f"{content}\n"
     
     def _sort_section_key(self, section_num: str) -> tuple:
         """生成章节排序的键值"""
         parts = section_num.split('.')
         return (int(parts[0]), int(parts[1]))
+
+
+@lru_cache(maxsize=256)
+def _lookup_section_index(section_title: str) -> int:
+    """查找章节标题对应的索引号（结果缓存，同一标题只计算一次）"""
+    # 查找最匹配的章节标题（按_SECTION_INDEX的优先级顺序）
+    title_lower = section_title.lower()
+    for key, value in _SECTION_INDEX:
+        if key in title_lower:
+            return value
     
-    def _extract_content_number(self, content_key: str) -> int:
-        """从content_N中提取数字N"""
-        match = re.search(r'content_(\d+)', content_key)
-        return int(match.group(1)) if match else 0
+    # 如果没找到，使用哈希值生成一个唯一编号
+    return abs(hash(section_title)) % 100 + 20
 
 
 # 工厂函数
@@ -352,8 +467,9 @@ async def test_document_parser():
                 self.file_path = file_path
             
             async def read(self):
-                with open(self.file_path, 'rb') as f:
-                    return f.read()
+                import aiofiles
+                async with aiofiles.open(self.file_path, 'rb') as f:
+                    return await f.read()
         
         mock_file = MockUploadFile(file_path)
         parser = DocumentParser()
@@ -0,0 +1,89 @@
+"""
+Equipment Used section renderer for DVT Test Report Generator
+Builds Task 4.6 content (calibration statement, per-log tables or attachment
+references) directly from Excel Parser rows, without an AI call
+"""
+
+from typing import Any, Dict, List, Optional
+
+# Logs with more rows than this are referenced to the attachment instead of inlined
+INLINE_TABLE_MAX_ROWS = 5
+
+# (sheet name, section title, item type) in report order
+EQUIPMENT_CATEGORIES = [
+    ("EQUIPMENT LOG", "• Equipment Used", "equipment"),
+    ("SOFTWARE LOG", "• Software Used", "software"),
+    ("MATERIAL LOG", "• Materials Used", "materials"),
+]
+
+
+def calibration_statement(calibration_verified: bool) -> str:
+    """Return the calibration verification sentence"""
+    if calibration_verified:
+        return "All equipment used in this testing was verified as calibrated at the time of use."
+    return "Equipment calibration status was not verified at the time of use."
+
+
+def attachment_name(report_config: Optional[Dict[str, Any]] = None) -> str:
+    """Return the raw data attachment filename for the report"""
+    report_num = report_config.get('report_number', 'RPT-XXX') if report_config else 'RPT-XXX'
+    revision = report_config.get('revision', '001') if report_config else '001'
+    return f"{report_num} rev{revision} Attachment - Raw Data.xlsx"
+
+
+def markdown_table(rows: List[Dict[str, Any]]) -> str:
+    """Render rows as a markdown table using the first row's keys as headers"""
+    if not rows:
+        return ""
+
+    headers = list(rows[0].keys())
+    lines = [
+        "| " + " | ".join(str(h) for h in headers) + " |",
+        "|" + "|".join(" --- " for _ in headers) + "|",
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(str(row.get(h, "")).strip() for h in headers) + " |")
+    return "\n".join(lines)
+
+
+def render_equipment_section(
+    equipment: List[Dict[str, Any]],
+    software: List[Dict[str, Any]],
+    material: List[Dict[str, Any]],
+    calibration_verified: bool = True,
+    report_config: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Render the Equipment Used section
+
+    Args:
+        equipment: EQUIPMENT LOG rows
+        software: SOFTWARE LOG rows
+        material: MATERIAL LOG rows
+        calibration_verified: Whether equipment calibration was verified
+        report_config: Report configuration (number, revision) for the attachment name
+
+    Returns:
+        Markdown content with all three sub-sections in report order
+    """
+    logs = {"EQUIPMENT LOG": equipment, "SOFTWARE LOG": software, "MATERIAL LOG": material}
+    parts = [calibration_statement(calibration_verified), ""]
+
+    for sheet_name, section_title, item_type in EQUIPMENT_CATEGORIES:
+        rows = logs[sheet_name] or []
+        parts.append(section_title)
+
+        if not rows:
+            parts.append(f"No {item_type} were recorded in the {item_type} log.")
+        else:
+            parts.append(f"The {item_type} log recorded the following items:")
+            if len(rows) <= INLINE_TABLE_MAX_ROWS:
+                parts.extend(["", markdown_table(rows)])
+            else:
+                parts.append(
+                    f"\nDetailed {item_type} information is provided in {attachment_name(report_config)}."
+                )
+
+        parts.append("")
+
+    return "\n".join(parts)
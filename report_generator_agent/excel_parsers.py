@@ -3,11 +3,261 @@ Excel Parsers for DVT Test Report Generator
 Dictionary-based parsers for AI-friendly data processing
 """
 
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import pickle
+import threading
 import openpyxl
-from typing import Dict, List, Any, Optional, Set
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import wraps
+from itertools import chain, islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
 import tempfile
+import shutil
 import os
-import re
+from datetime import date, datetime, time
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # optional: fall back to openpyxl's read-only reader
+    CalamineWorkbook = None
+
+logger = logging.getLogger(__name__)
+
+# Chunk size used when copying uploads to a temporary file (128 KB)
+UPLOAD_COPY_CHUNK_SIZE = 1 << 17
+
+# Stop reading a sheet after this many consecutive empty rows (Excel often reports a
+# used range far past the real data, and read-only sheets yield every one of those rows)
+EMPTY_ROW_STREAK_LIMIT = 32
+
+# Where CombinedExcelParser keeps parsed results per workbook; bump the version
+# whenever the structure of the parsed results changes
+PARSED_RESULTS_CACHE_DIR = Path(".cache/excel_parsers")
+PARSED_RESULTS_CACHE_VERSION = 2
+
+def _calamine_value(value: Any) -> Any:
+    """
+    Convert a python-calamine cell value to what openpyxl (data_only) returns
+    
+    calamine reports empty cells as "", every number as float and date-only
+    cells as date; openpyxl gives None, int for whole numbers and datetime
+    """
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if type(value) is date:
+        return datetime.combine(value, time())
+    return value
+
+
+class _CalamineSheet:
+    """Worksheet wrapper exposing the iter_rows(values_only=True) subset the parsers use"""
+    
+    def __init__(self, workbook: "_CalamineWorkbookReader", name: str):
+        self._workbook = workbook
+        self.title = name
+    
+    def iter_rows(self, values_only: bool = True) -> Iterator[tuple]:
+        for row in self._workbook._sheet_rows(self.title):
+            yield tuple(_calamine_value(value) for value in row)
+
+
+class _CalamineWorkbookReader:
+    """
+    Read-only workbook backed by python-calamine (Rust), with the openpyxl
+    read-only interface the parsers use: sheetnames, workbook[name], close()
+    
+    Sheets are read from A1 (skip_empty_area=False) so column positions match
+    openpyxl. The lock serializes sheet reads, since several parsers may read
+    one shared workbook from different threads.
+    """
+    
+    def __init__(self, file_path: str):
+        self._workbook = CalamineWorkbook.from_path(file_path)
+        self._lock = threading.Lock()
+        self.sheetnames = list(self._workbook.sheet_names)
+    
+    def __getitem__(self, name: str) -> _CalamineSheet:
+        if name not in self.sheetnames:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return _CalamineSheet(self, name)
+    
+    def _sheet_rows(self, name: str) -> List[list]:
+        with self._lock:
+            return self._workbook.get_sheet_by_name(name).to_python(skip_empty_area=False)
+    
+    def close(self) -> None:
+        """Nothing to release: calamine reads what it needs while opening and per sheet"""
+
+
+def _open_workbook(file_path: str):
+    """Open a workbook for reading with python-calamine if installed, else openpyxl in read-only mode"""
+    if CalamineWorkbook is not None:
+        return _CalamineWorkbookReader(file_path)
+    return openpyxl.load_workbook(file_path, data_only=True, read_only=True, keep_links=False)
+
+
+# Number of open workbooks kept for sibling parsers reading the same file
+WORKBOOK_CACHE_SIZE = 4
+
+# (absolute path, mtime) -> read-only workbook, most recently used last
+_workbook_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_workbook_cache_lock = threading.Lock()
+# Cache key -> lock held while that workbook is being loaded
+_workbook_load_locks: Dict[tuple, threading.Lock] = {}
+
+
+def _load_workbook_cached(file_path: str, mtime: float):
+    """
+    Return a shared read-only workbook for a file, loading it on first use
+    
+    The four DVT parsers all read the same upload, so the workbook (zip directory,
+    shared strings, styles) is loaded once instead of once per parser. Keying on
+    mtime means a rewritten file is loaded again. Read-only workbooks cannot be
+    modified, and each iter_rows() call streams its own pass over the sheet, so
+    one workbook can be read by several parsers.
+    
+    Evicted entries are not closed (another parser may still be reading them);
+    call invalidate_workbook_cache() once parsing of a file is finished.
+    """
+    key = (os.path.abspath(file_path), mtime)
+    with _workbook_cache_lock:
+        workbook = _workbook_cache.get(key)
+        if workbook is not None:
+            _workbook_cache.move_to_end(key)
+            return workbook
+        # Parsers asking for the same file at the same time wait for one load
+        load_lock = _workbook_load_locks.setdefault(key, threading.Lock())
+    
+    with load_lock:
+        with _workbook_cache_lock:
+            workbook = _workbook_cache.get(key)
+            if workbook is not None:
+                _workbook_cache.move_to_end(key)
+                return workbook
+        
+        try:
+            workbook = _open_workbook(file_path)
+            with _workbook_cache_lock:
+                _workbook_cache[key] = workbook
+                _workbook_cache.move_to_end(key)
+                while len(_workbook_cache) > WORKBOOK_CACHE_SIZE:
+                    _workbook_cache.popitem(last=False)
+        finally:
+            # Also on failure (e.g. a corrupt upload), or the lock of every such path is kept forever
+            with _workbook_cache_lock:
+                _workbook_load_locks.pop(key, None)
+    return workbook
+
+
+def invalidate_workbook_cache(file_path: Optional[str] = None) -> None:
+    """
+    Close and drop cached workbooks for one file, or for all files if no path is given
+    
+    Call this when the parsers are done with a file (the temporary upload copies
+    do this themselves) so the file handle and parsed workbook are released.
+    """
+    with _workbook_cache_lock:
+        if file_path is None:
+            keys = list(_workbook_cache)
+        else:
+            path = os.path.abspath(file_path)
+            keys = [key for key in _workbook_cache if key[0] == path]
+        workbooks = [_workbook_cache.pop(key) for key in keys]
+    
+    for workbook in workbooks:
+        workbook.close()
+
+
+def _coerce_cell(value: Any) -> Any:
+    """
+    Normalize a cell value for row dicts without stringifying everything
+    
+    None becomes "", strings are stripped, numbers and booleans are kept as-is
+    (they format the same in f-strings), anything else (dates, times) is converted to str
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)):
+        return value
+    return str(value).strip()
+
+
+def _column_name(value: Any, col: int) -> str:
+    """
+    Header cell value -> column name; empty or blank headers become ColumnN
+    
+    Checks `is None` rather than truthiness so headers such as 0 or False are kept
+    """
+    name = "" if value is None else str(value).strip()
+    return name or f"Column{col}"
+
+
+def _cached_on_parsed_data(method):
+    """
+    Cache a no-argument parser method's result until parsed_data is replaced
+    
+    The cached value is tied to the parsed_data object itself (identity, not
+    equality), so re-parsing or assigning a new dict recomputes it. Callers
+    must not mutate parsed_data in place.
+    """
+    @wraps(method)
+    def wrapper(self):
+        cached = self._result_cache.get(method.__name__)
+        if cached is not None and cached[0] is self.parsed_data:
+            return cached[1]
+        result = method(self)
+        self._result_cache[method.__name__] = (self.parsed_data, result)
+        return result
+    return wrapper
+
+
+class _LazyRecords(Mapping):
+    """
+    Read-only primary key -> row dict mapping whose row dicts are built on first access
+    
+    Parsing only keeps each row's value tuple; the row dict for a key is built once,
+    when that key is first read, and the same dict is returned afterwards. Callers
+    that only need counts or the analysis never pay for building the row dicts.
+    """
+    
+    __slots__ = ("_raw_rows", "_columns", "_records")
+    
+    def __init__(self, raw_rows: Dict[str, tuple], columns: List[str]):
+        self._raw_rows = raw_rows
+        self._columns = columns
+        self._records: Dict[str, Dict[str, Any]] = {}
+    
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = BaseExcelParser._row_to_dict(self._columns, self._raw_rows[key])
+        return record
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._raw_rows
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw_rows)
+    
+    def __len__(self) -> int:
+        return len(self._raw_rows)
+    
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+    
+    def __reduce__(self):
+        # Pickle the value tuples, not the row dicts (parse results are cached on disk)
+        return (_LazyRecords, (self._raw_rows, self._columns))
 
 
 class BaseExcelParser:
@@ -17,6 +267,10 @@ class BaseExcelParser:
     
     def __init__(self):
         self.parsed_data = {}
+        # (sheet name, candidate columns) -> candidate columns present in that sheet
+        self._column_lookup_cache: Dict[tuple, List[str]] = {}
+        # method name -> (parsed_data it was computed from, result), see _cached_on_parsed_data
+        self._result_cache: Dict[str, tuple] = {}
     
     async def parse_uploaded_file(self, uploaded_file) -> Dict[str, Dict[str, Any]]:
         """
@@ -28,45 +282,209 @@ class BaseExcelParser:
         Returns:
             Dictionary with parsed sheet data
         """
+        temp_path = None
         try:
-            # Reset file pointer and read content
-            if hasattr(uploaded_file, 'seek') and hasattr(uploaded_file, 'read'):
-                await uploaded_file.seek(0)
-                content = await uploaded_file.read()
-            elif hasattr(uploaded_file, 'file'):
-                uploaded_file.file.seek(0)
-                content = uploaded_file.file.read()
-            else:
-                raise ValueError("Unsupported file object type")
+            temp_path = await self.copy_upload_to_temp(uploaded_file)
             
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
-                temp_file.write(content)
-                temp_file.flush()
-                
-                # Parse the temporary file
-                results = self.parse_excel_file(temp_file.name)
-                
-                # Cleanup
-                os.unlink(temp_file.name)
-                
-                return results
+            # Parse the temporary file (closed and flushed above) in a worker thread,
+            # so openpyxl does not block the event loop
+            return await asyncio.to_thread(self.parse_excel_file, temp_path)
                 
         except Exception as e:
-            print(f"❌ Error parsing uploaded file: {str(e)}")
+            logger.error("Error parsing uploaded file: %s", e)
             return {}
+        
+        finally:
+            # Cleanup, also when parsing fails
+            self.remove_temp_file(temp_path)
+    
+    @classmethod
+    async def parse_uploaded_files(cls, uploaded_files: List[Any]) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Parse several uploaded files concurrently, one parser instance per file
+        
+        Uploads are copied to temporary files, then parse_excel_file runs for each
+        file in a thread pool. This only pays off when two or more files are
+        parsed in one call: openpyxl releases the GIL during zip decompression,
+        so decompression of one workbook overlaps with XML parsing of another.
+        
+        Args:
+            uploaded_files: FastAPI UploadFile or similar file objects
+            
+        Returns:
+            Parsed sheet data per file, in input order ({} for files that failed)
+        """
+        temp_paths: List[Optional[str]] = []
+        try:
+            for uploaded_file in uploaded_files:
+                try:
+                    temp_paths.append(await cls.copy_upload_to_temp(uploaded_file))
+                except Exception as e:
+                    logger.error("Error parsing uploaded file: %s", e)
+                    temp_paths.append(None)
+            
+            def parse(temp_path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+                return cls().parse_excel_file(temp_path) if temp_path else {}
+            
+            loop = asyncio.get_running_loop()
+            max_workers = max(1, min(len(temp_paths), os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(await asyncio.gather(
+                    *(loop.run_in_executor(executor, parse, temp_path) for temp_path in temp_paths)
+                ))
+        
+        finally:
+            for temp_path in temp_paths:
+                cls.remove_temp_file(temp_path)
+    
+    @staticmethod
+    async def copy_upload_to_temp(uploaded_file) -> str:
+        """
+        Copy an upload to a closed temporary .xlsx file in chunks (instead of reading it into memory) and return its path
+        
+        Run several parsers' parse_excel_file on the one copy so they share the cached
+        workbook, then release it with remove_temp_file()
+        """
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
+            try:
+                # Reset file pointer and copy content
+                if hasattr(uploaded_file, 'seek') and hasattr(uploaded_file, 'read'):
+                    await uploaded_file.seek(0)
+                    while chunk := await uploaded_file.read(UPLOAD_COPY_CHUNK_SIZE):
+                        temp_file.write(chunk)
+                elif hasattr(uploaded_file, 'file'):
+                    uploaded_file.file.seek(0)
+                    shutil.copyfileobj(uploaded_file.file, temp_file, length=UPLOAD_COPY_CHUNK_SIZE)
+                else:
+                    raise ValueError("Unsupported file object type")
+            except Exception:
+                temp_file.close()
+                os.unlink(temp_file.name)
+                raise
+        return temp_file.name
+    
+    @staticmethod
+    def remove_temp_file(temp_path: Optional[str]) -> None:
+        """Drop the file's cached workbook and delete the temporary file if it exists"""
+        if temp_path:
+            invalidate_workbook_cache(temp_path)
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
     
     def parse_excel_file(self, file_path: str) -> Dict[str, Dict[str, Any]]:
         """
-        Parse Excel file - to be implemented by subclasses
+        Parse Excel file: load the (shared) workbook and hand it to parse_workbook
         
         Args:
             file_path: Path to Excel file
             
+        Returns:
+            Dictionary with sheet data ({} if the file cannot be opened)
+        """
+        try:
+            workbook = self._load_workbook(file_path)
+        except Exception as e:
+            logger.error("Error opening Excel file %s: %s", file_path, e)
+            self._set_parsed_data({})
+            return {}
+        return self.parse_workbook(workbook)
+    
+    def parse_workbook(self, workbook) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse an already loaded read-only workbook - to be implemented by subclasses
+        
+        Several parsers can be given the same workbook (see CombinedExcelParser),
+        so implementations must only read from it and must not close it.
+        
+        Args:
+            workbook: Workbook returned by _load_workbook
+            
         Returns:
             Dictionary with sheet data
         """
-        raise NotImplementedError("Subclasses must implement parse_excel_file")
+        raise NotImplementedError("Subclasses must implement parse_workbook")
+    
+    def _set_parsed_data(self, parsed_data: Dict[str, Any]) -> None:
+        """Store newly parsed data and drop everything derived from the previous parse"""
+        self._column_lookup_cache = {}
+        self._result_cache = {}
+        self.parsed_data = parsed_data
+    
+    @staticmethod
+    def _load_workbook(file_path: str):
+        """
+        Open a workbook in read-only (streaming) mode with cached formula values
+        
+        Uses python-calamine when it is installed (see _open_workbook), otherwise
+        openpyxl. Read-only worksheets are parsed row by row instead of being
+        loaded into memory, so each sheet must be consumed with a single
+        iter_rows() pass, and sheets that are never accessed are never parsed.
+        External links are not loaded. The workbook is shared with other parsers through
+        _load_workbook_cached, so callers must not close() it; use
+        invalidate_workbook_cache() instead.
+        """
+        return _load_workbook_cached(file_path, os.path.getmtime(file_path))
+    
+    def _match_target_sheets(self, workbook) -> List[tuple]:
+        """
+        Return (sheet name, normalized name) for every sheet that is one of target_sheets
+        
+        Uses only workbook.sheetnames, so no sheet data is read; an empty result
+        means the workbook can be closed without touching any worksheet
+        """
+        matched = []
+        for sheet_name in workbook.sheetnames:
+            normalized_name = self._normalize_sheet_name(sheet_name)
+            if normalized_name in self.target_sheets:
+                matched.append((sheet_name, normalized_name))
+        return matched
+    
+    def _present_columns(self, sheet_name: str, sheet_data: Dict[str, Any], candidates: tuple) -> List[str]:
+        """
+        Return the candidate column names that exist in a parsed sheet, in candidate order
+        
+        Every row dict of a sheet has the same keys, so this is resolved once per
+        sheet and cached until the next parse_excel_file call
+        """
+        key = (sheet_name, candidates)
+        present = self._column_lookup_cache.get(key)
+        if present is None:
+            columns = set(sheet_data["columns"])
+            present = [col for col in candidates if col in columns]
+            self._column_lookup_cache[key] = present
+        return present
+    
+    def _rows_until_empty_streak(self, rows: Iterator[tuple]) -> Iterator[tuple]:
+        """Yield iter_rows tuples, stopping after EMPTY_ROW_STREAK_LIMIT consecutive empty rows"""
+        empty_streak = 0
+        for row_values in rows:
+            if any(v is not None and v != "" for v in row_values):
+                empty_streak = 0
+            else:
+                empty_streak += 1
+                if empty_streak >= EMPTY_ROW_STREAK_LIMIT:
+                    return
+            yield row_values
+    
+    @staticmethod
+    def _row_to_dict(columns: List[str], row_values: tuple) -> Dict[str, str]:
+        """
+        Map one iter_rows(values_only=True) tuple onto column names
+        
+        Values are coerced with _coerce_cell ("" for empty cells); short rows are
+        padded to the header width and cells beyond it are named ColumnN
+        """
+        return BaseExcelParser._values_to_dict(columns, [_coerce_cell(v) for v in row_values])
+    
+    @staticmethod
+    def _values_to_dict(columns: List[str], values: List[Any]) -> Dict[str, str]:
+        """_row_to_dict for a row whose values were already coerced (values is extended in place)"""
+        width = len(columns)
+        if len(values) < width:
+            values.extend([""] * (width - len(values)))
+        elif len(values) > width:
+            columns = columns + [f"Column{col}" for col in range(width + 1, len(values) + 1)]
+        return dict(zip(columns, values))
     
     def _parse_sheet_to_dict(self, worksheet, sheet_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -80,53 +498,36 @@ class BaseExcelParser:
             Dictionary with sheet data using dict format for each row
         """
         try:
-            max_row = worksheet.max_row
-            max_col = worksheet.max_column
+            # Single streaming pass: first row is the header, the rest are data
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
             
-            if max_row < 1:
-                print(f"⚠️ Sheet {sheet_name} is empty")
+            if header is None:
+                logger.warning("Sheet %s is empty", sheet_name)
                 return None
             
             # Get column names from first row
-            columns = []
-            for col in range(1, max_col + 1):
-                cell_value = worksheet.cell(row=1, column=col).value
-                column_name = str(cell_value).strip() if cell_value else f"Column{col}"
-                columns.append(column_name)
+            columns = [
+                _column_name(cell_value, col) for col, cell_value in enumerate(header, 1)
+            ]
             
-            # Get data rows as dictionaries (skip header row)
+            # Get data rows as dictionaries (skip header row), keeping only rows that have some data;
+            # blank rows are dropped before a dict is built for them
             data = []
-            data_row_count = 0
-            
-            for row in range(2, max_row + 1):  # Start from row 2 (skip header)
-                row_dict = {}
-                has_data = False
-                
-                for col in range(1, max_col + 1):
-                    cell_value = worksheet.cell(row=row, column=col).value
-                    cell_str = str(cell_value).strip() if cell_value else ""
-                    
-                    # Use column name as key
-                    column_name = columns[col-1] if (col-1) < len(columns) else f"Column{col}"
-                    row_dict[column_name] = cell_str
-                    
-                    if cell_str:  # Check if row has any data
-                        has_data = True
-                
-                # Only include rows that have some data
-                if has_data:
-                    data.append(row_dict)
-                    data_row_count += 1
+            for row_values in self._rows_until_empty_streak(rows):
+                values = [_coerce_cell(v) for v in row_values]
+                if any(v != "" for v in values):
+                    data.append(self._values_to_dict(columns, values))
             
             return {
                 "columns": columns,
-                "row_count": data_row_count,
+                "row_count": len(data),
                 "data": data,  # Now each item is a dictionary
                 "sheet_name": sheet_name
             }
             
         except Exception as e:
-            print(f"❌ Error parsing sheet {sheet_name}: {str(e)}")
+            logger.error("Error parsing sheet %s: %s", sheet_name, e)
             return None
 
 
@@ -136,16 +537,19 @@ class DeviationsParser(BaseExcelParser):
     Uses dictionary format for better AI comprehension
     """
     
+    # Columns that may hold the deviation type, checked in this order
+    TYPE_COLUMNS = ('Type', 'Deviation Type', 'Category', 'Severity')
+    
     def __init__(self):
         super().__init__()
-        self.target_sheets = ["DEVIATIONS", "PROTOCOL DEVIATIONS", "DEVIATION LOG"]
+        self.target_sheets = frozenset({"DEVIATIONS", "PROTOCOL DEVIATIONS", "DEVIATION LOG"})
     
-    def parse_excel_file(self, file_path: str) -> Dict[str, Dict[str, Any]]:
+    def parse_workbook(self, workbook) -> Dict[str, Dict[str, Any]]:
         """
-        Parse Excel file and extract data from deviations sheet
+        Extract data from deviations sheet
         
         Args:
-            file_path: Path to Excel file
+            workbook: Loaded read-only workbook (not closed here)
             
         Returns:
             Dictionary with deviations data using AI-friendly dictionary format
@@ -153,31 +557,29 @@ class DeviationsParser(BaseExcelParser):
         results = {}
         
         try:
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            print(f"📋 DeviationsParser: Found sheets: {workbook.sheetnames}")
-            
-            for sheet_name in workbook.sheetnames:
-                # Check if this is one of our target sheets
-                normalized_name = self._normalize_sheet_name(sheet_name)
-                if normalized_name in self.target_sheets:
-                    sheet_data = self._parse_sheet_to_dict(workbook[sheet_name], normalized_name)
-                    if sheet_data:
-                        results[normalized_name] = sheet_data
-                        print(f"✅ Parsed {normalized_name}: {sheet_data['row_count']} deviations, {len(sheet_data['columns'])} columns")
-                        if sheet_data['data']:
-                            print(f"   Sample deviation fields: {list(sheet_data['data'][0].keys())[:3]}...")
+            logger.info("DeviationsParser: Found sheets: %s", workbook.sheetnames)
+            
+            # Only the matching sheets are read
+            for sheet_name, normalized_name in self._match_target_sheets(workbook):
+                sheet_data = self._parse_sheet_to_dict(workbook[sheet_name], normalized_name)
+                if sheet_data:
+                    results[normalized_name] = sheet_data
+                    logger.info("Parsed %s: %d deviations, %d columns",
+                                normalized_name, sheet_data['row_count'], len(sheet_data['columns']))
+                    if sheet_data['data'] and logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Sample deviation fields: %s...", list(sheet_data['data'][0].keys())[:3])
         
         except Exception as e:
-            print(f"❌ Error parsing Excel file for deviations: {str(e)}")
+            logger.error("Error parsing Excel file for deviations: %s", e)
         
-        self.parsed_data = results
+        self._set_parsed_data(results)
         return results
     
     def _normalize_sheet_name(self, sheet_name: str) -> str:
         """Normalize sheet name to match target sheets"""
         sheet_upper = sheet_name.upper().strip()
         
-        # Direct matches
+        # Direct matches (O(1) set lookup)
         if sheet_upper in self.target_sheets:
             return sheet_upper
         
@@ -192,6 +594,7 @@ class DeviationsParser(BaseExcelParser):
         
         return sheet_name  # Return original if no match
     
+    @_cached_on_parsed_data
     def get_summary(self) -> Dict[str, Dict[str, Any]]:
         """Get summary information for all parsed deviation sheets"""
         summaries = {}
@@ -215,20 +618,38 @@ class DeviationsParser(BaseExcelParser):
         Returns:
             List of deviation records
         """
+        all_deviations, type_index = self._deviation_type_index()
+        if deviation_type is None:
+            return list(all_deviations)
+        
+        # Check if deviation matches type: scan the distinct type values once, not every deviation
+        type_lower = deviation_type.lower()
+        positions = set()
+        for type_value, value_positions in type_index.items():
+            if type_lower in type_value:
+                positions.update(value_positions)
+        return [all_deviations[position] for position in sorted(positions)]
+    
+    @_cached_on_parsed_data
+    def _deviation_type_index(self) -> tuple:
+        """
+        Build (all deviations in sheet order, lowercase type value -> deviation positions)
+        
+        Only the common type columns present in each sheet are indexed; built on
+        the first typed lookup and reused until parsed_data is replaced
+        """
         all_deviations = []
-        for sheet_data in self.parsed_data.values():
+        type_index: Dict[str, List[int]] = {}
+        for sheet_name, sheet_data in self.parsed_data.items():
+            type_columns = self._present_columns(sheet_name, sheet_data, self.TYPE_COLUMNS)
             for deviation in sheet_data['data']:
-                if deviation_type is None:
-                    all_deviations.append(deviation)
-                else:
-                    # Check if deviation matches type (look in common type columns)
-                    type_columns = ['Type', 'Deviation Type', 'Category', 'Severity']
-                    for col in type_columns:
-                        if col in deviation and deviation_type.lower() in deviation[col].lower():
-                            all_deviations.append(deviation)
-                            break
-        return all_deviations
+                position = len(all_deviations)
+                all_deviations.append(deviation)
+                for col in type_columns:
+                    type_index.setdefault(str(deviation[col]).lower(), []).append(position)
+        return all_deviations, type_index
     
+    @_cached_on_parsed_data
     def format_for_ai_prompt(self) -> str:
         """
         Format parsed deviations data as text for AI prompts
@@ -262,16 +683,20 @@ class DefectiveUnitsParser(BaseExcelParser):
     Uses dictionary format for better AI comprehension
     """
     
+    # Columns that may hold the failure type / serial number, checked in this order
+    FAILURE_COLUMNS = ('Failure Type', 'Failure Mode', 'Root Cause', 'Issue Type')
+    SERIAL_COLUMNS = ('Serial Number', 'DUT Serial Number', 'Unit Serial', 'SN')
+    
     def __init__(self):
         super().__init__()
-        self.target_sheets = ["DEFECTIVE UNITS", "DEFECTIVE UNIT INVESTIGATIONS", "FAILED UNITS"]
+        self.target_sheets = frozenset({"DEFECTIVE UNITS", "DEFECTIVE UNIT INVESTIGATIONS", "FAILED UNITS"})
     
-    def parse_excel_file(self, file_path: str) -> Dict[str, Dict[str, Any]]:
+    def parse_workbook(self, workbook) -> Dict[str, Dict[str, Any]]:
         """
-        Parse Excel file and extract data from defective units sheet
+        Extract data from defective units sheet
         
         Args:
-            file_path: Path to Excel file
+            workbook: Loaded read-only workbook (not closed here)
             
         Returns:
             Dictionary with defective units data using AI-friendly dictionary format
@@ -279,31 +704,29 @@ class DefectiveUnitsParser(BaseExcelParser):
         results = {}
         
         try:
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            print(f"📋 DefectiveUnitsParser: Found sheets: {workbook.sheetnames}")
-            
-            for sheet_name in workbook.sheetnames:
-                # Check if this is one of our target sheets
-                normalized_name = self._normalize_sheet_name(sheet_name)
-                if normalized_name in self.target_sheets:
-                    sheet_data = self._parse_sheet_to_dict(workbook[sheet_name], normalized_name)
-                    if sheet_data:
-                        results[normalized_name] = sheet_data
-                        print(f"✅ Parsed {normalized_name}: {sheet_data['row_count']} defective units, {len(sheet_data['columns'])} columns")
-                        if sheet_data['data']:
-                            print(f"   Sample defective unit fields: {list(sheet_data['data'][0].keys())[:3]}...")
+            logger.info("DefectiveUnitsParser: Found sheets: %s", workbook.sheetnames)
+            
+            # Only the matching sheets are read
+            for sheet_name, normalized_name in self._match_target_sheets(workbook):
+                sheet_data = self._parse_sheet_to_dict(workbook[sheet_name], normalized_name)
+                if sheet_data:
+                    results[normalized_name] = sheet_data
+                    logger.info("Parsed %s: %d defective units, %d columns",
+                                normalized_name, sheet_data['row_count'], len(sheet_data['columns']))
+                    if sheet_data['data'] and logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Sample defective unit fields: %s...", list(sheet_data['data'][0].keys())[:3])
         
         except Exception as e:
-            print(f"❌ Error parsing Excel file for defective units: {str(e)}")
+            logger.error("Error parsing Excel file for defective units: %s", e)
         
-        self.parsed_data = results
+        self._set_parsed_data(results)
         return results
     
     def _normalize_sheet_name(self, sheet_name: str) -> str:
         """Normalize sheet name to match target sheets"""
         sheet_upper = sheet_name.upper().strip()
         
-        # Direct matches
+        # Direct matches (O(1) set lookup)
         if sheet_upper in self.target_sheets:
             return sheet_upper
         
@@ -318,6 +741,7 @@ class DefectiveUnitsParser(BaseExcelParser):
         
         return sheet_name  # Return original if no match
     
+    @_cached_on_parsed_data
     def get_summary(self) -> Dict[str, Dict[str, Any]]:
         """Get summary information for all parsed defective units sheets"""
         summaries = {}
@@ -342,17 +766,18 @@ class DefectiveUnitsParser(BaseExcelParser):
             List of defective unit records
         """
         all_units = []
-        for sheet_data in self.parsed_data.values():
-            for unit in sheet_data['data']:
-                if failure_type is None:
-                    all_units.append(unit)
-                else:
-                    # Check if unit matches failure type (look in common failure columns)
-                    failure_columns = ['Failure Type', 'Failure Mode', 'Root Cause', 'Issue Type']
-                    for col in failure_columns:
-                        if col in unit and failure_type.lower() in unit[col].lower():
-                            all_units.append(unit)
-                            break
+        failure_lower = failure_type.lower() if failure_type is not None else None
+        for sheet_name, sheet_data in self.parsed_data.items():
+            if failure_lower is None:
+                all_units.extend(sheet_data['data'])
+                continue
+            
+            # Check if unit matches failure type (look in common failure columns present in this sheet)
+            failure_columns = self._present_columns(sheet_name, sheet_data, self.FAILURE_COLUMNS)
+            all_units.extend(
+                unit for unit in sheet_data['data']
+                if any(failure_lower in str(unit[col]).lower() for col in failure_columns)
+            )
         return all_units
     
     def get_units_by_serial_number(self, serial_numbers: List[str]) -> List[Dict[str, Any]]:
@@ -365,17 +790,20 @@ class DefectiveUnitsParser(BaseExcelParser):
         Returns:
             List of matching defective unit records
         """
+        serial_set = set(serial_numbers)
         matching_units = []
-        for sheet_data in self.parsed_data.values():
-            for unit in sheet_data['data']:
-                # Check common serial number column names
-                serial_columns = ['Serial Number', 'DUT Serial Number', 'Unit Serial', 'SN']
-                for col in serial_columns:
-                    if col in unit and unit[col] in serial_numbers:
-                        matching_units.append(unit)
-                        break
+        for sheet_name, sheet_data in self.parsed_data.items():
+            # Check common serial number column names present in this sheet
+            serial_columns = self._present_columns(sheet_name, sheet_data, self.SERIAL_COLUMNS)
+            if not serial_columns:
+                continue
+            matching_units.extend(
+                unit for unit in sheet_data['data']
+                if any(str(unit[col]) in serial_set for col in serial_columns)
+            )
         return matching_units
     
+    @_cached_on_parsed_data
     def format_for_ai_prompt(self) -> str:
         """
         Format parsed defective units data as text for AI prompts
@@ -411,14 +839,14 @@ class EquipmentUsedParser(BaseExcelParser):
     
     def __init__(self):
         super().__init__()
-        self.target_sheets = ["EQUIPMENT LOG", "SOFTWARE LOG", "MATERIAL LOG"]
+        self.target_sheets = frozenset({"EQUIPMENT LOG", "SOFTWARE LOG", "MATERIAL LOG"})
     
-    def parse_excel_file(self, file_path: str) -> Dict[str, Dict[str, Any]]:
+    def parse_workbook(self, workbook) -> Dict[str, Dict[str, Any]]:
         """
-        Parse Excel file and extract data from target sheets
+        Extract data from target sheets
         
         Args:
-            file_path: Path to Excel file
+            workbook: Loaded read-only workbook (not closed here)
             
         Returns:
             Dictionary with sheet data using AI-friendly dictionary format
@@ -426,31 +854,29 @@ class EquipmentUsedParser(BaseExcelParser):
         results = {}
         
         try:
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            print(f"📋 EquipmentUsedParser: Found sheets: {workbook.sheetnames}")
-            
-            for sheet_name in workbook.sheetnames:
-                # Check if this is one of our target sheets
-                normalized_name = self._normalize_sheet_name(sheet_name)
-                if normalized_name in self.target_sheets:
-                    sheet_data = self._parse_sheet_to_dict(workbook[sheet_name], normalized_name)
-                    if sheet_data:
-                        results[normalized_name] = sheet_data
-                        print(f"✅ Parsed {normalized_name}: {sheet_data['row_count']} rows, {len(sheet_data['columns'])} columns")
-                        if sheet_data['data']:
-                            print(f"   Sample data: {list(sheet_data['data'][0].keys())[:3]}...")
+            logger.info("EquipmentUsedParser: Found sheets: %s", workbook.sheetnames)
+            
+            # Only the matching sheets are read
+            for sheet_name, normalized_name in self._match_target_sheets(workbook):
+                sheet_data = self._parse_sheet_to_dict(workbook[sheet_name], normalized_name)
+                if sheet_data:
+                    results[normalized_name] = sheet_data
+                    logger.info("Parsed %s: %d rows, %d columns",
+                                normalized_name, sheet_data['row_count'], len(sheet_data['columns']))
+                    if sheet_data['data'] and logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Sample data: %s...", list(sheet_data['data'][0].keys())[:3])
         
         except Exception as e:
-            print(f"❌ Error parsing Excel file: {str(e)}")
+            logger.error("Error parsing Excel file: %s", e)
         
-        self.parsed_data = results
+        self._set_parsed_data(results)
         return results
     
     def _normalize_sheet_name(self, sheet_name: str) -> str:
         """Normalize sheet name to match target sheets"""
         sheet_upper = sheet_name.upper().strip()
         
-        # Direct matches
+        # Direct matches (O(1) set lookup)
         if sheet_upper in self.target_sheets:
             return sheet_upper
         
@@ -464,6 +890,7 @@ class EquipmentUsedParser(BaseExcelParser):
         
         return sheet_name  # Return original if no match
     
+    @_cached_on_parsed_data
     def get_summary(self) -> Dict[str, Dict[str, Any]]:
         """Get summary information for all parsed sheets"""
         summaries = {}
@@ -477,6 +904,7 @@ class EquipmentUsedParser(BaseExcelParser):
             }
         return summaries
     
+    @_cached_on_parsed_data
     def format_for_ai_prompt(self) -> str:
         """
         Format parsed data as text for AI prompts
@@ -510,6 +938,14 @@ class TestArticleParser(BaseExcelParser):
     Uses DUT Serial Number as primary key with dictionary format for AI processing
     """
     
+    # Normalized test result value -> analysis counter it increments
+    _RESULT_CODES = {
+        "PASS": "pass_count",
+        "FAIL": "fail_count",
+        "TML": "tml_count",
+        "TEST METHOD LOSS": "tml_count",
+    }
+    
     def __init__(self):
         super().__init__()
         self.target_sheet_patterns = [
@@ -519,16 +955,18 @@ class TestArticleParser(BaseExcelParser):
         ]
         self.primary_key = "DUT Serial Number"
         
-    def parse_excel_file(self, file_path: str) -> Dict[str, Dict[str, Any]]:
+    def parse_workbook(self, workbook) -> Dict[str, Dict[str, Any]]:
         """
-        Parse Excel file for TEST ARTICLE LOG & TEST RESULTS data
+        Extract TEST ARTICLE LOG & TEST RESULTS data from a loaded workbook
         
+        Args:
+            workbook: Loaded read-only workbook (not closed here)
+            
         Returns:
             Dictionary with parsed data
         """
         try:
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            print(f"📋 TestArticleParser: Found sheets: {workbook.sheetnames}")
+            logger.info("TestArticleParser: Found sheets: %s", workbook.sheetnames)
             
             # Find target sheet
             target_sheet = None
@@ -538,11 +976,11 @@ class TestArticleParser(BaseExcelParser):
                 if self._is_target_sheet(sheet):
                     target_sheet = workbook[sheet]
                     sheet_name = sheet
-                    print(f"✅ Found target sheet: {sheet_name}")
+                    logger.info("Found target sheet: %s", sheet_name)
                     break
             
             if not target_sheet or not sheet_name:
-                print("⚠️ No TEST ARTICLE LOG & TEST RESULTS sheet found")
+                logger.warning("No TEST ARTICLE LOG & TEST RESULTS sheet found")
                 return {}
             
             # Parse sheet data
@@ -550,13 +988,13 @@ class TestArticleParser(BaseExcelParser):
             
             if sheet_data:
                 result = {"TEST_ARTICLE_DATA": sheet_data}
-                self.parsed_data = result
+                self._set_parsed_data(result)
                 return result
             else:
                 return {}
                 
         except Exception as e:
-            print(f"❌ Error parsing test article data: {str(e)}")
+            logger.error("Error parsing test article data: %s", e)
             return {}
     
     def _is_target_sheet(self, sheet_name: str) -> bool:
@@ -572,67 +1010,61 @@ class TestArticleParser(BaseExcelParser):
             Dictionary with test article data using AI-friendly format
         """
         try:
-            max_row = worksheet.max_row
-            max_col = worksheet.max_column
+            # Single streaming pass: first row is the header, the rest are data
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            first_data_row = next(rows, None)
             
-            if max_row < 2:
-                print(f"⚠️ Sheet {sheet_name} has insufficient data")
+            if header is None or first_data_row is None:
+                logger.warning("Sheet %s has insufficient data", sheet_name)
                 return None
             
-            # Get column names from first row
-            columns = []
+            # Get column names from first row (lowercased once for the header checks below)
+            columns = [
+                _column_name(cell_value, col) for col, cell_value in enumerate(header, 1)
+            ]
+            columns_lower = [column_name.lower() for column_name in columns]
+            
+            # Find primary key column
             primary_key_col = None
+            primary_key_lower = self.primary_key.lower()
             
-            for col in range(1, max_col + 1):
-                cell_value = worksheet.cell(row=1, column=col).value
-                column_name = str(cell_value).strip() if cell_value else f"Column{col}"
-                columns.append(column_name)
-                
-                # Find primary key column
-                if self.primary_key.lower() in column_name.lower() or "dut serial" in column_name.lower():
+            for col, column_lower in enumerate(columns_lower, 1):
+                if primary_key_lower in column_lower or "dut serial" in column_lower:
                     primary_key_col = col
-                    self.primary_key = column_name  # Use actual column name
+                    self.primary_key = columns[col-1]  # Use actual column name
+                    primary_key_lower = column_lower
             
             if primary_key_col is None:
-                print(f"⚠️ Primary key '{self.primary_key}' not found in sheet")
+                logger.warning("Primary key '%s' not found in sheet", self.primary_key)
                 return None
             
-            print(f"🔑 Using primary key: {self.primary_key} (column {primary_key_col})")
-            print(f"📝 Columns found: {columns}")
+            logger.info("Using primary key: %s (column %s)", self.primary_key, primary_key_col)
+            logger.debug("Columns found: %s", columns)
             
-            # Parse data rows with primary key as dictionary key
-            records = {}
-            test_result_columns = []
+            # Identify test result columns once from the header (deduplicated, in column order)
+            test_result_columns = list(dict.fromkeys(
+                column_name for column_name, column_lower in zip(columns, columns_lower)
+                if column_lower.startswith("test result")
+            ))
             
-            for row in range(2, max_row + 1):
-                row_dict = {}
-                primary_key_value = None
-                has_data = False
-                
-                for col in range(1, max_col + 1):
-                    cell_value = worksheet.cell(row=row, column=col).value
-                    cell_str = str(cell_value).strip() if cell_value else ""
-                    
-                    column_name = columns[col-1] if (col-1) < len(columns) else f"Column{col}"
-                    row_dict[column_name] = cell_str
-                    
-                    # Track primary key value
-                    if col == primary_key_col:
-                        primary_key_value = cell_str
-                    
-                    # Identify test result columns
-                    if re.match(r'^test result', column_name.lower()) and column_name not in test_result_columns:
-                        test_result_columns.append(column_name)
-                    
-                    if cell_str:
-                        has_data = True
+            # Keep each data row's value tuple under its primary key; row dicts are only
+            # built when a record is read (see _LazyRecords)
+            raw_rows = {}
+            primary_key_index = primary_key_col - 1
+            
+            for row_values in self._rows_until_empty_streak(chain((first_data_row,), rows)):
+                # Rows without a primary key are skipped (a non-empty key implies the row has data)
+                key_value = row_values[primary_key_index] if primary_key_index < len(row_values) else None
+                primary_key_value = "" if key_value is None else str(key_value).strip()
                 
-                # Store record with primary key as dictionary key
-                if has_data and primary_key_value:
-                    records[primary_key_value] = row_dict
+                if primary_key_value:
+                    raw_rows[primary_key_value] = row_values
+            
+            records = _LazyRecords(raw_rows, columns)
             
-            # Analyze test results
-            test_results_analysis = self._analyze_test_results(records, test_result_columns)
+            # Analyze test results straight from the value tuples
+            test_results_analysis = self._analyze_test_results(raw_rows, columns, test_result_columns)
             
             result = {
                 "sheet_name": sheet_name,
@@ -644,19 +1076,24 @@ class TestArticleParser(BaseExcelParser):
                 "records": records  # Dictionary with DUT Serial Number as key
             }
             
-            print(f"✅ Parsed {len(records)} test article records")
-            print(f"📊 Test result columns: {test_result_columns}")
-            print(f"📈 Analysis: {test_results_analysis}")
+            logger.info("Parsed %d test article records", len(records))
+            logger.debug("Test result columns: %s", test_result_columns)
+            logger.debug("Analysis: %s", test_results_analysis)
             
             return result
             
         except Exception as e:
-            print(f"❌ Error parsing test article sheet: {str(e)}")
+            logger.error("Error parsing test article sheet: %s", e)
             return None
     
-    def _analyze_test_results(self, records: Dict[str, Dict], test_result_columns: List[str]) -> Dict[str, Any]:
+    def _analyze_test_results(self, raw_rows: Dict[str, tuple], columns: List[str],
+                              test_result_columns: List[str]) -> Dict[str, Any]:
         """
         Analyze test results for statistical information
+        
+        Reads the result cells by column index from the row value tuples, so no row
+        dicts are built. A repeated column name resolves to its last occurrence, as
+        it does in the row dicts.
         """
         if not test_result_columns:
             return {"message": "No test result columns found"}
@@ -670,28 +1107,28 @@ class TestArticleParser(BaseExcelParser):
             "actual_sample_size": 0
         }
         
-        for serial_number, record in records.items():
-            unit_has_test_data = False
-            
-            for col in test_result_columns:
-                result = record.get(col, "").upper().strip()
-                if result:
-                    analysis["total_tests_performed"] += 1
-                    unit_has_test_data = True
-                    
-                    if result == "PASS":
-                        analysis["pass_count"] += 1
-                    elif result == "FAIL":
-                        analysis["fail_count"] += 1
-                    elif result in ["TML", "TEST METHOD LOSS"]:
-                        analysis["tml_count"] += 1
-                        analysis["test_method_losses"] += 1
-            
-            if unit_has_test_data:
-                analysis["actual_sample_size"] += 1
+        column_index = {column_name: index for index, column_name in enumerate(columns)}
+        result_indexes = [column_index[col] for col in test_result_columns]
+        
+        # Count the result values in one pass (Counter does the counting in C), then
+        # normalize only the distinct values; cells are coerced the same way as in row dicts
+        result_counts = Counter(
+            _coerce_cell(row_values[index]) if index < len(row_values) else ""
+            for row_values in raw_rows.values()
+            for index in result_indexes
+        )
+        result_counts.pop("", None)
+        
+        for result, count in result_counts.items():
+            analysis["total_tests_performed"] += count
+            # Values are usually already uppercase, which skips the upper() call
+            counter_key = self._RESULT_CODES.get(result) or self._RESULT_CODES.get(str(result).upper())
+            if counter_key is not None:
+                analysis[counter_key] += count
+        analysis["test_method_losses"] = analysis["tml_count"]
         
         # Calculate actual sample size as total units minus test method losses
-        analysis["actual_sample_size"] = len(records) - analysis["test_method_losses"]
+        analysis["actual_sample_size"] = len(raw_rows) - analysis["test_method_losses"]
         
         return analysis
     
@@ -722,15 +1159,19 @@ class TestArticleParser(BaseExcelParser):
         
         data = self.parsed_data["TEST_ARTICLE_DATA"]
         matching_records = []
+        target = result_type.upper()
         
         for record in data["records"].values():
             for col in data["test_result_columns"]:
-                if record.get(col, "").upper().strip() == result_type.upper():
+                # Cells were stripped at parse time; uppercase values match without upper()
+                result = record.get(col, "")
+                if result == target or str(result).upper() == target:
                     matching_records.append(record)
                     break
         
         return matching_records
     
+    @_cached_on_parsed_data
     def format_for_ai_prompt(self) -> str:
         """
         Format parsed data as text for AI prompts
@@ -766,7 +1207,7 @@ class TestArticleParser(BaseExcelParser):
         
         # Add sample records
         formatted_lines.append("Sample Records:")
-        for i, (serial_num, record) in enumerate(list(data['records'].items())[:3], 1):
+        for i, (serial_num, record) in enumerate(islice(data['records'].items(), 3), 1):
             formatted_lines.append(f"  DUT {i} ({serial_num}): {record}")
         
         if data['total_units'] > 3:
@@ -775,31 +1216,103 @@ class TestArticleParser(BaseExcelParser):
         return '\n'.join(formatted_lines)
 
 
+# (all_results key, CombinedExcelParser attribute, parser class, progress label), in parsing order
+COMBINED_PARSERS = (
+    ("test_article_data", "test_article_parser", TestArticleParser, "test article data"),
+    ("equipment_log_data", "equipment_used_parser", EquipmentUsedParser, "equipment/software/material logs"),
+    ("deviations_data", "deviations_parser", DeviationsParser, "deviations data"),
+    ("defective_units_data", "defective_units_parser", DefectiveUnitsParser, "defective units data"),
+)
+
+# Worker processes for parsing several workbooks at once; created on first use and
+# reused, since starting the workers costs more than parsing a typical workbook.
+# Workers are spawned, not forked: the server process runs other threads (log
+# listener, to_thread workers) whose held locks a forked child would inherit locked
+_parse_process_pool: Optional[ProcessPoolExecutor] = None
+_parse_process_pool_workers = 0
+
+
+def _get_parse_process_pool(file_count: int) -> ProcessPoolExecutor:
+    """
+    Return the shared parse process pool with min(file_count, CPU count) workers
+    
+    The pool is created on first use and only replaced when a later call needs
+    more workers than it has (the old pool finishes its work in the background).
+    """
+    global _parse_process_pool, _parse_process_pool_workers
+    workers = max(1, min(file_count, os.cpu_count() or 1))
+    if _parse_process_pool is None or workers > _parse_process_pool_workers:
+        if _parse_process_pool is not None:
+            _parse_process_pool.shutdown(wait=False)
+        _parse_process_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        _parse_process_pool_workers = workers
+    return _parse_process_pool
+
+
+def _parse_workbook_file(file_path: str) -> Tuple[Dict[str, Dict[str, Any]], List[tuple]]:
+    """
+    Run all four parsers on one workbook file (process pool entry point)
+    
+    openpyxl parsing holds the GIL, so several workbooks only parse in parallel in
+    separate processes. Module level so the pool can pickle a reference to it.
+    
+    Returns:
+        (results per all_results key, [(progress label, error message)] for parsers that raised)
+    """
+    workbook = BaseExcelParser._load_workbook(file_path)
+    try:
+        file_results = {}
+        errors = []
+        for key, _, parser_class, label in COMBINED_PARSERS:
+            try:
+                file_results[key] = parser_class().parse_workbook(workbook)
+            except Exception as e:
+                errors.append((label, str(e)))
+                file_results[key] = {}
+        return file_results, errors
+    finally:
+        invalidate_workbook_cache(file_path)
+
+
 class CombinedExcelParser:
     """
     Combined parser that processes all Excel sheets for the DVT report generator
     """
     
-    def __init__(self):
+    def __init__(self, cache_dir: Path = PARSED_RESULTS_CACHE_DIR):
         self.test_article_parser = TestArticleParser()
         self.equipment_used_parser = EquipmentUsedParser()
         self.deviations_parser = DeviationsParser()
         self.defective_units_parser = DefectiveUnitsParser()
         self.all_parsed_data = {}
+        # Parsed results per workbook, keyed by SHA-256 of the file bytes
+        self.cache_dir = Path(cache_dir)
     
-    async def parse_all_excel_files(self, data_files: List[Any]) -> Dict[str, Any]:
+    def _parsers(self) -> List[tuple]:
+        """(all_results key, parser, progress label) for every parser, in parsing order"""
+        return [
+            (key, getattr(self, attr), label) for key, attr, _, label in COMBINED_PARSERS
+        ]
+    
+    async def parse_all_excel_files(self, data_files: List[Any], no_cache: bool = False) -> Dict[str, Any]:
         """
         Parse all uploaded Excel files using all parsers
         
+        Results are cached on disk per file content, so an unchanged workbook is
+        not opened again on the next run. When more than one file needs parsing,
+        the files are parsed in parallel in a process pool; a single file is parsed
+        in-process with the four parsers running in threads.
+        
         Args:
             data_files: List of uploaded Excel files
+            no_cache: Skip the parsed results cache (results are not stored either)
             
         Returns:
             Combined dictionary with all parsed data
         """
-        print("\n" + "="*60)
-        print("📊 EXCEL PARSING STARTED (WITH ALL PARSERS)")
-        print("="*60)
+        logger.info("Excel parsing started (with all parsers)")
         
         all_results = {
             "test_article_data": {},
@@ -813,105 +1326,198 @@ class CombinedExcelParser:
             }
         }
         
-        for i, data_file in enumerate(data_files):
-            if not data_file:
-                continue
-            
-            filename = getattr(data_file, 'filename', f'file_{i}')
-            print(f"\n📁 Processing file: {filename}")
-            
-            try:
-                # Parse with TestArticleParser
-                print("🔍 Parsing test article data...")
-                test_results = await self.test_article_parser.parse_uploaded_file(data_file)
-                if test_results:
-                    all_results["test_article_data"].update(test_results)
-                    all_results["parsing_summary"]["sheets_found"].extend(test_results.keys())
-                
-                # Parse with EquipmentUsedParser
-                print("🔍 Parsing equipment/software/material logs...")
-                equipment_results = await self.equipment_used_parser.parse_uploaded_file(data_file)
-                if equipment_results:
-                    all_results["equipment_log_data"].update(equipment_results)
-                    all_results["parsing_summary"]["sheets_found"].extend(equipment_results.keys())
-                
-                # Parse with DeviationsParser
-                print("🔍 Parsing deviations data...")
-                deviations_results = await self.deviations_parser.parse_uploaded_file(data_file)
-                if deviations_results:
-                    all_results["deviations_data"].update(deviations_results)
-                    all_results["parsing_summary"]["sheets_found"].extend(deviations_results.keys())
-                
-                # Parse with DefectiveUnitsParser
-                print("🔍 Parsing defective units data...")
-                defective_results = await self.defective_units_parser.parse_uploaded_file(data_file)
-                if defective_results:
-                    all_results["defective_units_data"].update(defective_results)
-                    all_results["parsing_summary"]["sheets_found"].extend(defective_results.keys())
+        # One entry per file, in upload order: filename, temp_path, digest,
+        # results (per all_results key), parser_errors, error
+        files = []
+        try:
+            # Copy every upload and check the parse cache first, so the files that
+            # still need parsing are known before any of them is parsed
+            for i, data_file in enumerate(data_files):
+                if not data_file:
+                    continue
                 
-                all_results["parsing_summary"]["files_processed"] += 1
+                entry = {"filename": getattr(data_file, 'filename', f'file_{i}'), "temp_path": None,
+                         "digest": None, "results": None, "parser_errors": [], "error": None}
+                files.append(entry)
+                logger.info("Processing file: %s", entry["filename"])
                 
-            except Exception as e:
-                error_msg = f"Error processing {filename}: {str(e)}"
-                print(f"❌ {error_msg}")
+                try:
+                    entry["temp_path"] = await BaseExcelParser.copy_upload_to_temp(data_file)
+                    # Hashing and cache I/O block, so they run in worker threads
+                    if not no_cache:
+                        entry["digest"] = await asyncio.to_thread(self._file_digest, entry["temp_path"])
+                        entry["results"] = await asyncio.to_thread(self._load_cached_results, entry["digest"])
+                        if entry["results"] is not None:
+                            logger.info("Using cached parse results for %s (file unchanged)", entry["filename"])
+                except Exception as e:
+                    entry["error"] = e
+            
+            to_parse = [entry for entry in files if entry["results"] is None and entry["error"] is None]
+            if len(to_parse) > 1:
+                logger.info("Parsing %d files in parallel...", len(to_parse))
+                loop = asyncio.get_running_loop()
+                pool = _get_parse_process_pool(len(to_parse))
+                outcomes = await asyncio.gather(
+                    *(loop.run_in_executor(pool, _parse_workbook_file, entry["temp_path"]) for entry in to_parse),
+                    return_exceptions=True
+                )
+            elif to_parse:
+                outcomes = [await self._parse_in_threads(to_parse[0]["temp_path"])]
+            else:
+                outcomes = []
+            
+            for entry, outcome in zip(to_parse, outcomes):
+                if isinstance(outcome, Exception):
+                    entry["error"] = outcome
+                    continue
+                entry["results"], entry["parser_errors"] = outcome
+                if not no_cache and not entry["parser_errors"]:
+                    await asyncio.to_thread(self._store_cached_results, entry["digest"], entry["results"])
+        
+        finally:
+            for entry in files:
+                BaseExcelParser.remove_temp_file(entry["temp_path"])
+        
+        # Merge in upload order; each parser is left holding the last file's results.
+        # Sheet names are collected as dict keys, so a sheet found in several files is listed once
+        sheets_found = {}
+        for entry in files:
+            for label, message in entry["parser_errors"]:
+                error_msg = f"Error parsing {label} in {entry['filename']}: {message}"
+                logger.error("%s", error_msg)
+                all_results["parsing_summary"]["errors"].append(error_msg)
+            
+            if entry["error"] is not None:
+                error_msg = f"Error processing {entry['filename']}: {str(entry['error'])}"
+                logger.error("%s", error_msg)
                 all_results["parsing_summary"]["errors"].append(error_msg)
+                continue
+            
+            for key, parser, _ in self._parsers():
+                file_results = entry["results"][key]
+                parser._set_parsed_data(file_results)
+                if file_results:
+                    all_results[key].update(file_results)
+                    sheets_found.update(dict.fromkeys(file_results))
+            
+            all_results["parsing_summary"]["files_processed"] += 1
         
+        all_results["parsing_summary"]["sheets_found"] = list(sheets_found)
         self.all_parsed_data = all_results
-        self._print_parsing_summary()
+        self._log_parsing_summary()
         
         return all_results
     
-    def _print_parsing_summary(self):
-        """Print detailed summary of parsing results"""
-        print("\n" + "="*60)
-        print("📊 EXCEL PARSING SUMMARY (ALL PARSERS)")
-        print("="*60)
+    async def _parse_in_threads(self, file_path: str) -> Tuple[Dict[str, Dict[str, Any]], List[tuple]]:
+        """
+        Parse one workbook with this instance's four parsers running in threads
+        
+        Read-only worksheets each stream their own zip member, so the parsers can
+        read the shared workbook concurrently. Returns the same
+        (results, parser errors) pair as _parse_workbook_file.
+        """
+        workbook = await asyncio.to_thread(BaseExcelParser._load_workbook, file_path)
+        parsers = self._parsers()
+        logger.info("Parsing %s...", ", ".join(label for _, _, label in parsers))
+        parser_results = await asyncio.gather(
+            *(asyncio.to_thread(parser.parse_workbook, workbook) for _, parser, _ in parsers),
+            return_exceptions=True
+        )
+        
+        # A failing parser only loses its own results
+        file_results = {}
+        errors = []
+        for (key, _, label), result in zip(parsers, parser_results):
+            if isinstance(result, Exception):
+                errors.append((label, str(result)))
+                result = {}
+            file_results[key] = result
+        return file_results, errors
+    
+    @staticmethod
+    def _file_digest(file_path: str) -> str:
+        """SHA-256 hex digest of a file's bytes"""
+        with open(file_path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    
+    def _cache_path(self, digest: str) -> Path:
+        """Cache file for a workbook digest (the version suffix retires entries when the result format changes)"""
+        return self.cache_dir / f"{digest}-v{PARSED_RESULTS_CACHE_VERSION}.pkl"
+    
+    def _load_cached_results(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the cached per-parser results for a workbook, or None on a miss or unreadable entry"""
+        try:
+            with open(self._cache_path(digest), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable parse cache entry %s: %s", digest, e)
+            return None
+    
+    def _store_cached_results(self, digest: str, file_results: Dict[str, Any]) -> None:
+        """Write per-parser results atomically (temp file + os.replace); failures only log a warning"""
+        temp_name = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as temp_file:
+                temp_name = temp_file.name
+                pickle.dump(file_results, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, self._cache_path(digest))
+        except Exception as e:
+            logger.warning("Could not write parse cache entry %s: %s", digest, e)
+            if temp_name and os.path.exists(temp_name):
+                os.unlink(temp_name)
+    
+    def _log_parsing_summary(self):
+        """Log detailed summary of parsing results (built first, then written as one log record)"""
+        lines = [
+            "="*60,
+            "📊 EXCEL PARSING SUMMARY (ALL PARSERS)",
+            "="*60,
+        ]
         
         summary = self.all_parsed_data["parsing_summary"]
-        print(f"Files Processed: {summary['files_processed']}")
-        print(f"Sheets Found: {', '.join(summary['sheets_found'])}")
+        lines.append(f"Files Processed: {summary['files_processed']}")
+        lines.append(f"Sheets Found: {', '.join(summary['sheets_found'])}")
         
         if summary['errors']:
-            print(f"Errors: {len(summary['errors'])}")
-            for error in summary['errors']:
-                print(f"  ❌ {error}")
+            lines.append(f"Errors: {len(summary['errors'])}")
+            lines.extend(f"  ❌ {error}" for error in summary['errors'])
         
-        # Print Test Article Summary
+        # Test Article Summary
         if self.all_parsed_data["test_article_data"]:
-            print(f"\n📊 TEST ARTICLE DATA:")
-            test_data = list(self.all_parsed_data["test_article_data"].values())[0]
+            test_data = self.get_test_article_data()
             analysis = test_data["test_results_analysis"]
-            print(f"  Total DUT Units: {test_data['total_units']}")
-            print(f"  PASS: {analysis['pass_count']}")
-            print(f"  FAIL: {analysis['fail_count']}")
-            print(f"  Test Method Losses: {analysis['test_method_losses']}")
-            print(f"  Actual Sample Size: {analysis['actual_sample_size']}")
-        
-        # Print Equipment Log Summary
-        if self.all_parsed_data["equipment_log_data"]:
-            print(f"\n📊 EQUIPMENT/SOFTWARE/MATERIAL LOGS:")
-            for sheet_name, data in self.all_parsed_data["equipment_log_data"].items():
-                print(f"  {sheet_name}: {data['row_count']} items")
-        
-        # Print Deviations Summary
-        if self.all_parsed_data["deviations_data"]:
-            print(f"\n📊 DEVIATIONS DATA:")
-            for sheet_name, data in self.all_parsed_data["deviations_data"].items():
-                print(f"  {sheet_name}: {data['row_count']} deviations")
-        
-        # Print Defective Units Summary
-        if self.all_parsed_data["defective_units_data"]:
-            print(f"\n📊 DEFECTIVE UNITS DATA:")
-            for sheet_name, data in self.all_parsed_data["defective_units_data"].items():
-                print(f"  {sheet_name}: {data['row_count']} defective units")
-        
-        print("\n" + "="*60)
+            lines.extend([
+                "\n📊 TEST ARTICLE DATA:",
+                f"  Total DUT Units: {test_data['total_units']}",
+                f"  PASS: {analysis['pass_count']}",
+                f"  FAIL: {analysis['fail_count']}",
+                f"  Test Method Losses: {analysis['test_method_losses']}",
+                f"  Actual Sample Size: {analysis['actual_sample_size']}",
+            ])
+        
+        # Equipment Log, Deviations and Defective Units Summaries
+        for key, title, noun in (
+            ("equipment_log_data", "EQUIPMENT/SOFTWARE/MATERIAL LOGS", "items"),
+            ("deviations_data", "DEVIATIONS DATA", "deviations"),
+            ("defective_units_data", "DEFECTIVE UNITS DATA", "defective units"),
+        ):
+            if self.all_parsed_data[key]:
+                lines.append(f"\n📊 {title}:")
+                lines.extend(
+                    f"  {sheet_name}: {data['row_count']} {noun}"
+                    for sheet_name, data in self.all_parsed_data[key].items()
+                )
+        
+        lines.append("="*60)
+        logger.info("\n".join(lines))
     
     def get_test_article_data(self) -> Optional[Dict[str, Any]]:
         """Get parsed test article data"""
-        if self.all_parsed_data["test_article_data"]:
-            return list(self.all_parsed_data["test_article_data"].values())[0]
-        return None
+        # First value without copying all values into a list
+        return next(iter(self.all_parsed_data["test_article_data"].values()), None)
     
     def get_equipment_log_data(self, sheet_name: str) -> Optional[Dict[str, Any]]:
         """Get specific equipment log data"""
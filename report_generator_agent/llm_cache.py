@@ -0,0 +1,97 @@
+"""
+LLM response cache for DVT Test Report Generator
+Serves identical deterministic prompt requests (temperature 0 or structured JSON
+extraction) from memory during report iteration/regeneration
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+
+class LLMResponseCache:
+    """In-process LRU cache of generated text keyed by request content hash"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Build a stable SHA-256 key from the request fields"""
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response and mark it most recently used"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response, evicting the least recently used entry when full"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached responses"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return basic cache statistics"""
+        return {"entries": len(self._entries), "max_entries": self.max_entries}
+
+
+# Shared by all agents in the process
+llm_cache = LLMResponseCache()
+
+
+def cached_llm(func: Callable) -> Callable:
+    """
+    Cache decorator for BaseDVTAgent.generate_content-style coroutines
+
+    Only deterministic calls are cached by default: temperature 0 or a
+    response_schema (structured extraction). Sampled narrative sections are
+    generated fresh every time, so regenerating a report gives new text.
+    use_cache=True/False overrides that per call. The key covers prompt,
+    system instruction, model (the per-call model override or the agent's
+    model), temperature and the remaining generation arguments. Pass
+    bust=True to skip the lookup and force regeneration (the fresh response
+    still replaces the cached one). Empty responses are never cached; call
+    llm_cache.clear() to drop everything.
+    """
+    @wraps(func)
+    async def wrapper(self, prompt: str, temperature: float = None,
+                      system_instruction: Optional[str] = None, bust: bool = False,
+                      use_cache: Optional[bool] = None, **kwargs):
+        effective_temperature = temperature if temperature is not None else self.default_temperature
+        if use_cache is None:
+            use_cache = effective_temperature == 0 or kwargs.get("response_schema") is not None
+        if not use_cache:
+            return await func(self, prompt, temperature=temperature,
+                              system_instruction=system_instruction, **kwargs)
+
+        key = llm_cache.make_key(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            model=kwargs.get("model") or self.model_name,
+            temperature=effective_temperature,
+            **{k: v for k, v in kwargs.items() if k != "model"}
+        )
+        if not bust:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = await func(self, prompt, temperature=temperature,
+                            system_instruction=system_instruction, **kwargs)
+        if result:
+            llm_cache.set(key, result)
+        return result
+
+    return wrapper
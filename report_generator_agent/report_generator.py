@@ -3,27 +3,35 @@ DVT Report Generator - Core business logic for report generation
 Updated to use specialized AI agents for Tasks 4.1-4.4
 """
 
+import asyncio
+import logging
 import os
-import tempfile
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_COLOR_INDEX
-import openpyxl
 from fastapi import UploadFile
-from .ai_agents import DVTAgentOrchestrator, TaskResult, ProtocolDeviationsAgent, DefectiveUnitInvestigationsAgent
+from .ai_agents import DVTAgentOrchestrator, TaskResult, ProtocolDeviationsAgent, DefectiveUnitInvestigationsAgent, BatchedInvestigationsAgent
+from .ai_prompts import DVTPrompts, DVT_SYSTEM_PROMPT
+from .ai_config_settings import AgentConfig
+from .excel_parsers import BaseExcelParser
+from .llm_cache import llm_cache
 import re
 
+logger = logging.getLogger(__name__)
+
 
 class DVTReportGenerator:
     """Main class for DVT report generation with specialized AI agents for Tasks 4.1-4.4"""
     
-    def __init__(self, client=None):
+    def __init__(self, client=None, use_response_cache: bool = True):
         self.report_data = {}
         self.generated_attachments = []  # Track all generated attachment filenames
         self.client = client
         self.model_name = "gemini-2.5-flash"
+        # Serve repeated protocol analyses from the shared LLM response cache
+        self.use_response_cache = use_response_cache
         
         # Initialize AI agent orchestrator
         self.ai_orchestrator = DVTAgentOrchestrator(client, self.model_name) if client else None
@@ -48,6 +56,8 @@ class DVTReportGenerator:
             '[BK_CONCLUSION]': 'conclusion',  # Conclusion section
             '[BK_ATTACHMENTS]': 'attachments'  # List of all attachments
         }
+        # Finds every placeholder in a paragraph's text in one pass
+        self._placeholder_pattern = re.compile("|".join(re.escape(placeholder) for placeholder in self.placeholder_mapping))
     
     async def test_gemini_connection(self) -> str:
         """Simple test to verify Gemini AI is working"""
@@ -69,13 +79,13 @@ class DVTReportGenerator:
                 # Try to open the file to verify it's accessible
                 doc = Document(self.template_path)
                 result["exists"] = True
-                print(f"✅ Template file found: {self.template_path}")
+                logger.info("Template file found: %s", self.template_path)
             else:
                 result["error"] = f"Template file not found: {self.template_path}"
-                print(f"❌ Template file missing: {self.template_path}")
+                logger.error("Template file missing: %s", self.template_path)
         except Exception as e:
             result["error"] = f"Cannot access template file: {str(e)}"
-            print(f"❌ Template file error: {str(e)}")
+            logger.error("Template file error: %s", e)
         
         return result
     
@@ -94,21 +104,21 @@ class DVTReportGenerator:
             # Enhanced document parsing with structured analysis
             from .doc_parsers import DocumentParser
             
-            print(f"\n📄 Processing protocol document: {protocol_file.filename}")
+            logger.info("Processing protocol document: %s", protocol_file.filename)
             
             # Check if it's a Word document for structured parsing
             if protocol_file.filename.endswith('.docx'):
-                print("🔍 Running enhanced Word document parsing...")
+                logger.info("Running enhanced Word document parsing...")
                 try:
                     doc_parser = DocumentParser()
                     
                     # Parse the document structure
-                    print("📊 Parsing document structure...")
+                    logger.info("Parsing document structure...")
                     parsed_doc_data = await doc_parser.parse_document(protocol_file)
                     
                     if parsed_doc_data:
-                        print(f"✅ Document parsed successfully:")
-                        print(f"   - Found {len(parsed_doc_data)} sections")
+                        logger.info("Document parsed successfully:")
+                        logger.info("   - Found %s sections", len(parsed_doc_data))
                         '''
                         # Print section summary
                         for section_num, content in parsed_doc_data.items():
@@ -146,230 +156,277 @@ class DVTReportGenerator:
                         }
                         
                     else:
-                        print("⚠️ Document parsing returned no data, falling back to basic text extraction")
+                        logger.warning("Document parsing returned no data, falling back to basic text extraction")
                         protocol_content = await self.extract_document_content(protocol_file)
                         results["protocol_data"] = await self.analyze_protocol(protocol_content)
                         
                 except Exception as e:
-                    print(f"❌ Document parsing failed: {str(e)}")
-                    print("⚠️ Falling back to basic text extraction")
+                    logger.error("Document parsing failed: %s", e)
+                    logger.warning("Falling back to basic text extraction")
                     protocol_content = await self.extract_document_content(protocol_file)
                     results["protocol_data"] = await self.analyze_protocol(protocol_content)
             else:
                 # For non-Word documents, use original method
-                print("📄 Using basic text extraction for non-Word document")
+                logger.info("Using basic text extraction for non-Word document")
                 protocol_content = await self.extract_document_content(protocol_file)
                 results["protocol_data"] = await self.analyze_protocol(protocol_content)
         
-        # Process data files with enhanced Excel parsing
-        from .excel_parsers import TestArticleParser, EquipmentUsedParser, DeviationsParser, DefectiveUnitsParser
+        # Process data files with enhanced Excel parsing:
+        # extract and parse all Excel uploads concurrently, then report them in upload order
+        excel_files = [data_file for data_file in data_files if data_file.filename.endswith(('.xlsx', '.xls'))]
+        parsed_uploads = await asyncio.gather(*(self._parse_excel_upload(data_file) for data_file in excel_files))
         
-        for data_file in data_files:
-            if data_file.filename.endswith(('.xlsx', '.xls')):
-                # Original extraction method
-                data_content = await self.extract_excel_data(data_file)
-                results["test_data"].append(data_content)
+        for data_file, parsed in zip(excel_files, parsed_uploads):
+            results["test_data"].append(parsed["data_content"])
+            
+            # NEW: Enhanced Excel parsing with specialized parsers
+            logger.info("Enhanced Excel parsing results for: %s", data_file.filename)
+            
+            try:
+                if parsed["error"] is not None:
+                    raise parsed["error"]
                 
-                # NEW: Enhanced Excel parsing with specialized parsers
-                print(f"\n📊 Running enhanced Excel parsing for: {data_file.filename}")
+                test_article_parser, equipment_used_parser, deviations_parser, defective_units_parser = parsed["parsers"]
+                test_article_data, equipment_sheets_data, deviations_data, defective_units_data = parsed["results"]
                 
-                try:
-                    # Initialize all parsers
-                    test_article_parser = TestArticleParser()
-                    equipment_used_parser = EquipmentUsedParser()
-                    deviations_parser = DeviationsParser()
-                    defective_units_parser = DefectiveUnitsParser()
-                    
-                    # Parse TEST ARTICLE LOG & TEST RESULTS
-                    print("🔍 Parsing TEST ARTICLE LOG & TEST RESULTS...")
-                    test_article_data = await test_article_parser.parse_uploaded_file(data_file)
-                    
+                if test_article_data:
+                    logger.info("Test Article Data parsed successfully:")
+                    logger.info("   - Found %s DUT Serial Numbers", len(test_article_data))
                     if test_article_data:
-                        print(f"✅ Test Article Data parsed successfully:")
-                        print(f"   - Found {len(test_article_data)} DUT Serial Numbers")
-                        if test_article_data:
-                            # Show sample of parsed data
-                            sample_key = next(iter(test_article_data))
-                            print(f"   - Sample DUT: {sample_key}")
-                            print(f"   - Columns: {list(test_article_data[sample_key].keys())}")
-                        
-                        '''
-                        print(f"COMPLETE TEST ARTICLE RAW DATA:")
-                        print("="*80)
-                        import json
-                   
-                        try:
-                            print(json.dumps(test_article_data, indent=2, default=str))
-                        except:
-                            print(test_article_data)
-                        print("="*80)
-                        '''
-                        # Store with AI-friendly format
-                        ai_prompt_data = test_article_parser.format_for_ai_prompt()
-                        '''
-                        print(f"\n📊 TEST ARTICLE AI-FRIENDLY FORMAT:")
-                        print("="*60)
-                        print(ai_prompt_data)
-                        print("="*60)
-                        '''
-                        # Get statistics from test article parser
-                        statistics = {
-                            "total_units": len(test_article_data),
-                            "test_method_losses": len([k for k, v in test_article_data.items() if v.get("Test Result") == "TML"]),
-                            "actual_sample_size": len([k for k, v in test_article_data.items() if v.get("Test Result") in ["PASS", "FAIL"]])
-                        }
-                        results["parsed_excel_data"]["test_articles"] = {
-                            "raw_data": test_article_data,
-                            "ai_format": ai_prompt_data,
-                            "statistics": statistics
-                        }
-                    else:
-                        print("ℹ️ No TEST ARTICLE LOG & TEST RESULTS sheet found in this file")
+                        # Show sample of parsed data
+                        sample_key = next(iter(test_article_data))
+                        logger.info("   - Sample DUT: %s", sample_key)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("   - Columns: %s", list(test_article_data[sample_key].keys()))
                     
-                    # Parse Equipment/Software/Material logs
-                    print("🔍 Parsing Equipment/Software/Material logs...")
-                    equipment_sheets_data = await equipment_used_parser.parse_uploaded_file(data_file)
+                    '''
+                    print(f"COMPLETE TEST ARTICLE RAW DATA:")
+                    print("="*80)
+                    import json
+               
+                    try:
+                        print(json.dumps(test_article_data, indent=2, default=str))
+                    except:
+                        print(test_article_data)
+                    print("="*80)
+                    '''
+                    # Store with AI-friendly format
+                    ai_prompt_data = test_article_parser.format_for_ai_prompt()
+                    '''
+                    print(f"\n📊 TEST ARTICLE AI-FRIENDLY FORMAT:")
+                    print("="*60)
+                    print(ai_prompt_data)
+                    print("="*60)
+                    '''
+                    # Get statistics from test article parser
+                    statistics = {
+                        "total_units": len(test_article_data),
+                        "test_method_losses": len([k for k, v in test_article_data.items() if v.get("Test Result") == "TML"]),
+                        "actual_sample_size": len([k for k, v in test_article_data.items() if v.get("Test Result") in ["PASS", "FAIL"]])
+                    }
+                    results["parsed_excel_data"]["test_articles"] = {
+                        "raw_data": test_article_data,
+                        "ai_format": ai_prompt_data,
+                        "statistics": statistics
+                    }
+                else:
+                    logger.info("No TEST ARTICLE LOG & TEST RESULTS sheet found in this file")
+                
+                # Store Equipment/Software/Material logs
+                if equipment_sheets_data:
+                    '''
+                    print(f"✅ Equipment sheets data parsed successfully:")
+                    for sheet_name, sheet_data in equipment_sheets_data.items():
+                        print(f"   - {sheet_name}: {len(sheet_data)} rows")
                     
-                    if equipment_sheets_data:
-                        '''
-                        print(f"✅ Equipment sheets data parsed successfully:")
-                        for sheet_name, sheet_data in equipment_sheets_data.items():
-                            print(f"   - {sheet_name}: {len(sheet_data)} rows")
-                        
-                        # Print complete raw data dictionary
-                        print(f"\n📊 COMPLETE EQUIPMENT LOGS RAW DATA:")
-                        print("="*80)
-                        import json
-                        try:
-                            print(json.dumps(equipment_sheets_data, indent=2, default=str))
-                        except:
-                            print(equipment_sheets_data)
-                        print("="*80)
-                        '''
-                        # Store with AI-friendly format
+                    # Print complete raw data dictionary
+                    print(f"\n📊 COMPLETE EQUIPMENT LOGS RAW DATA:")
+                    print("="*80)
+                    import json
+                    try:
+                        print(json.dumps(equipment_sheets_data, indent=2, default=str))
+                    except:
+                        print(equipment_sheets_data)
+                    print("="*80)
+                    '''
+                    # Store with AI-friendly format
+               
+                    ai_prompt_data = equipment_used_parser.format_for_ai_prompt()
                    
-                        ai_prompt_data = equipment_used_parser.format_for_ai_prompt()
-                       
-                        results["parsed_excel_data"]["equipment_logs"] = {
-                            "raw_data": equipment_sheets_data,
-                            "ai_format": ai_prompt_data
-                        }
-                    else:
-                        print("ℹ️ No Equipment/Software/Material log sheets found in this file")
+                    results["parsed_excel_data"]["equipment_logs"] = {
+                        "raw_data": equipment_sheets_data,
+                        "ai_format": ai_prompt_data
+                    }
+                else:
+                    logger.info("No Equipment/Software/Material log sheets found in this file")
+                
+                # Store Deviations
+                if deviations_data:
+                    logger.info("Deviations data parsed successfully:")
+                    # Store with AI-friendly format
+                    ai_prompt_data = deviations_parser.format_for_ai_prompt()
                     
-                    # Parse Deviations
-                    print("🔍 Parsing DEVIATIONS sheets...")
-                    deviations_data = await deviations_parser.parse_uploaded_file(data_file)
-
-
-                    if deviations_data:
-                        print(f"✅ Deviations data parsed successfully:")
-                        # Store with AI-friendly format
-                        ai_prompt_data = deviations_parser.format_for_ai_prompt()
-                        
-                        results["parsed_excel_data"]["deviations"] = {
-                            "raw_data": deviations_data,
-                            "ai_format": ai_prompt_data
-                        }
-                    else:
-                        print("ℹ️ No DEVIATIONS sheets found in this file")
+                    results["parsed_excel_data"]["deviations"] = {
+                        "raw_data": deviations_data,
+                        "ai_format": ai_prompt_data
+                    }
+                else:
+                    logger.info("No DEVIATIONS sheets found in this file")
 
+                
+                # Store Defective Units
+                if defective_units_data:
+                    # Store with AI-friendly format
+                    ai_prompt_data = defective_units_parser.format_for_ai_prompt()
+                    '''
+                    print(f"DEFECTIVE UNITS AI-FRIENDLY FORMAT:")
+                    print("="*60)
+                    print(ai_prompt_data)
+                    print("="*60)
+                    '''
                     
-                    # Parse Defective Units
-                    print("🔍 Parsing DEFECTIVE UNITS sheets...")
-                    defective_units_data = await defective_units_parser.parse_uploaded_file(data_file)
+                    results["parsed_excel_data"]["defective_units"] = {
+                        "raw_data": defective_units_data,
+                        "ai_format": ai_prompt_data
+                    }
+                else:
+                    logger.info("No DEFECTIVE UNITS sheets found in this file")
                     
-                    if defective_units_data:
-                        # Store with AI-friendly format
-                        ai_prompt_data = defective_units_parser.format_for_ai_prompt()
-                        '''
-                        print(f"DEFECTIVE UNITS AI-FRIENDLY FORMAT:")
-                        print("="*60)
-                        print(ai_prompt_data)
-                        print("="*60)
-                        '''
-                        
-                        results["parsed_excel_data"]["defective_units"] = {
-                            "raw_data": defective_units_data,
-                            "ai_format": ai_prompt_data
-                        }
-                    else:
-                        print("ℹ️ No DEFECTIVE UNITS sheets found in this file")
-                        
-                except Exception as e:
-                    print(f"⚠️ Excel parsing error for {data_file.filename}: {str(e)}")
-                    # Continue with normal processing even if enhanced parsing fails
-        
+            except Exception as e:
+                logger.warning("Excel parsing error for %s: %s", data_file.filename, e)
+                # Continue with normal processing even if enhanced parsing fails
+    
         # Print summary of parsed data
         if results["parsed_excel_data"]:
-            print(f"\n📈 Excel Parsing Summary:")
+            logger.info("Excel Parsing Summary:")
             if "test_articles" in results["parsed_excel_data"]:
                 stats = results["parsed_excel_data"]["test_articles"]["statistics"]
-                print(f"   Test Articles: {stats['total_units']} total units")
-                print(f"   Test Method Losses: {stats['test_method_losses']}")
-                print(f"   Actual Sample Size: {stats['actual_sample_size']}")
+                logger.info("   Test Articles: %s total units", stats['total_units'])
+                logger.info("   Test Method Losses: %s", stats['test_method_losses'])
+                logger.info("   Actual Sample Size: %s", stats['actual_sample_size'])
             if "equipment_logs" in results["parsed_excel_data"]:
                 equipment_data = results["parsed_excel_data"]["equipment_logs"]["raw_data"]
                 total_equipment_rows = sum(len(data['data']) for data in equipment_data.values())
-                print(f"   Equipment Logs: {total_equipment_rows} total rows across {len(equipment_data)} sheets")
+                logger.info("   Equipment Logs: %s total rows across %s sheets", total_equipment_rows, len(equipment_data))
             if "deviations" in results["parsed_excel_data"]:
                 deviations_data = results["parsed_excel_data"]["deviations"]["raw_data"]
                 total_deviations = sum(data['row_count'] for data in deviations_data.values())
-                print(f"   Deviations: {total_deviations} total deviations across {len(deviations_data)} sheets")
+                logger.info("   Deviations: %s total deviations across %s sheets", total_deviations, len(deviations_data))
             if "defective_units" in results["parsed_excel_data"]:
                 defective_data = results["parsed_excel_data"]["defective_units"]["raw_data"]
                 total_defective = sum(data['row_count'] for data in defective_data.values())
-                print(f"   Defective Units: {total_defective} total defective units across {len(defective_data)} sheets")
+                logger.info("   Defective Units: %s total defective units across %s sheets", total_defective, len(defective_data))
         
         return results
     
     async def extract_document_content(self, file: UploadFile) -> str:
         """Extract text content from Word documents"""
         try:
-            contents = await file.read()
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                tmp_file.write(contents)
-                tmp_file.flush()
-                
-                doc = Document(tmp_file.name)
-                text_content = []
-                
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        text_content.append(paragraph.text.strip())
-                
-                os.unlink(tmp_file.name)
-                return "\n".join(text_content)
+            # python-docx reads the upload's spooled file directly, so the body is
+            # neither read into memory at once nor copied to a temporary file
+            await file.seek(0)
+            # Unzipping and walking the document is blocking work; keep it off the event loop
+            return await asyncio.to_thread(self._read_document_text, file.file)
         except Exception as e:
-            print(f"Error extracting document content: {e}")
+            logger.error("Error extracting document content: %s", e)
             return ""
     
-    async def extract_excel_data(self, file: UploadFile) -> Dict[str, Any]:
-        """Extract data from Excel files"""
+    @staticmethod
+    def _read_document_text(docx_file) -> str:
+        """Return the non-empty paragraph texts of a Word document, one per line"""
+        doc = Document(docx_file)
+        text_content = []
+        
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                text_content.append(paragraph.text.strip())
+        
+        return "\n".join(text_content)
+    
+    async def _parse_excel_upload(self, data_file: UploadFile) -> Dict[str, Any]:
+        """
+        Extract one Excel upload and run the four specialized parsers on it
+        
+        The upload is copied to one temporary file, read by extract_excel_data and by
+        all parsers; the parsers share one cached workbook and run concurrently in
+        worker threads.
+        
+        Returns:
+            data_content (extract_excel_data result), parsers and results (in
+            test article, equipment, deviations, defective units order) and error
+            (the exception that stopped parsing, or None)
+        """
+        from .excel_parsers import TestArticleParser, EquipmentUsedParser, DeviationsParser, DefectiveUnitsParser
+        
+        parsed = {"data_content": None, "parsers": (), "results": (), "error": None}
+        excel_path = None
         try:
-            contents = await file.read()
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                tmp_file.write(contents)
-                tmp_file.flush()
-                
-                workbook = openpyxl.load_workbook(tmp_file.name)
-                data = {}
-                
-                for sheet_name in workbook.sheetnames:
-                    sheet = workbook[sheet_name]
-                    sheet_data = []
-                    
-                    for row in sheet.iter_rows(values_only=True):
-                        if any(cell is not None for cell in row):
-                            sheet_data.append(row)
-                    
-                    data[sheet_name] = sheet_data
-                
-                os.unlink(tmp_file.name)
-                return {"filename": file.filename, "sheets": data}
+            excel_path = await BaseExcelParser.copy_upload_to_temp(data_file)
+            # Original extraction method
+            parsed["data_content"] = await self.extract_excel_data(data_file, file_path=excel_path)
+            
+            logger.info("Running enhanced Excel parsing for: %s", data_file.filename)
+            logger.info("Parsing TEST ARTICLE LOG & TEST RESULTS, Equipment/Software/Material logs, "
+                        "DEVIATIONS and DEFECTIVE UNITS sheets...")
+            parsers = (TestArticleParser(), EquipmentUsedParser(), DeviationsParser(), DefectiveUnitsParser())
+            parsed["results"] = await asyncio.gather(
+                *(asyncio.to_thread(parser.parse_excel_file, excel_path) for parser in parsers)
+            )
+            parsed["parsers"] = parsers
+        
+        except Exception as e:
+            if parsed["data_content"] is None:
+                logger.error("Error extracting Excel data: %s", e)
+                parsed["data_content"] = {"filename": data_file.filename, "sheets": {}, "error": str(e)}
+            parsed["error"] = e
+        
+        finally:
+            BaseExcelParser.remove_temp_file(excel_path)
+        
+        return parsed
+    
+    async def extract_excel_data(self, file: UploadFile, file_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract data from Excel files
+        
+        Pass file_path when the upload has already been saved locally, so its
+        bytes are not read again
+        """
+        temp_path = None
+        try:
+            if file_path is None:
+                # Copy the upload in chunks instead of reading it into memory at once
+                temp_path = file_path = await BaseExcelParser.copy_upload_to_temp(file)
+            
+            data = await asyncio.to_thread(self._read_excel_sheets, file_path)
+            return {"filename": file.filename, "sheets": data}
         except Exception as e:
-            print(f"Error extracting Excel data: {e}")
+            logger.error("Error extracting Excel data: %s", e)
             return {"filename": file.filename, "sheets": {}, "error": str(e)}
+        finally:
+            BaseExcelParser.remove_temp_file(temp_path)
+    
+    @staticmethod
+    def _read_excel_sheets(file_path: str) -> Dict[str, List[tuple]]:
+        """
+        Return the non-empty rows of every sheet in a workbook, by sheet name
+        
+        Reads through the parsers' shared workbook (python-calamine when installed,
+        else read-only openpyxl), so the specialized parsers reuse this load; the
+        workbook is released by BaseExcelParser.remove_temp_file
+        """
+        workbook = BaseExcelParser._load_workbook(file_path)
+        data = {}
+        for sheet_name in workbook.sheetnames:
+            sheet = workbook[sheet_name]
+            sheet_data = []
+            
+            for row in sheet.iter_rows(values_only=True):
+                if any(cell is not None for cell in row):
+                    sheet_data.append(row)
+            
+            data[sheet_name] = sheet_data
+        return data
     
     async def analyze_protocol(self, content: str) -> Dict[str, Any]:
         """Analyze protocol content and save for AI agents"""
@@ -395,41 +452,58 @@ class DVTReportGenerator:
         # If AI is available, do quick analysis
         if self.client:
             try:
-                from google.genai.types import GenerateContentConfig
-                
-                prompt = f"""
-                Quickly analyze this protocol and extract basic information:
-                1. Protocol reference/number
-                2. Brief scope description  
-                3. Brief purpose description
+                from google.genai.types import GenerateContentConfig, ThinkingConfig
                 
-                Protocol Content (first 2000 chars):
-                {content[:2000]}
+                prompt = DVTPrompts.protocol_analysis_prompt(content)
+                model = DVTPrompts.MODEL_TIER.get("protocol_analysis", self.model_name)
+                temperature = AgentConfig.get_temperature("protocol_analysis")
+                thinking_budget = DVTPrompts.THINKING_BUDGET["protocol_analysis"]
                 
-                Return JSON format:
-                {{"protocol_reference": "...", "scope": "...", "purpose": "..."}}
-                """
-                
-                config = GenerateContentConfig(temperature=0.3)
-                
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=[prompt],
-                    config=config
+                # Same protocol excerpt, same request: reuse the earlier response
+                cache_key = llm_cache.make_key(
+                    prompt=prompt,
+                    system_instruction=DVT_SYSTEM_PROMPT,
+                    model=model,
+                    temperature=temperature,
+                    response_schema=DVTPrompts.PROTOCOL_ANALYSIS_SCHEMA
                 )
+                response_text = llm_cache.get(cache_key) if self.use_response_cache else None
+                
+                if response_text is None:
+                    # Structured output - the response text is the JSON object
+                    config = GenerateContentConfig(
+                        temperature=temperature,
+                        system_instruction=DVT_SYSTEM_PROMPT,
+                        response_mime_type="application/json",
+                        response_schema=DVTPrompts.PROTOCOL_ANALYSIS_SCHEMA,
+                        max_output_tokens=DVTPrompts.MAX_TOKENS["protocol_analysis"],
+                        thinking_config=(
+                            ThinkingConfig(thinking_budget=thinking_budget)
+                            if AgentConfig.supports_thinking_budget(model, thinking_budget) else None
+                        )
+                    )
+                    
+                    response = self.client.models.generate_content(
+                        model=model,
+                        contents=[prompt],
+                        config=config
+                    )
+                    response_text = response.text if response else None
+                    if response_text and self.use_response_cache:
+                        llm_cache.set(cache_key, response_text)
                 
-                if response and response.text:
+                if response_text:
                     # Try to parse JSON response
                     import json
                     try:
-                        ai_data = json.loads(response.text)
+                        ai_data = json.loads(response_text)
                         result.update(ai_data)
                         result["ai_analysis"] = "Basic protocol analysis completed"
                     except json.JSONDecodeError:
-                        result["ai_analysis"] = response.text
+                        result["ai_analysis"] = response_text
                         
             except Exception as e:
-                print(f"Protocol analysis error: {e}")
+                logger.error("Protocol analysis error: %s", e)
                 result["error"] = str(e)
         
         return result
@@ -440,10 +514,10 @@ class DVTReportGenerator:
         
         # Store analysis image paths for later use
         if analysis_image_paths:
-            print(f"🖼️ [DEBUG] Received {len(analysis_image_paths)} analysis images for processing")
+            logger.debug("Received %s analysis images for processing", len(analysis_image_paths))
             sections["analysis_image_paths"] = analysis_image_paths
         else:
-            print("🖼️ [DEBUG] No analysis images provided")
+            logger.debug("No analysis images provided")
             sections["analysis_image_paths"] = []
         
         # AI connection test
@@ -463,83 +537,100 @@ class DVTReportGenerator:
             if "raw_data" in protocol_data:
                 # This is where the structured doc parser stores the data
                 parsed_protocol_data = protocol_data.get("raw_data", None)
-                print(f"🔍 Found raw_data with {len(parsed_protocol_data)} sections" if parsed_protocol_data else "🔍 raw_data is empty")
+                logger.info("Found raw_data with %s sections", len(parsed_protocol_data) if parsed_protocol_data else 0)
 
             else:
-                print("⚠️ No parsed protocol data available, falling back to legacy text parsing")
+                logger.warning("No parsed protocol data available, falling back to legacy text parsing")
 
-            ai_results = await self.ai_orchestrator.execute_tasks_4_1_to_4_4(
-                protocol_content=protocol_content,
-                protocol_number=protocol_number,
-                project_name=project_name,
-                report_content="",  # Empty for now, will update for Task 4.3 later
-                parsed_protocol_data=parsed_protocol_data  # New parameter
+            # Convert test_data list to excel_data_dict format for Task 4.11
+            excel_data_dict = {}
+            for test_data_item in processed_data.get("test_data", []):
+                if isinstance(test_data_item, dict) and "filename" in test_data_item:
+                    excel_data_dict[test_data_item["filename"]] = test_data_item
+            calibration_verified = device_config.get("calibration_verified", True) if device_config else True
+            
+            # Tasks 4.1-4.4, 4.5, 4.6 (equipment), 4.7 and the batched investigations
+            # call don't use each other's output, so their AI round-trips overlap
+            attachments_start = len(self.generated_attachments)
+            (ai_results, task_4_5_result, equipment_content,
+             test_result_summary, batched_investigations) = await asyncio.gather(
+                self.ai_orchestrator.execute_tasks_4_1_to_4_4(
+                    protocol_content=protocol_content,
+                    protocol_number=protocol_number,
+                    project_name=project_name,
+                    report_content="",  # Empty for now, will update for Task 4.3 later
+                    parsed_protocol_data=parsed_protocol_data  # New parameter
+                ),
+                self._execute_task_4_5(processed_data, device_config, report_config),
+                # Get equipment content (Task 4.6 using EquipmentUsedAgent)
+                self.create_equipment_section(
+                    processed_data, 
+                    report_config,
+                    calibration_verified=calibration_verified
+                ),
+                self.create_test_result_summary(processed_data, report_config),
+                # One AI call for deviations, test method losses and defective units
+                self._create_batched_investigations(
+                    processed_data, excel_data_dict, report_config
+                )
             )
             
-            # Execute Task 4.5: Device Under Test Configuration
+            # Task 4.5: Device Under Test Configuration
             if device_config:
-                print("🤖 Executing AI Task 4.5: Device Under Test Configuration...")
-                data_files = processed_data.get("data_files", [])
-                task_4_5_result = await self.ai_orchestrator.execute_task_4_5(
-                    data_files=data_files,
-                    device_config=device_config,
-                    report_config=report_config
-                )
-                
                 if task_4_5_result and task_4_5_result.success:
-                    print("✅ task_4_5 completed successfully")
+                    logger.info("task_4_5 completed successfully")
                     sections["task_4_5"] = task_4_5_result.content
                     
-                    # Check for attachments and add to our tracking list
+                    # Check for attachments and add to our tracking list, ahead of
+                    # any Task 4.6 attachments as when the tasks ran in sequence
                     if hasattr(task_4_5_result, 'metadata') and task_4_5_result.metadata.get("attachment_info"):
                         attachment_info = task_4_5_result.metadata["attachment_info"]
                         if "filename" in attachment_info:
-                            self.generated_attachments.append(attachment_info["filename"])
-                            print(f"📎 Added Task 4.5 attachment: {attachment_info['filename']}")
+                            self.generated_attachments.insert(attachments_start, attachment_info["filename"])
+                            logger.info("Added Task 4.5 attachment: %s", attachment_info['filename'])
                 else:
-                    print(f"❌ task_4_5 failed: {task_4_5_result.error if task_4_5_result else 'Unknown error'}")
+                    logger.error("task_4_5 failed: %s", task_4_5_result.error if task_4_5_result else 'Unknown error')
                     sections["task_4_5"] = f"Error in task_4_5: {task_4_5_result.error if task_4_5_result else 'Unknown error'}"
             
             # Process AI results in correct order
             # Task 4.1a: Purpose
             if ai_results.get("task_4_1_purpose") and ai_results["task_4_1_purpose"].success:
-                print("✅ task_4_1_purpose completed successfully")
+                logger.info("task_4_1_purpose completed successfully")
                 sections["task_4_1_purpose"] = ai_results["task_4_1_purpose"].content
             else:
                 error_msg = ai_results["task_4_1_purpose"].error if ai_results.get("task_4_1_purpose") else "Unknown error"
-                print(f"❌ task_4_1_purpose failed: {error_msg}")
+                logger.error("task_4_1_purpose failed: %s", error_msg)
                 sections["task_4_1_purpose"] = f"Error in task_4_1_purpose: {error_msg}"
 
             # Task 4.1b: Scope
             if ai_results.get("task_4_1_scope") and ai_results["task_4_1_scope"].success:
-                print("✅ task_4_1_scope completed successfully")
+                logger.info("task_4_1_scope completed successfully")
                 sections["task_4_1_scope"] = ai_results["task_4_1_scope"].content
             else:
                 error_msg = ai_results["task_4_1_scope"].error if ai_results.get("task_4_1_scope") else "Unknown error"
-                print(f"❌ task_4_1_scope failed: {error_msg}")
+                logger.error("task_4_1_scope failed: %s", error_msg)
                 sections["task_4_1_scope"] = f"Error in task_4_1_scope: {error_msg}"
 
             if ai_results.get("task_4_2") and ai_results["task_4_2"].success:
-                print("✅ task_4_2 completed successfully")
+                logger.info("task_4_2 completed successfully")
                 sections["task_4_2"] = ai_results["task_4_2"].content
             else:
                 error_msg = ai_results["task_4_2"].error if ai_results.get("task_4_2") else "Unknown error"
-                print(f"❌ task_4_2 failed: {error_msg}")
+                logger.error("task_4_2 failed: %s", error_msg)
                 sections["task_4_2"] = f"Error in task_4_2: {error_msg}"
                 
             if ai_results.get("task_4_4") and ai_results["task_4_4"].success:
-                print("✅ task_4_4 completed successfully")
+                logger.info("task_4_4 completed successfully")
                 sections["task_4_4"] = ai_results["task_4_4"].content
             else:
                 error_msg = ai_results["task_4_4"].error if ai_results.get("task_4_4") else "Unknown error"
-                print(f"❌ task_4_4 failed: {error_msg}")
+                logger.error("task_4_4 failed: %s", error_msg)
                 sections["task_4_4"] = f"Error in task_4_4: {error_msg}"
             
             # Continue with remaining tasks (4.5-4.12) using existing methods
             
             # Create combined Material & Equipment section (6)
             dut_config_content = ""
-            equipment_content = ""
             
             # Get Task 4.5 content if available
             if "task_4_5" in sections:
@@ -550,26 +641,18 @@ class DVTReportGenerator:
             # Create Test Execution Chronology section
             if device_config and "test_execution_chronology" in device_config:
                 chronology_data = device_config["test_execution_chronology"]
-                print(f"🔍 [DEBUG] Chronology data received: {chronology_data}")
+                logger.debug("Chronology data received: %s", chronology_data)
                 sections["test_execution_chronology"] = self.create_test_execution_chronology(chronology_data)
-                print(f"✅ Created Test Execution Chronology with {len(chronology_data)} entries")
-                print(f"🔍 [DEBUG] Generated table content: {sections['test_execution_chronology']}")
+                logger.info("Created Test Execution Chronology with %s entries", len(chronology_data))
+                logger.debug("Generated table content: %s", sections['test_execution_chronology'])
             else:
                 sections["test_execution_chronology"] = self.create_test_execution_chronology([])
-                print("📝 Created empty Test Execution Chronology table")
+                logger.info("Created empty Test Execution Chronology table")
             
             # Create Test Result Analysis Images section
             image_paths = analysis_image_paths if analysis_image_paths else []
             sections["test_result_analysis_images"] = self.create_test_result_analysis_images(image_paths)
-            print(f"✅ Created Test Result Analysis with {len(image_paths)} images")
-            
-            # Get equipment content (Task 4.6 using EquipmentUsedAgent)
-            calibration_verified = device_config.get("calibration_verified", True) if device_config else True
-            equipment_content = await self.create_equipment_section(
-                processed_data, 
-                report_config,
-                calibration_verified=calibration_verified
-            )
+            logger.info("Created Test Result Analysis with %s images", len(image_paths))
             
             # Set Task 4.6 content for consumables and equipment placeholders
             sections["task_4_6"] = equipment_content
@@ -579,39 +662,44 @@ class DVTReportGenerator:
                 dut_config_content, equipment_content
             )
             
-            sections["task_4_7"] = await self.create_test_result_summary(processed_data, report_config)
+            sections["task_4_7"] = test_result_summary
             sections["test_details"] = await self.create_test_results_details(processed_data)
-            # Process protocol deviations using Excel data and AI agent
-            sections["protocol_deviations"] = await self.create_protocol_deviations_from_excel(processed_data)
-            # Process defective unit investigations using Excel data and AI agent
-            sections["defective_unit_investigations"] = await self.create_defective_unit_investigations_from_excel(processed_data)
-            sections["defective_units"] = await self.create_defective_unit_investigations(
-                report_config.get("jira_tickets", [])
-            )
-            # Convert test_data list to excel_data_dict format for Task 4.11
-            excel_data_dict = {}
-            for test_data_item in processed_data.get("test_data", []):
-                if isinstance(test_data_item, dict) and "filename" in test_data_item:
-                    excel_data_dict[test_data_item["filename"]] = test_data_item
-            sections["test_method_losses"] = await self.create_test_method_loss_investigations(
-                processed_data, excel_data_dict, report_config
+            # Investigation sections use the batched answer when there is one, otherwise
+            # each makes its own AI call; either way they are independent of each other
+            (sections["protocol_deviations"], sections["defective_unit_investigations"],
+             sections["defective_units"], sections["test_method_losses"]) = await asyncio.gather(
+                # Process protocol deviations using Excel data and AI agent
+                self.create_protocol_deviations_from_excel(
+                    processed_data, batched_investigations.get("protocol_deviations")
+                ),
+                # Process defective unit investigations using Excel data and AI agent
+                self.create_defective_unit_investigations_from_excel(
+                    processed_data, batched_investigations.get("defective_unit_investigations")
+                ),
+                self.create_defective_unit_investigations(
+                    report_config.get("jira_tickets", [])
+                ),
+                self.create_test_method_loss_investigations(
+                    processed_data, excel_data_dict, report_config,
+                    batched_investigations.get("test_method_losses")
+                )
             )
             sections["conclusion"] = await self.create_conclusion(processed_data, sections)
             
             # NOW execute Task 4.3 with complete report content
-            print("🤖 Executing final Task 4.3 with complete report content...")
+            logger.info("Executing final Task 4.3 with complete report content...")
             complete_report = self._build_complete_report_text(sections)
             final_acronyms_result = await self.ai_orchestrator.execute_final_acronyms_task(complete_report)
             
             if final_acronyms_result.success:
-                print("✅ Final task_4_3 completed successfully")
+                logger.info("Final task_4_3 completed successfully")
                 sections["task_4_3"] = final_acronyms_result.content
             else:
-                print(f"❌ Final task_4_3 failed: {final_acronyms_result.error}")
+                logger.error("Final task_4_3 failed: %s", final_acronyms_result.error)
                 sections["task_4_3"] = f"Error in task_4_3: {final_acronyms_result.error}"
             
         else:
-            print("⚠️ AI not configured, using fallback methods")
+            logger.warning("AI not configured, using fallback methods")
             # Fallback to original methods
             sections["task_4_1"] = await self.create_scope_and_purpose(
                 processed_data["protocol_data"], 
@@ -652,6 +740,19 @@ class DVTReportGenerator:
         
         return sections
     
+    async def _execute_task_4_5(self, processed_data: Dict[str, Any], device_config: Optional[Dict[str, Any]],
+                                report_config: Dict[str, Any]) -> Optional[TaskResult]:
+        """Execute AI Task 4.5 (Device Under Test Configuration); None when no device configuration was given"""
+        if not device_config:
+            return None
+        
+        logger.info("Executing AI Task 4.5: Device Under Test Configuration...")
+        return await self.ai_orchestrator.execute_task_4_5(
+            data_files=processed_data.get("data_files", []),
+            device_config=device_config,
+            report_config=report_config
+        )
+    
     def _build_complete_report_text(self, sections: Dict[str, str]) -> str:
         """Build complete report text for acronym scanning"""
         # Combine all sections in order for acronym analysis
@@ -739,7 +840,7 @@ class DVTReportGenerator:
     
     def create_test_execution_chronology(self, chronology_data: List[Dict[str, str]]) -> str:
         """Create Test Execution Chronology table from user input"""
-        print(f"🔍 [DEBUG] create_test_execution_chronology called with data: {chronology_data}")
+        logger.debug("create_test_execution_chronology called with data: %s", chronology_data)
         
         if not chronology_data:
             # Return empty table if no data provided
@@ -748,7 +849,7 @@ class DVTReportGenerator:
 |------|------------|----------|----------|
 |      |            |          |          |
 """
-            print(f"🔍 [DEBUG] No data provided, returning empty table")
+            logger.debug("No data provided, returning empty table")
             return result
         
         # Create table header
@@ -766,41 +867,41 @@ class DVTReportGenerator:
             
             row = f"| {step} | {start_date} | {end_date} | {location} |\n"
             table_content += row
-            print(f"🔍 [DEBUG] Added row {i+1}: {row.strip()}")
+            logger.debug("Added row %s: %s", i + 1, row.strip())
         
-        print(f"🔍 [DEBUG] Final table content:\n{table_content}")
+        logger.debug("Final table content:\n%s", table_content)
         return table_content.strip()
     
     def insert_analysis_images(self, doc, paragraph, image_placeholder: str):
         """Insert analysis images into Word document"""
         try:
-            print(f"🖼️ [DEBUG] Processing image placeholder: {image_placeholder}")
+            logger.debug("Processing image placeholder: %s", image_placeholder)
             
             # Parse the placeholder: {ANALYSIS_IMAGES:count:path1|path2|...}
             if not image_placeholder.startswith("{ANALYSIS_IMAGES:"):
-                print("🖼️ [ERROR] Invalid image placeholder format")
+                logger.error("Invalid image placeholder format")
                 return
             
             # Extract image paths
             placeholder_content = image_placeholder[17:-1]  # Remove {ANALYSIS_IMAGES: and }
             parts = placeholder_content.split(":", 1)
             if len(parts) < 2:
-                print("🖼️ [ERROR] Invalid placeholder format - missing paths")
+                logger.error("Invalid placeholder format - missing paths")
                 return
             
             count = int(parts[0])
             image_paths = parts[1].split("|") if parts[1] else []
             
-            print(f"🖼️ [DEBUG] Found {count} images to insert: {image_paths}")
+            logger.debug("Found %s images to insert: %s", count, image_paths)
             
             if not image_paths or not image_paths[0]:
-                print("🖼️ [DEBUG] No image paths provided")
+                logger.debug("No image paths provided")
                 return
             
             # Insert images into the document
             for i, image_path in enumerate(image_paths):
                 if not os.path.exists(image_path):
-                    print(f"🖼️ [WARNING] Image file not found: {image_path}")
+                    logger.warning("Image file not found: %s", image_path)
                     continue
                 
                 try:
@@ -817,20 +918,20 @@ class DVTReportGenerator:
                     if i < len(image_paths) - 1:
                         paragraph.add_run().add_break()
                     
-                    print(f"🖼️ [DEBUG] Successfully inserted image {i+1} with original quality: {os.path.basename(image_path)}")
+                    logger.debug("Successfully inserted image %s with original quality: %s", i + 1, os.path.basename(image_path))
                     
                 except Exception as e:
-                    print(f"🖼️ [ERROR] Failed to insert image {image_path}: {e}")
+                    logger.error("Failed to insert image %s: %s", image_path, e)
                     # Add error message to document instead of failing silently
                     error_run = paragraph.add_run()
                     error_run.text = f"[Image insertion failed: {os.path.basename(image_path)}]"
                     error_run.font.color.rgb = RGBColor(255, 0, 0)  # Red color for error
                     continue
             
-            print(f"🖼️ [DEBUG] Completed inserting {len(image_paths)} images")
+            logger.debug("Completed inserting %s images", len(image_paths))
             
         except Exception as e:
-            print(f"🖼️ [ERROR] Failed to process images: {e}")
+            logger.error("Failed to process images: %s", e)
             # Add error message to document
             error_run = paragraph.add_run()
             error_run.text = f"[Image processing failed: {str(e)}]"
@@ -838,16 +939,16 @@ class DVTReportGenerator:
 
     def create_test_result_analysis_images(self, image_paths: List[str]) -> str:
         """Create Test Result Analysis Images section for Word document"""
-        print(f"🖼️ [DEBUG] create_test_result_analysis_images called with {len(image_paths)} images")
+        logger.debug("create_test_result_analysis_images called with %s images", len(image_paths))
         
         if not image_paths:
-            print("🖼️ [DEBUG] No images provided, returning TBD")
+            logger.debug("No images provided, returning TBD")
             return "TBD"
         
         # For now, return a placeholder that will be processed during Word document creation
         # The actual image insertion will happen in the Word processing phase
         image_placeholder = f"{{ANALYSIS_IMAGES:{len(image_paths)}:{'|'.join(image_paths)}}}"
-        print(f"🖼️ [DEBUG] Generated image placeholder: {image_placeholder}")
+        logger.debug("Generated image placeholder: %s", image_placeholder)
         return image_placeholder
     
     async def create_test_procedure_summary(self, protocol_data: Dict[str, Any]) -> str:
@@ -927,22 +1028,22 @@ class DVTReportGenerator:
             )
             
             if result.success:
-                print("✅ Equipment section generated successfully with EquipmentUsedAgent")
+                logger.info("Equipment section generated successfully with EquipmentUsedAgent")
                 
                 # Check for attachments and add to our tracking list
                 if hasattr(result, 'attachments') and result.attachments:
                     for attachment in result.attachments:
                         if "filename" in attachment:
                             self.generated_attachments.append(attachment["filename"])
-                            print(f"📎 Added Task 4.6 attachment: {attachment['filename']}")
+                            logger.info("Added Task 4.6 attachment: %s", attachment['filename'])
                 
                 return result.content
             else:
-                print(f"⚠️ EquipmentUsedAgent failed: {result.error}")
+                logger.warning("EquipmentUsedAgent failed: %s", result.error)
                 return self._create_fallback_equipment_section(calibration_verified)
                 
         except Exception as e:
-            print(f"❌ Error in equipment section generation: {str(e)}")
+            logger.error("Error in equipment section generation: %s", e)
             return self._create_fallback_equipment_section(calibration_verified)
     
     def _prepare_equipment_data_for_agent(self, processed_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -957,17 +1058,17 @@ class DVTReportGenerator:
             # Collect equipment logs
             if "equipment_logs" in excel_data and "raw_data" in excel_data["equipment_logs"]:
                 all_logs_data.update(excel_data["equipment_logs"]["raw_data"])
-                print(f"🔧 Found equipment_logs: {len(excel_data['equipment_logs']['raw_data'])} sheets")
+                logger.info("Found equipment_logs: %s sheets", len(excel_data['equipment_logs']['raw_data']))
             
             # Collect software logs
             if "software_logs" in excel_data and "raw_data" in excel_data["software_logs"]:
                 all_logs_data.update(excel_data["software_logs"]["raw_data"])
-                print(f"🔧 Found software_logs: {len(excel_data['software_logs']['raw_data'])} sheets")
+                logger.info("Found software_logs: %s sheets", len(excel_data['software_logs']['raw_data']))
             
             # Collect material logs
             if "material_logs" in excel_data and "raw_data" in excel_data["material_logs"]:
                 all_logs_data.update(excel_data["material_logs"]["raw_data"])
-                print(f"🔧 Found material_logs: {len(excel_data['material_logs']['raw_data'])} sheets")
+                logger.info("Found material_logs: %s sheets", len(excel_data['material_logs']['raw_data']))
             
             # Create combined data item if we have any logs
             if all_logs_data:
@@ -977,25 +1078,25 @@ class DVTReportGenerator:
                     "source": "excel_parser"
                 }
                 prepared_data.append(prepared_item)
-                print(f"🔧 Prepared combined logs data: {len(all_logs_data)} total sheets")
+                logger.info("Prepared combined logs data: %s total sheets", len(all_logs_data))
                 
                 # Debug: show what data we have for all three types
                 for sheet_name, sheet_info in all_logs_data.items():
                     if isinstance(sheet_info, dict) and "data" in sheet_info:
-                        print(f"   - {sheet_name}: {len(sheet_info['data'])} rows")
-                        if sheet_info["data"]:
-                            sample_columns = list(sheet_info["data"][0].keys()) if sheet_info["data"] else []
-                            print(f"     Sample columns: {sample_columns[:5]}...")
+                        logger.info("   - %s: %s rows", sheet_name, len(sheet_info['data']))
+                        if sheet_info["data"] and logger.isEnabledFor(logging.DEBUG):
+                            sample_columns = list(sheet_info["data"][0].keys())
+                            logger.debug("     Sample columns: %s...", sample_columns[:5])
         
         # Fallback: check test_data for any direct sheet data
         if not prepared_data and "test_data" in processed_data:
             for data_item in processed_data["test_data"]:
                 if "sheet_name" in data_item and any(log in data_item["sheet_name"] for log in ["EQUIPMENT", "SOFTWARE", "MATERIAL"]):
                     prepared_data.append(data_item)
-                    print(f"🔧 Added fallback data from {data_item.get('sheet_name', 'unknown sheet')}")
+                    logger.info("Added fallback data from %s", data_item.get('sheet_name', 'unknown sheet'))
         
         if not prepared_data:
-            print("⚠️ No equipment/software/material data found in processed_data")
+            logger.warning("No equipment/software/material data found in processed_data")
         
         return prepared_data
     
@@ -1037,17 +1138,19 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
             # Convert test_data list to excel_data_dict format for Task 4.7
             excel_data_dict = {}
             test_data = processed_data.get("test_data", [])
-            print(f"🔍 [TASK 4.7 DEBUG] test_data type: {type(test_data)}, length: {len(test_data) if hasattr(test_data, '__len__') else 'N/A'}")
+            logger.debug("Task 4.7: test_data type: %s, length: %s", type(test_data), len(test_data) if hasattr(test_data, '__len__') else 'N/A')
             
             for i, test_data_item in enumerate(test_data):
-                print(f"🔍 [TASK 4.7 DEBUG] test_data_item {i}: type={type(test_data_item)}")
+                logger.debug("Task 4.7: test_data_item %s: type=%s", i, type(test_data_item))
                 if isinstance(test_data_item, dict):
-                    print(f"🔍 [TASK 4.7 DEBUG] test_data_item {i} keys: {list(test_data_item.keys())}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Task 4.7: test_data_item %s keys: %s", i, list(test_data_item.keys()))
                     if "filename" in test_data_item:
                         excel_data_dict[test_data_item["filename"]] = test_data_item
-                        print(f"🔍 [TASK 4.7 DEBUG] Added to excel_data_dict: {test_data_item['filename']}")
+                        logger.debug("Task 4.7: Added to excel_data_dict: %s", test_data_item['filename'])
             
-            print(f"🔍 [TASK 4.7 DEBUG] excel_data_dict keys: {list(excel_data_dict.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Task 4.7: excel_data_dict keys: %s", list(excel_data_dict.keys()))
             excel_data = excel_data_dict
             protocol_data = processed_data.get("protocol_data", {})
             protocol_content = protocol_data.get("original_content", "")
@@ -1055,9 +1158,9 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
             # Get AI-friendly format if available
             ai_friendly_format = protocol_data.get("ai_format", None)
             
-            print(f"🚀 Executing Task 4.7: Create Test Result Summary (Data Type: {test_data_type})")
+            logger.info("Executing Task 4.7: Create Test Result Summary (Data Type: %s)", test_data_type)
             if ai_friendly_format:
-                print(f"📄 Using AI-friendly format ({len(ai_friendly_format)} characters)")
+                logger.info("Using AI-friendly format (%s characters)", len(ai_friendly_format))
             
             # Execute Task 4.7 using AI Agent
             result = await self.ai_orchestrator.execute_task_4_7(
@@ -1069,15 +1172,15 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
             )
             
             if result and result.success:
-                print("✅ Task 4.7 completed successfully")
+                logger.info("Task 4.7 completed successfully")
                 return result.content
             else:
                 error_msg = result.error if result else "Unknown error"
-                print(f"❌ Task 4.7 failed: {error_msg}")
+                logger.error("Task 4.7 failed: %s", error_msg)
                 return f"Error generating test result summary: {error_msg}"
                 
         except Exception as e:
-            print(f"❌ Error in create_test_result_summary: {str(e)}")
+            logger.error("Error in create_test_result_summary: %s", e)
             return f"Error generating test result summary: {str(e)}"
     
     def _create_test_result_summary_fallback(self) -> str:
@@ -1122,17 +1225,50 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
         """
         return details.strip()
     
-    async def create_protocol_deviations_from_excel(self, processed_data: Dict[str, Any]) -> str:
+    async def _create_batched_investigations(self, processed_data: Dict[str, Any],
+                                             excel_data_dict: Dict[str, Any],
+                                             report_config: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate raw AI content for deviations, test method losses and defective units in one call
+        Returns {} (each section then makes its own call) when fewer than two sections have data
+        """
+        from .ai_agents import TestMethodLossAgent
+        
+        if not self.client:
+            return {}
+        
+        parsed_excel_data = processed_data.get("parsed_excel_data", {})
+        deviations_data = parsed_excel_data.get("deviations", {}).get("raw_data", {})
+        defective_units_data = parsed_excel_data.get("defective_units", {}).get("raw_data", {})
+        
+        deviations_text = self._format_deviations_for_ai(deviations_data) if deviations_data else None
+        defective_units_text = self._format_defective_units_for_ai(defective_units_data) if defective_units_data else None
+        test_method_losses_text = TestMethodLossAgent(self.client, self.model_name).format_test_method_loss_data(
+            excel_data_dict or {}
+        )
+        
+        if sum(text is not None for text in (deviations_text, test_method_losses_text, defective_units_text)) < 2:
+            return {}
+        
+        logger.info("Generating deviations, test method losses and defective units in one batched call...")
+        batched_agent = BatchedInvestigationsAgent(self.client, self.model_name)
+        return await batched_agent.create_batched_investigations(
+            deviations_text, test_method_losses_text, defective_units_text, report_config
+        )
+    
+    async def create_protocol_deviations_from_excel(self, processed_data: Dict[str, Any],
+                                                    raw_content: Optional[str] = None) -> str:
         """
         Create Protocol Deviations Section using Excel deviation data and AI agent
+        raw_content is the batched AI answer for this section, when available
         """
-        print("🔍 Processing protocol deviations from Excel data...")
+        logger.info("Processing protocol deviations from Excel data...")
         
         # Get deviations data from Excel parsers
         deviations_data = processed_data.get("parsed_excel_data", {}).get("deviations", {}).get("raw_data", {})
         
         if not deviations_data:
-            print("📝 No deviations data found in Excel files")
+            logger.info("No deviations data found in Excel files")
             return "No deviations."
         
         # Create deviation AI agent
@@ -1141,19 +1277,19 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
             
             # Format deviations data for AI processing
             deviations_text = self._format_deviations_for_ai(deviations_data)
-            print(f"📊 Formatted deviations text: {deviations_text[:200]}...")
+            logger.debug("Formatted deviations text: %.200s...", deviations_text)
                 
             # Process with AI agent
-            result = await deviation_agent.process_deviations(deviations_text)
+            result = await deviation_agent.process_deviations(deviations_text, raw_content)
             
             if result.success:
-                print(f"✅ Protocol deviations processed successfully: {result.metadata.get('deviation_count', 0)} deviations")
+                logger.info("Protocol deviations processed successfully: %s deviations", result.metadata.get('deviation_count', 0))
                 return result.content
             else:
-                print(f"❌ Deviation processing failed: {result.error}")
+                logger.error("Deviation processing failed: %s", result.error)
                 return "No deviations."
         else:
-            print("⚠️ AI client not configured, using fallback")
+            logger.warning("AI client not configured, using fallback")
             return "No deviations."
     
     def _format_deviations_for_ai(self, deviations_data: Dict[str, Any]) -> str:
@@ -1178,17 +1314,19 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
         
         return '\n'.join(formatted_sections)
 
-    async def create_defective_unit_investigations_from_excel(self, processed_data: Dict[str, Any]) -> str:
+    async def create_defective_unit_investigations_from_excel(self, processed_data: Dict[str, Any],
+                                                              raw_content: Optional[str] = None) -> str:
         """
         Create Defective Unit Investigations Section using Excel defective units data and AI agent
+        raw_content is the batched AI answer for this section, when available
         """
-        print("🔍 Processing defective unit investigations from Excel data...")
+        logger.info("Processing defective unit investigations from Excel data...")
         
         # Get defective units data from Excel parsers
         defective_units_data = processed_data.get("parsed_excel_data", {}).get("defective_units", {}).get("raw_data", {})
         
         if not defective_units_data:
-            print("📝 No defective units data found in Excel files")
+            logger.info("No defective units data found in Excel files")
             return "No defective unit investigations available."
         
         # Create defective unit investigations AI agent
@@ -1197,19 +1335,19 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
             
             # Format defective units data for AI processing
             defective_units_text = self._format_defective_units_for_ai(defective_units_data)
-            print(f"📊 Formatted defective units text: {defective_units_text[:200]}...")
+            logger.debug("Formatted defective units text: %.200s...", defective_units_text)
                 
             # Process with AI agent
-            result = await defective_agent.process_defective_units(defective_units_text)
+            result = await defective_agent.process_defective_units(defective_units_text, raw_content)
             
             if result.success:
-                print(f"✅ Defective unit investigations processed successfully: {result.metadata.get('investigation_count', 0)} investigations")
+                logger.info("Defective unit investigations processed successfully: %s investigations", result.metadata.get('investigation_count', 0))
                 return result.content
             else:
-                print(f"❌ Defective unit investigation processing failed: {result.error}")
+                logger.error("Defective unit investigation processing failed: %s", result.error)
                 return "No defective unit investigations available."
         else:
-            print("⚠️ AI client not configured, using fallback")
+            logger.warning("AI client not configured, using fallback")
             return "No defective unit investigations available."
     
     def _format_defective_units_for_ai(self, defective_units_data: Dict[str, Any]) -> str:
@@ -1292,7 +1430,7 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
         
         return investigations.strip()
     
-    async def create_test_method_loss_investigations(self, processed_data: Optional[Dict[str, Any]] = None, excel_data_dict: Optional[Dict[str, Any]] = None, report_config: Optional[Dict[str, str]] = None) -> str:
+    async def create_test_method_loss_investigations(self, processed_data: Optional[Dict[str, Any]] = None, excel_data_dict: Optional[Dict[str, Any]] = None, report_config: Optional[Dict[str, str]] = None, raw_content: Optional[str] = None) -> str:
         """AI Task 4.11: Create Test Method Loss Investigations section using TestMethodLossAgent"""
         from .ai_agents import TestMethodLossAgent
         
@@ -1310,18 +1448,19 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
             # Process test method loss data using the specialized agent
             result = await test_method_loss_agent.create_test_method_loss_investigations(
                 excel_data_dict=excel_data_dict or {},
-                report_config=report_config
+                report_config=report_config,
+                raw_content=raw_content
             )
             
             if result.success:
-                print("✅ Test Method Loss Investigations section generated successfully")
+                logger.info("Test Method Loss Investigations section generated successfully")
                 return result.content
             else:
-                print(f"⚠️ TestMethodLossAgent failed: {result.error}")
+                logger.warning("TestMethodLossAgent failed: %s", result.error)
                 return self._create_fallback_test_method_loss_section()
                 
         except Exception as e:
-            print(f"❌ Error in test method loss investigations generation: {str(e)}")
+            logger.error("Error in test method loss investigations generation: %s", e)
             return self._create_fallback_test_method_loss_section()
     
     def _create_fallback_test_method_loss_section(self) -> str:
@@ -1336,7 +1475,7 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
             scope_content = sections.get("task_4_1", "")
             
             if not test_results_content or not scope_content:
-                print("⚠️ Missing test results or scope content for conclusion generation, using fallback")
+                logger.warning("Missing test results or scope content for conclusion generation, using fallback")
                 return self._create_fallback_conclusion(processed_data)
             
             if self.ai_orchestrator:
@@ -1355,17 +1494,17 @@ Note: Equipment details will be extracted from uploaded equipment logs."""
                 )
                 
                 if result.success:
-                    print(f"✅ Conclusion generated successfully ({len(result.content)} characters)")
+                    logger.info("Conclusion generated successfully (%s characters)", len(result.content))
                     return result.content
                 else:
-                    print(f"❌ Conclusion generation failed: {result.error}")
+                    logger.error("Conclusion generation failed: %s", result.error)
                     return self._create_fallback_conclusion(processed_data)
             else:
-                print("⚠️ AI orchestrator not available, using fallback conclusion")
+                logger.warning("AI orchestrator not available, using fallback conclusion")
                 return self._create_fallback_conclusion(processed_data)
                 
         except Exception as e:
-            print(f"❌ Error in conclusion generation: {str(e)}")
+            logger.error("Error in conclusion generation: %s", e)
             return self._create_fallback_conclusion(processed_data)
     
     def _create_fallback_conclusion(self, processed_data: Dict[str, Any]) -> str:
@@ -1725,14 +1864,14 @@ Generated: {generated_date}"""
                 # Process footer
                 self._replace_placeholders_in_element(section.footer, replacements)
             
-            print("✅ Document headers and footers updated with placeholder replacements")
-            print(f"   [BK_TITLE] → {title} (10pt)")
-            print(f"   [BK_RPT] → {report_number_numeric} (28pt)")
-            print(f"   [BK_REV] → {revision} (12pt)")
-            print(f"   [BK_DOC_OWNER] → {document_owner} (10pt)")
+            logger.info("Document headers and footers updated with placeholder replacements")
+            logger.info("   [BK_TITLE] → %s (10pt)", title)
+            logger.info("   [BK_RPT] → %s (28pt)", report_number_numeric)
+            logger.info("   [BK_REV] → %s (12pt)", revision)
+            logger.info("   [BK_DOC_OWNER] → %s (10pt)", document_owner)
             
         except Exception as e:
-            print(f"⚠️ Warning: Could not update headers: {e}")
+            logger.warning("Could not update headers: %s", e)
     
     def _replace_placeholders_in_element(self, element, replacements):
         """Helper method to replace placeholders in header/footer elements"""
@@ -1794,7 +1933,7 @@ Generated: {generated_date}"""
         try:
             # Load template document
             doc = Document(self.template_path)
-            print(f"✅ Loaded template: {self.template_path}")
+            logger.info("Loaded template: %s", self.template_path)
             
             # Update headers with report information
             self.update_document_headers(doc, report_config)
@@ -1811,8 +1950,14 @@ Generated: {generated_date}"""
             
             # Process all paragraphs for placeholder replacement
             for paragraph in doc.paragraphs:
+                # paragraph.text is rebuilt from the runs on every access, so scan it once
+                # for placeholders and skip the (many) paragraphs without any
+                paragraph_placeholders = set(self._placeholder_pattern.findall(paragraph.text))
+                if not paragraph_placeholders:
+                    continue
+                
                 for placeholder, content_key in self.placeholder_mapping.items():
-                    if placeholder in paragraph.text:
+                    if placeholder in paragraph_placeholders and placeholder in paragraph.text:
                         placeholders_found.append(placeholder)
                         # First try using the content_key from placeholder_mapping
                         replacement_content = sections.get(content_key, "")
@@ -1864,7 +2009,7 @@ Generated: {generated_date}"""
                                     run.font.size = Pt(11)  
                                     run.font.color.rgb = RGBColor(0, 0, 0)
                         else:
-                            print(f"⚠️ No content available for placeholder: {placeholder}")
+                            logger.warning("No content available for placeholder: %s", placeholder)
             
             
             # Check for missing placeholders and add content to end if needed
@@ -1876,7 +2021,7 @@ Generated: {generated_date}"""
                     replacement_content = content_mapping.get(content_key_clean, "")
                     
                     if replacement_content:
-                        print(f"⚠️ Placeholder {placeholder} not found, adding content to end of document")
+                        logger.warning("Placeholder %s not found, adding content to end of document", placeholder)
                         # Add content to end of document
                         doc.add_paragraph("")
                         new_para = doc.add_paragraph(f"Missing section content for {placeholder}:")
@@ -1898,14 +2043,14 @@ Generated: {generated_date}"""
             
             doc.save(filepath)
             
-            print(f"✅ Template document created: {filepath}")
-            print(f"✅ Placeholders found and replaced: {len(placeholders_found)}")
-            print(f"⚠️ Placeholders missing (content added to end): {len(placeholders_missing)}")
+            logger.info("Template document created: %s", filepath)
+            logger.info("Placeholders found and replaced: %s", len(placeholders_found))
+            logger.info("Placeholders missing (content added to end): %s", len(placeholders_missing))
             
             return filepath
             
         except Exception as e:
-            print(f"❌ Error creating document from template: {str(e)}")
+            logger.error("Error creating document from template: %s", e)
             raise e
     
     async def create_word_document(self, report_config: Dict[str, Any], sections: Dict[str, str]) -> str:
@@ -0,0 +1,34 @@
+"""
+Regression tests for the deterministic helpers of the DVT AI agents
+"""
+
+from report_generator_agent import ai_agents
+
+
+def test_plain_text_criteria_slice_keeps_prose_body():
+    agent = ai_agents.TestResultSummaryAgent(client=None)
+    doc_text = (
+        "Intro\n"
+        "Acceptance Criteria\n"
+        "All units shall pass the drop test\n"
+        "Battery life shall exceed 10 days\n"
+        "TEST EQUIPMENT\n"
+        "Drop tester"
+    )
+    assert agent._slice_acceptance_criteria(doc_text) == (
+        "Acceptance Criteria\n"
+        "All units shall pass the drop test\n"
+        "Battery life shall exceed 10 days"
+    )
+
+
+def test_header_only_criteria_slice_falls_back_to_full_text():
+    agent = ai_agents.TestResultSummaryAgent(client=None)
+    doc_text = "Intro\nAcceptance Criteria\nSUMMARY\nNothing else"
+    assert agent._slice_acceptance_criteria(doc_text) == doc_text
+
+
+def test_acronym_candidates_keep_letter_digit_tokens():
+    agent = ai_agents.AcronymsDefinitionsAgent(client=None)
+    content = "The G7 GSS Wearable PCBA IS tested; ALL units were aged."
+    assert agent._extract_acronym_candidates(content) == ["G7", "GSS", "PCBA"]
@@ -0,0 +1,80 @@
+"""
+Regression tests for DocumentParser paragraph text extraction
+"""
+
+import zipfile
+from io import BytesIO
+
+from docx.oxml import parse_xml
+from lxml import etree
+
+from report_generator_agent.doc_parsers import DocumentParser
+
+NSDECLS = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:v="urn:schemas-microsoft-com:vml"'
+)
+
+TEXT_BOX_RUN = """
+<w:r>
+  <mc:AlternateContent>
+    <mc:Choice Requires="wps">
+      <w:drawing><wp:anchor><a:graphic><a:graphicData><wps:wsp><wps:txbx>
+        <w:txbxContent><w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p></w:txbxContent>
+      </wps:txbx></wps:wsp></a:graphicData></a:graphic></wp:anchor></w:drawing>
+    </mc:Choice>
+    <mc:Fallback>
+      <w:pict><v:shape><v:textbox>
+        <w:txbxContent><w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p></w:txbxContent>
+      </v:textbox></v:shape></w:pict>
+    </mc:Fallback>
+  </mc:AlternateContent>
+</w:r>
+"""
+
+
+def _paragraph(inner_xml: str) -> str:
+    return f"<w:p {NSDECLS}>{inner_xml}</w:p>"
+
+
+def _assert_matches_python_docx(paragraph_xml: str, expected: str):
+    element = etree.fromstring(paragraph_xml)
+    assert DocumentParser._paragraph_text(element) == expected
+    assert parse_xml(paragraph_xml).text == expected
+
+
+def test_text_box_and_tracked_insertion_are_not_paragraph_text():
+    paragraph_xml = _paragraph(
+        '<w:r><w:t>Body text</w:t></w:r>'
+        + TEXT_BOX_RUN
+        + '<w:ins w:id="1" w:author="a"><w:r><w:t xml:space="preserve"> INSERTED</w:t></w:r></w:ins>'
+    )
+    _assert_matches_python_docx(paragraph_xml, "Body text")
+
+
+def test_hyperlink_tabs_and_breaks_match_python_docx():
+    paragraph_xml = _paragraph(
+        '<w:r><w:t>A</w:t><w:tab/><w:t>B</w:t><w:br/><w:t>C</w:t><w:br w:type="page"/></w:r>'
+        '<w:hyperlink><w:r><w:t>link</w:t><w:noBreakHyphen/><w:cr/></w:r></w:hyperlink>'
+    )
+    _assert_matches_python_docx(paragraph_xml, "A\tB\nClink-\n")
+
+
+def test_external_entities_are_not_resolved(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("SECRET")
+    document_xml = (
+        f'<!DOCTYPE w:document [<!ENTITY xxe SYSTEM "{secret.as_uri()}">]>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        '<w:body><w:p><w:r><w:t>1.0 Purpose &xxe;</w:t></w:r></w:p></w:body></w:document>'
+    )
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.writestr("word/document.xml", document_xml)
+    
+    parsed = DocumentParser().parse_bytes(buffer.getvalue())
+    assert "SECRET" not in repr(parsed)